@@ -1,7 +1,11 @@
-import gspread
-from google.oauth2.service_account import Credentials
+import numpy as np
 import pandas as pd
-import os
+from gspread.utils import ValueRenderOption
+from config import Config
+from google_sheets_uploader import GoogleSheetsUploader
+from sheet_diff import ensure_grid
+from sheets_client import get_sheets_client
+from sheets_writer import SheetsWriter
 
 class GoogleSheetsManager:
     """
@@ -21,14 +25,8 @@ class GoogleSheetsManager:
     def authenticate(self):
         """驗證 Google Sheets API 並連線"""
         try:
-            if not os.path.exists(self.json_api):
-                raise FileNotFoundError(f"❌ Google API 憑證不存在: {self.json_api}")
-                
-            creds = Credentials.from_service_account_file(
-                self.json_api, 
-                scopes=["https://www.googleapis.com/auth/spreadsheets"]
-            )
-            self.client = gspread.authorize(creds)
+            # 共用連線：與上傳器使用同一個 Client，不重複驗證
+            self.client = get_sheets_client().client(self.json_api)
             return True
         except Exception as e:
             print(f"❌ Google Sheets 連線失敗: {e}")
@@ -44,16 +42,20 @@ class GoogleSheetsManager:
             self.authenticate()
             
         try:
-            self.sheet = self.client.open_by_key(self.sheet_id).worksheet(worksheet_name)
+            # 工作表物件由共用快取提供，不會每次重新讀取試算表中繼資料
+            self.sheet = get_sheets_client().worksheet(self.json_api, self.sheet_id, worksheet_name)
             return self.sheet
         except Exception as e:
             print(f"❌ 開啟工作表失敗: {e}")
             return None
             
-    def read_to_dataframe(self, worksheet_name):
+    def read_to_dataframe(self, worksheet_name, page_rows=None, schema=None):
         """
-        讀取工作表內容到 DataFrame
+        讀取工作表內容到 DataFrame：依列分頁讀取，每頁一個請求，
+        數值直接取得未格式化的值，空白儲存格為缺值
         :param worksheet_name: str - 工作表名稱
+        :param page_rows: int - 每頁讀取的列數
+        :param schema: TableSchema - 讀取後套用的欄位型別（選用）
         :return: pd.DataFrame - 工作表數據
         """
         sheet = self.open_worksheet(worksheet_name)
@@ -61,13 +63,52 @@ class GoogleSheetsManager:
             return None
             
         try:
-            data = sheet.get_all_records()
-            df = pd.DataFrame(data)
-            return df
+            pages = list(self.iter_pages(sheet, page_rows))
+            if not pages:
+                return pd.DataFrame()
+            df = pd.concat(pages, ignore_index=True) if len(pages) > 1 else pages[0]
+            df = df.infer_objects()
+            return schema.apply(df) if schema is not None else df
         except Exception as e:
             print(f"❌ 讀取數據失敗: {e}")
             return None
-            
+
+    @staticmethod
+    def iter_pages(sheet, page_rows=None):
+        """
+        依列分頁讀取工作表，第一列為標題
+        :param sheet: gspread.Worksheet - 工作表
+        :param page_rows: int - 每頁讀取的列數
+        :return: generator - 每頁的 pd.DataFrame
+        """
+        page_rows = page_rows or Config.SHEET_READ_PAGE_ROWS
+        header = None
+        blank = 0  # 先前頁面結尾被省略的空白列數
+        start = 1
+        # 讀取超出格線的範圍會被 API 拒絕，最後一頁只讀到格線的最後一列；
+        # 回傳的列數少於請求的列數不代表已讀到最後（API 會省略範圍結尾的空白列），
+        # 因此一律讀到格線的最後一列
+        while start <= sheet.row_count:
+            end = min(start + page_rows - 1, sheet.row_count)
+            values = sheet.get_values(
+                f"{start}:{end}", value_render_option=ValueRenderOption.unformatted
+            )
+            requested = end - start + 1
+            if header is None:
+                if not values:
+                    return
+                header, values = values[0], values[1:]
+                requested -= 1
+            width = len(header)
+            rows = [row[:width] + [""] * (width - len(row)) for row in values]
+            if rows:
+                # 後面仍有數據時補回被省略的空白列，與一次讀取整張工作表的結果相同
+                rows = [[""] * width for _ in range(blank)] + rows
+                blank = 0
+                yield pd.DataFrame(rows, columns=header, dtype=object).replace("", np.nan)
+            blank += requested - len(values)
+            start = end + 1
+
     def update_sheet(self, worksheet_name, df):
         """
         更新工作表內容
@@ -80,17 +121,17 @@ class GoogleSheetsManager:
             return False
             
         try:
+            values = [df.columns.tolist()] + GoogleSheetsUploader.to_values(df)
+            # 格線不足時先擴充（逐列 append_row 會自動擴充，範圍寫入不會）
+            ensure_grid(sheet, len(values), len(df.columns))
+
             # 清除現有數據
             sheet.clear()
             
-            # 寫入標題行
-            sheet.append_row(df.columns.tolist())
-            
-            # 寫入數據行
-            for _, row in df.iterrows():
-                sheet.append_row(row.tolist())
+            # 標題與數據一次寫入（數據量大時由 SheetsWriter 切塊送出）
+            SheetsWriter(sheet).write_ranges([{"range": "A1", "values": values}])
                 
             return True
         except Exception as e:
             print(f"❌ 更新工作表失敗: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+from config import Config
+from excel_saver import ExcelSaver
+from utils import log_message
+
+
+class ArtifactRun:
+    """
+    一次執行交付的中間產物：與其他執行共用背景寫入執行緒，
+    但 `flush()` 只等待並回傳這次執行交付的檔案
+    """
+
+    def __init__(self, writer):
+        """
+        :param writer: ArtifactWriter - 實際在背景寫入檔案的存檔器
+        """
+        self.writer = writer
+        self.pending = 0  # 已交付但尚未寫完的檔案數
+        self._results = []
+        self._cond = threading.Condition()
+
+    def submit(self, df, filename_prefix="data"):
+        """交付一份中間產物在背景存檔，參數同 `ArtifactWriter.submit`"""
+        return self.writer.submit(df, filename_prefix, run=self)
+
+    def _queued(self):
+        with self._cond:
+            self.pending += 1
+
+    def _done(self, result):
+        with self._cond:
+            self._results.append(result)
+            self.pending -= 1
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        等待這次執行交付的檔案寫入完成（不等待其他執行的檔案）
+        :param timeout: float - 最多等待秒數，None 表示一直等待
+        :return: list[dict] - 自上次 flush 後完成的檔案（前綴、路徑、耗時、錯誤）
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self.pending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    log_message(f"⚠️ 仍有 {self.pending} 個檔案尚未寫入完成")
+                    break
+                self._cond.wait(remaining)
+            results, self._results = self._results, []
+        return results
+
+
+class ArtifactWriter:
+    """
+    在背景執行緒儲存中間產物，抓取流程不必等待檔案寫入：
+    - 佇列有上限，寫入跟不上時 `submit()` 才會等待
+    - 交付時先複製 DataFrame，之後修改原本的數據不影響存檔內容
+    - 每次執行以 `start_run()` 取得自己的 `ArtifactRun`，`flush()` 只等待該次執行的檔案
+    """
+
+    def __init__(self, saver=None, max_pending=None):
+        """
+        初始化 ArtifactWriter
+        :param saver: ExcelSaver - 實際寫入檔案的儲存器
+        :param max_pending: int - 佇列中最多等待寫入的檔案數
+        """
+        self.saver = saver or ExcelSaver()
+        self._queue = queue.Queue(maxsize=max(1, max_pending or Config.ARTIFACT_QUEUE_SIZE))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._default_run = ArtifactRun(self)  # 未指定執行時使用
+
+    def _ensure_thread(self):
+        """啟動背景寫入執行緒（只啟動一次）"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def start_run(self):
+        """
+        開始一次執行，之後交付的檔案由回傳的 `ArtifactRun` 各自追蹤
+        :return: ArtifactRun
+        """
+        return ArtifactRun(self)
+
+    def submit(self, df, filename_prefix="data", run=None):
+        """
+        交付一份中間產物在背景存檔（依 `Config.SAVE_ARTIFACTS` 決定是否存檔）
+        :param df: pd.DataFrame - 要儲存的數據
+        :param filename_prefix: str - 檔案名稱前綴
+        :param run: ArtifactRun - 所屬的執行，預設為存檔器本身的執行
+        :return: bool - 是否已排入佇列
+        """
+        if not self.saver.should_save(filename_prefix):
+            return False
+        run = run or self._default_run
+        self._ensure_thread()
+        run._queued()
+        self._queue.put((df.copy(), filename_prefix, time.time(), run))
+        return True
+
+    def _run(self):
+        while True:
+            df, filename_prefix, submitted, run = self._queue.get()
+            start = time.time()
+            try:
+                path, ok = self.saver.save(df, filename_prefix=filename_prefix)
+                error = None if ok else "儲存失敗"
+            except Exception as e:
+                path, error = None, str(e)
+            run._done({
+                "prefix": filename_prefix,
+                "path": path,
+                "queued": start - submitted,  # 在佇列中等待的秒數
+                "seconds": time.time() - start,  # 寫入檔案的秒數
+                "error": error,
+            })
+            self._queue.task_done()
+
+    def flush(self, timeout=None):
+        """
+        等待未指定執行時交付的檔案寫入完成，參數與回傳值同 `ArtifactRun.flush`
+        """
+        return self._default_run.flush(timeout)
+
+    @staticmethod
+    def format_report(results):
+        """回傳存檔結果的文字摘要"""
+        return "、".join(
+            f"{result['prefix']} {result['seconds']:.2f} 秒"
+            + (f"（失敗: {result['error']}）" if result["error"] else "")
+            for result in results
+        )
+
+
+_shared_writer = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_artifact_writer():
+    """取得行程內共用的背景存檔器"""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = ArtifactWriter()
+        return _shared_writer
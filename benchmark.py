@@ -0,0 +1,336 @@
+# 數據處理流程的效能基準測試（離線執行，不需要瀏覽器與 Google API）
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import pandas as pd
+from data_processor import DataCleaner, DataMerger
+from excel_saver import ExcelSaver, FORMATS
+from fake_sheets import FakeSheetsService
+from field_parser import FieldParser
+from google_sheets_uploader import GoogleSheetsUploader
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
+from sheet_diff import DiffUploader, row_keys
+from sheets_writer import SheetsWriter, TokenBucket
+
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_BASELINE = "benchmark_baseline.json"
+MERGE_STEPS = [
+    "expand_data",
+    "remove_empty_rows",
+    "merge",
+    "split_data",
+    "format_data",
+    "remove_newlines",
+    "to_categoricals",
+    "sort_data",
+]
+
+_SURNAMES = "陳林黃張李王吳劉蔡楊許鄭謝郭洪曾邱廖賴周"
+_GIVEN = "小明美玲志豪怡君家豪淑芬俊傑雅婷建宏佩君"
+_CITIES = [
+    ("台北市", ["大安區", "信義區", "中山區", "松山區"], ["106", "110", "104", "105"]),
+    ("新北市", ["板橋區", "中和區", "新莊區", "三重區"], ["220", "235", "242", "241"]),
+    ("台中市", ["西屯區", "北屯區", "南屯區"], ["407", "406", "408"]),
+    ("高雄市", ["左營區", "三民區", "苓雅區"], ["813", "807", "802"]),
+    ("桃園市", ["桃園區", "中壢區"], ["330", "320"]),
+]
+_ROADS = ["忠孝東路", "中山路", "民生路", "復興北路", "文心路", "博愛路"]
+_LOTTERIES = ["一番賞", "福袋", "扭蛋", "抽卡"]
+_SERIES = ["鬼滅之刃", "咒術迴戰", "航海王", "寶可夢", "間諜家家酒", "七龍珠", "排球少年"]
+_GRADES = ["A賞", "B賞", "C賞", "D賞", "E賞", "最後賞"]
+_STATUSES = ["待處理", "準備出貨"]
+_PICKUPS = ["自取", "物流寄送", "未設定"]
+_STORES = ["旗艦店", "西門店", "台中店", "高雄店"]
+
+
+def generate_rows(order_count, seed=0):
+    """
+    產生與後台表格相同格式的原始資料列（全部為文字）
+    :param order_count: int - 訂單數
+    :param seed: int - 亂數種子，固定後每次產生相同的數據
+    :return: tuple - (訂單列, 商品列)，欄位順序同 `ORDER_SCHEMA` / `ITEM_SCHEMA`
+    """
+    rng = random.Random(seed)
+    # 會員與套組字串在真實數據中大量重複
+    members = [
+        (rng.choice(_SURNAMES) + rng.choice(_GIVEN) + rng.choice(_GIVEN), rng.randint(1000, 99999))
+        for _ in range(max(10, order_count // 5))
+    ]
+    lotteries = [
+        (rng.randint(100, 9999), f"{rng.choice(_SERIES)} 第{rng.randint(1, 30)}彈", rng.choice(_LOTTERIES))
+        for _ in range(max(5, order_count // 50))
+    ]
+    start = datetime(2024, 1, 1)
+
+    orders = []
+    items = []
+    for index in range(order_count):
+        order_id = str(100000 + index)
+        count = rng.choice([1, 1, 1, 2, 2, 3, 5, 10])
+        name, member_id = rng.choice(members)
+        lottery_id, lottery_name, lottery_type = rng.choice(lotteries)
+        city, districts, postals = rng.choice(_CITIES)
+        district = rng.randrange(len(districts))
+        phone = f"09{rng.randint(0, 99999999):08d}"
+        created = start + timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        row = {
+            "訂單ID": order_id,
+            "最終售價": str(rng.randint(1, 50) * 100),
+            "收件資料": f"{phone} {city}{districts[district]}({postals[district]}){rng.choice(_ROADS)}{rng.randint(1, 300)}號",
+            "收件人電話": phone,
+            "會員資料": f"{name}\nID: {member_id}\n當下暱稱: {name[1:]}",
+            "運送狀態": rng.choice(_STATUSES),
+            "套組資訊": f"{lottery_id} - {lottery_name}\n{lottery_type}",
+            "店家": rng.choice(_STORES),
+            "領取方式": rng.choice(_PICKUPS),
+            "物品數量": f"({count})",
+            "建立時間": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "更新時間": (created + timedelta(hours=rng.randint(0, 72))).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        orders.append([row.get(column, "") for column in ORDER_SCHEMA.names])
+        for item in range(count):
+            items.append([
+                order_id,
+                f"https://example.com/img/{lottery_id}_{item}.jpg",
+                f"{lottery_name} {rng.choice(_GRADES)} 公仔",
+                rng.choice(_GRADES),
+                str(rng.randint(1, 30) * 50),
+                str(rng.randint(1, 20) * 25),
+                f"{lottery_id}-{item}",
+                rng.choice(["是", "否"]),
+            ])
+    return orders, items
+
+
+def measure(func, memory=True):
+    """
+    執行並量測耗時與 Python 記憶體配置高峰
+    （追蹤記憶體會讓耗時變長，開啟與否的結果不可互相比較）
+    :return: tuple - (回傳值, {"seconds": 秒數, "peak_mb": 記憶體高峰 MB})
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else 0
+        if memory:
+            tracemalloc.stop()
+    return result, {"seconds": round(seconds, 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+def run_size(order_count, formats, work_dir, memory=True):
+    """
+    對指定訂單數執行一輪完整的量測
+    :return: dict - 步驟名稱 -> 量測結果
+    """
+    orders, items = generate_rows(order_count)
+    steps = {}
+
+    (head, inner), steps["ingest"] = measure(
+        lambda: (ORDER_SCHEMA.to_frame(orders), ITEM_SCHEMA.to_frame(items)), memory
+    )
+    _, steps["clean"] = measure(lambda: DataCleaner(head.copy()).clean(), memory)
+
+    # 不讀寫正式的欄位解析快取
+    parser = FieldParser(cache_path=os.path.join(work_dir, "field_cache.pkl"), cache_size=0)
+    merger = DataMerger(head, inner, field_parser=parser)
+    for step in MERGE_STEPS:
+        _, steps[step] = measure(getattr(merger, step), memory)
+    final = merger.df_merged
+
+    saver = ExcelSaver()
+    saver.data_dir = work_dir
+    for fmt in formats:
+        (path, _), steps[f"save_{fmt}"] = measure(
+            lambda: saver.save(final, filename_prefix=f"bench_{order_count}", fmt=fmt), memory
+        )
+        if path:
+            steps[f"save_{fmt}"]["size_kb"] = round(os.path.getsize(path) / 1024, 1)
+            os.remove(path)
+
+    _, steps["upload_serialize"] = measure(
+        lambda: json.dumps(GoogleSheetsUploader.to_values(final), ensure_ascii=False), memory
+    )
+    steps.update(measure_upload(final, work_dir, memory))
+    return {"orders": order_count, "rows": len(final), "steps": steps}
+
+
+def measure_upload(final, work_dir, memory=True):
+    """
+    對本機的 Google Sheets 替身上傳兩次：第一次整份寫入，第二次只改動約 1% 的列，
+    記錄耗時與請求數、送出的數據量
+    :return: dict - 步驟名稱 -> 量測結果
+    """
+    service = FakeSheetsService(sleep=lambda seconds: None)
+    worksheet = service.worksheet("benchmark", "benchmark")
+    writer = SheetsWriter(worksheet, bucket=TokenBucket(0), sleep=lambda seconds: None)
+    uploader = DiffUploader(
+        worksheet,
+        snapshot_path=os.path.join(work_dir, "upload_snapshot.pkl"),
+        write_ranges=writer.write_ranges,
+    )
+    header = final.columns.tolist()
+    keys = row_keys(final)
+    rows = GoogleSheetsUploader.to_values(final)
+
+    steps = {}
+    for step, rows in (("upload_full", rows), ("upload_diff", _touch_rows(rows))):
+        service.reset()
+        _, steps[step] = measure(lambda: uploader.upload(header, keys, rows), memory)
+        report = service.report()
+        steps[step]["requests"] = report["requests"]
+        steps[step]["sent_kb"] = round(report["bytes_sent"] / 1024, 1)
+    return steps
+
+
+def _touch_rows(rows, every=100):
+    """每 `every` 列改動一個值，模擬兩次執行之間的少量異動"""
+    rows = [list(row) for row in rows]
+    for row in rows[::every]:
+        row[-1] = f"{row[-1]}*"
+    return rows
+
+
+def calibrate(repeats=5):
+    """
+    量測一段固定工作量（文字解析、分組、排序、JSON 序列化，與處理流程相近）的耗時，
+    作為這台機器的速度單位；各步驟以校準單位的倍數與基準比較，
+    在不同機器（例如開發機與 CI）上產生的報告才能互相比較
+    :param repeats: int - 重複次數，取最短的一次以降低雜訊
+    :return: float - 校準工作量的耗時（秒）
+    """
+    rng = random.Random(0)
+    texts = [
+        f"{rng.randint(0, 10 ** 6)} {city}{rng.choice(districts)}{rng.choice(_ROADS)}"
+        for city, districts, _ in (rng.choice(_CITIES) for _ in range(20000))
+    ]
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = pd.DataFrame({"text": texts})
+        df["number"] = df["text"].str.extract(r"^(\d+)")[0].astype("int64")
+        df["city"] = df["text"].str.split(" ").str[1].str[:3]
+        df.groupby("city")["number"].agg(["sum", "count"])
+        df = df.sort_values(["city", "number"])
+        json.dumps(df.to_numpy().tolist(), ensure_ascii=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_regressions(report, baseline, tolerance, min_seconds):
+    """
+    與基準比較各步驟耗時：以校準單位的倍數（`units`）比較，不受機器快慢影響
+    :param tolerance: float - 允許變慢的比例（0.25 表示 25%）
+    :param min_seconds: float - 兩次都低於此秒數的步驟不比較，避免量測雜訊
+    :return: list[str] - 變慢的步驟說明
+    :raises ValueError: 基準與本次的量測設定不同，無法比較
+    """
+    if not baseline.get("calibration"):
+        raise ValueError("基準沒有校準數據，請以 --update-baseline 重新建立")
+    if baseline.get("memory") != report.get("memory"):
+        raise ValueError("基準與本次的記憶體追蹤設定不同（--memory），耗時無法比較")
+    regressions = []
+    for size, result in report["results"].items():
+        base_steps = baseline.get("results", {}).get(size, {}).get("steps", {})
+        for step, current in result["steps"].items():
+            base = base_steps.get(step)
+            if not base or max(base["seconds"], current["seconds"]) < min_seconds:
+                continue
+            if current["units"] > base["units"] * (1 + tolerance):
+                regressions.append(
+                    f"{size} 筆訂單 {step}: {base['units']:.2f} -> {current['units']:.2f} 校準單位"
+                    f"（{base['seconds']:.3f}s -> {current['seconds']:.3f}s）"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="數據處理流程效能基準測試")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="訂單數，以逗號分隔（例如 100,1000,100000）")
+    parser.add_argument("--formats", default="xlsx,parquet,csv.gz",
+                        help=f"要量測的存檔格式，可用: {', '.join(FORMATS)}")
+    parser.add_argument("--output", default=os.path.join("data", "benchmark_report.json"),
+                        help="JSON 報告輸出路徑")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基準報告路徑")
+    parser.add_argument("--update-baseline", action="store_true", help="以本次結果更新基準")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允許變慢的比例")
+    parser.add_argument("--min-seconds", type=float, default=0.1, help="低於此秒數的步驟不比較")
+    parser.add_argument("--memory", action="store_true",
+                        help="追蹤記憶體峰值（會拖慢各步驟，只能與同樣設定的基準比較）")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    # 量測前後各校準一次取較快者，降低量測期間機器負載變化的影響
+    calibration = calibrate()
+    report = {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "memory": args.memory,
+        "calibration": None,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            report["results"][str(size)] = run_size(size, formats, work_dir, memory=args.memory)
+    calibration = min(calibration, calibrate())
+    report["calibration"] = round(calibration, 4)
+    print(f"⏱️ 校準單位: {calibration:.4f} 秒")
+
+    for size, result in report["results"].items():
+        total = sum(step["seconds"] for step in result["steps"].values())
+        print(f"📊 {size} 筆訂單（{result['rows']} 列）: 共 {total:.2f} 秒")
+        for step, values in result["steps"].items():
+            values["units"] = round(values["seconds"] / calibration, 3)
+            line = (
+                f"   {step:<18} {values['seconds']:>8.3f}s {values['units']:>8.2f} 單位"
+                f" {values['peak_mb']:>8.1f} MB"
+            )
+            if "requests" in values:
+                line += f" {values['requests']:>4} 個請求 {values['sent_kb']:>9.1f} KB"
+            print(line)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 報告已寫入 {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ 基準已更新 {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # 沒有基準時無法判斷是否退步，視為失敗，避免比較被默默略過
+        print(f"❌ 找不到基準 {args.baseline}（可用 --update-baseline 建立）")
+        return 1
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    try:
+        regressions = check_regressions(report, baseline, args.tolerance, args.min_seconds)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if regressions:
+        print("❌ 效能退步:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print("✅ 沒有超過容許範圍的效能退步")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,3 +32,115 @@ class Config:
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     JSON_API = os.path.join(BASE_DIR, "data-analysis-want1yo-01dac495ad8a.json")
+
+    # WebDriver 連線池設定
+    DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "1"))  # 瀏覽器數量上限（至少為 PAGE_CONCURRENCY）
+    DRIVER_IDLE_TIMEOUT = int(os.environ.get("DRIVER_IDLE_TIMEOUT", "900"))  # 閒置回收秒數
+    DRIVER_MAX_USES = int(os.environ.get("DRIVER_MAX_USES", "20"))  # 借出次數上限後重建
+    DRIVER_WARMUP = os.environ.get("DRIVER_WARMUP", "1") == "1"  # 伺服器啟動時預熱
+    CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH", "")  # 留空則自動下載
+
+    # 登入狀態快取設定
+    SESSION_CACHE_ENABLED = os.environ.get("SESSION_CACHE_ENABLED", "1") == "1"
+    SESSION_CACHE_PATH = os.environ.get(
+        "SESSION_CACHE_PATH", os.path.join("data", "session_cookies.bin")
+    )  # 加密後的 Cookie 檔案
+    SESSION_CACHE_KEY = os.environ.get("SESSION_CACHE_KEY", "")  # 留空則由帳密推導
+    SESSION_MAX_AGE = int(os.environ.get("SESSION_MAX_AGE", "43200"))  # 秒
+
+    # 頁面等待設定
+    WAIT_DEADLINE = float(os.environ.get("WAIT_DEADLINE", "20"))  # 單次等待最長秒數
+
+    # 抓取方式：selenium（瀏覽器）或 http（不啟動瀏覽器，失敗時改用 selenium）
+    SCRAPER_BACKEND = os.environ.get("SCRAPER_BACKEND", "selenium").lower()
+    HTTP_MAX_WORKERS = int(os.environ.get("HTTP_MAX_WORKERS", "4"))  # 同時抓取面板的連線數
+    HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "30"))  # 每個請求的逾時秒數
+    HTTP_USER_AGENT = os.environ.get(
+        "HTTP_USER_AGENT",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36",
+    )
+
+    # 分頁抓取設定：同時抓取的分頁數（瀏覽器模式的連線池會擴充到至少這個數量）
+    PAGE_CONCURRENCY = max(1, int(os.environ.get("PAGE_CONCURRENCY", "2")))
+
+    # 增量抓取設定：只抓取上次執行後更新的訂單，合併回本機快照
+    INCREMENTAL_MODE = os.environ.get("INCREMENTAL_MODE", "0") == "1"
+    INCREMENTAL_FULL_REFRESH_HOURS = float(
+        os.environ.get("INCREMENTAL_FULL_REFRESH_HOURS", "24")
+    )  # 距離上次完整抓取超過此時數則重新完整抓取
+    INCREMENTAL_OVERLAP_MINUTES = int(
+        os.environ.get("INCREMENTAL_OVERLAP_MINUTES", "5")
+    )  # 高水位往前重疊的分鐘數，避免時間誤差漏抓
+    INCREMENTAL_ACTIVE_STATUSES = ["待處理", "準備出貨"]  # 對應 delivery_status 101 / 104
+    SITE_TIMEZONE = os.environ.get("SITE_TIMEZONE", "Asia/Taipei")  # 後台時間的時區
+    SNAPSHOT_DATA_PATH = os.path.join("data", "order_snapshot.pkl")
+    SNAPSHOT_STATE_PATH = os.path.join("data", "order_snapshot.json")
+
+    # 瀏覽器資源封鎖設定
+    BLOCK_PROFILE = os.environ.get("BLOCK_PROFILE", "default")  # off / default / aggressive
+    BLOCK_EXTRA_PATTERNS = [
+        pattern for pattern in os.environ.get("BLOCK_EXTRA_PATTERNS", "").split(",") if pattern
+    ]  # 額外封鎖的網址樣式，以逗號分隔
+    PAGE_LOAD_STRATEGY = os.environ.get("PAGE_LOAD_STRATEGY", "eager")  # normal / eager
+    RESOURCE_REPORT = os.environ.get("RESOURCE_REPORT", "1") == "1"  # 統計每次執行的網路用量
+
+    # 摺疊面板展開設定
+    PANEL_BATCH_SIZE = int(os.environ.get("PANEL_BATCH_SIZE", "20"))  # 每批點擊的面板數
+    PANEL_MAX_RETRIES = int(os.environ.get("PANEL_MAX_RETRIES", "2"))  # 未載入面板的重試次數
+    PANEL_BATCH_TIMEOUT = float(os.environ.get("PANEL_BATCH_TIMEOUT", "15"))  # 每批最長等待秒數
+
+    # 中間產物存檔設定：各階段之間直接傳遞 DataFrame，檔案只是額外輸出
+    SAVE_ARTIFACTS = [
+        prefix.strip()
+        for prefix in os.environ.get("SAVE_ARTIFACTS", "final_processed_data").split(",")
+        if prefix.strip()
+    ]  # 需存檔的檔名前綴，以逗號分隔；all 表示全部存檔，留空則都不存
+    ARTIFACT_FORMATS = dict(
+        item.strip().split(":", 1)
+        for item in os.environ.get(
+            "ARTIFACT_FORMATS", "final_processed_data:xlsx,*:parquet"
+        ).split(",")
+        if ":" in item
+    )  # 前綴:格式（xlsx / parquet / feather / csv.gz），* 為其餘前綴的預設格式
+    ARTIFACT_QUEUE_SIZE = int(os.environ.get("ARTIFACT_QUEUE_SIZE", "4"))  # 背景存檔佇列上限
+
+    # 欄位拆分快取設定：會員資料、套組資訊的解析結果跨執行保存
+    FIELD_CACHE_PATH = os.path.join("data", "field_parser_cache.pkl")
+    FIELD_CACHE_SIZE = int(os.environ.get("FIELD_CACHE_SIZE", "20000"))  # 0 表示不使用快取
+
+    # 分塊處理設定：每次只展開、合併固定筆數的訂單，降低記憶體高峰
+    STREAM_CHUNK_ORDERS = int(os.environ.get("STREAM_CHUNK_ORDERS", "0"))  # 每塊訂單數，0 表示不分塊
+
+    # Google Sheets 差異上傳設定：只寫入有異動的列，不再每次清空重寫
+    SHEET_DIFF_UPLOAD = os.environ.get("SHEET_DIFF_UPLOAD", "1") == "1"
+    SHEET_DIFF_MAX_RATIO = float(
+        os.environ.get("SHEET_DIFF_MAX_RATIO", "0.3")
+    )  # 異動列數超過總列數的此比例時整份重寫
+    UPLOAD_SNAPSHOT_DIR = "data"  # 上次上傳內容的快照目錄
+
+    # Google Sheets 寫入設定：切塊送出、限制每分鐘請求數、遇到 429 / 5xx 退避重試
+    SHEET_CHUNK_ROWS = int(os.environ.get("SHEET_CHUNK_ROWS", "2000"))  # 每個請求的列數上限
+    SHEET_CHUNK_BYTES = int(
+        os.environ.get("SHEET_CHUNK_BYTES", str(2 * 1024 * 1024))
+    )  # 每個請求的數據大小上限
+    SHEET_MAX_WORKERS = int(os.environ.get("SHEET_MAX_WORKERS", "2"))  # 同時送出的請求數
+    SHEET_MAX_RETRIES = int(os.environ.get("SHEET_MAX_RETRIES", "5"))  # 每個區塊的重試次數
+    SHEET_BACKOFF_BASE = float(os.environ.get("SHEET_BACKOFF_BASE", "1"))  # 第一次重試前等待秒數
+    SHEET_WRITES_PER_MINUTE = float(
+        os.environ.get("SHEET_WRITES_PER_MINUTE", "60")
+    )  # 每分鐘寫入請求上限，0 表示不限制
+    SHEET_READ_PAGE_ROWS = int(os.environ.get("SHEET_READ_PAGE_ROWS", "5000"))  # 分頁讀取每頁列數
+
+    # 分頁上傳設定：依欄位值拆成多個工作表，一次批次寫入
+    SHEET_PARTITION_COLUMNS = [
+        column.strip()
+        for column in os.environ.get("SHEET_PARTITION_COLUMNS", "").split(",")
+        if column.strip()
+    ]  # 分組欄位，以逗號分隔（例如 運送狀態,領取方式），留空則不拆分
+    SHEET_PARTITION_NAME = os.environ.get(
+        "SHEET_PARTITION_NAME", f"{WORKSHEET_NAME}-{{value}}"
+    )  # 工作表名稱樣板，{value} 為分組值
+    SHEET_PARTITION_KEEP_MAIN = (
+        os.environ.get("SHEET_PARTITION_KEEP_MAIN", "1") == "1"
+    )  # 拆分時是否仍上傳完整數據到 WORKSHEET_NAME
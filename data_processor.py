@@ -1,9 +1,13 @@
+import numpy as np
 import pandas as pd
 import os
 import time
 import re
 from datetime import datetime
 from excel_saver import ExcelSaver
+from order_merge import OrderKeyedMerger
+from field_parser import FieldParser, FIELD_SPECS
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
 
 
 class DataCleaner:
@@ -33,10 +37,12 @@ class DataCleaner:
         # print(f"📋 原始 DataFrame 欄位: {self.df.columns.tolist()}")
 
         # 移除指定欄位
-        self.df.drop(columns=columns_to_drop, inplace=True, errors="ignore")
-        self.df.reset_index(drop=True, inplace=True)  # 重設索引
-        self.df.drop(index=index_to_drop, inplace=True, errors="ignore")
+        if columns_to_drop:
+            self.df.drop(columns=columns_to_drop, inplace=True, errors="ignore")
         self.df.reset_index(drop=True, inplace=True)  # 重設索引
+        if index_to_drop:
+            self.df.drop(index=index_to_drop, inplace=True, errors="ignore")
+            self.df.reset_index(drop=True, inplace=True)  # 重設索引
 
         # 刪除所有值都是 NaN 的欄位
         self.df.dropna(axis=1, how="all", inplace=True)
@@ -53,18 +59,49 @@ class DataMerger:
     DataMerger 負責合併兩個 DataFrame，並進行拆分、排序等進一步處理
     """
 
-    def __init__(self, cleaned1_path, cleaned2_path):
-        """初始化 DataMerger 載入兩份 Excel 檔案"""
-        self.cleaned1_path = cleaned1_path
-        self.cleaned2_path = cleaned2_path
-        self.df_cleaned1 = pd.read_excel(cleaned1_path, sheet_name="Sheet1")
-        self.df_cleaned2 = pd.read_excel(cleaned2_path, sheet_name="Sheet1")
+    # 低基數欄位轉為有序類別；排序用的欄位依處理優先順序排列
+    CATEGORY_ORDERS = {
+        "運送狀態": ["待處理", "準備出貨", "已出貨", "完成"],
+        "領取方式": ["自取", "物流寄送", "未設定"],
+    }
+    CATEGORY_COLUMNS = ["運送狀態", "領取方式", "店家", "商品等級", "抽獎類型", "縣市"]
+
+    def __init__(self, cleaned1, cleaned2, field_parser=None):
+        """
+        初始化 DataMerger
+        :param cleaned1: pd.DataFrame | str - 清理後的訂單數據，或 `ExcelSaver` 寫出的檔案路徑
+        :param cleaned2: pd.DataFrame | str - 清理後的商品數據，或 `ExcelSaver` 寫出的檔案路徑
+        :param field_parser: FieldParser - 共用的欄位解析器（分塊處理時共用快取），
+                             未指定時自行建立並在拆分後寫回快取
+        """
+        self.df_cleaned1 = self.load(cleaned1)
+        self.df_cleaned2 = self.load(cleaned2)
         self.df_merged = None
+        self.merge_report = None  # 以鍵合併時的對應結果
+        self.field_parser = field_parser
         self.saver = ExcelSaver()  # ✅ **共用 Excel 儲存模組**
 
+    @staticmethod
+    def load(source):
+        """
+        取得要處理的 DataFrame：直接傳入的 DataFrame 不經過檔案；
+        空字串視為缺值，並依 schema 轉換型別（已轉換過的欄位不會重複轉換）
+        :param source: pd.DataFrame | str - DataFrame 或 `ExcelSaver` 寫出的檔案路徑
+        :return: pd.DataFrame
+        """
+        if not isinstance(source, pd.DataFrame):
+            source = ExcelSaver.load(source)
+
+        df = source.replace("", np.nan)
+        for schema in (ORDER_SCHEMA, ITEM_SCHEMA):
+            df = schema.apply(df)
+        return df
+
     def expand_data(self):
         """
-        解析 `物品數量`，並展開數據
+        解析 `物品數量`，並依數量展開數據：
+        以索引重複一次完成展開，保留欄位型別；展開後的索引為
+        (`來源列`, `品項序號`)，記錄每一列來自哪一筆訂單及其第幾個品項
         """
         try:
             # 先檢查欄位是否存在
@@ -75,27 +112,26 @@ class DataMerger:
                 return
 
             # 使用更安全的轉換方式，處理可能的 NaN 值
-            extracted = self.df_cleaned1["物品數量"].str.extract(r"\((\d+)\)")
+            extracted = self.df_cleaned1["物品數量"].astype("string").str.extract(r"\((\d+)\)")
             # 將無法解析的值設為 1 (預設一個)
             self.df_cleaned1["物品數量解析"] = (
                 pd.to_numeric(extracted[0], errors="coerce").fillna(1).astype("Int64")
             )
 
-            # 使用更高效的方法展開數據
-            expanded_rows = []
-            for _, row in self.df_cleaned1.iterrows():
-                count = row["物品數量解析"]
-                # 確保 count 是有效的整數
-                if pd.notna(count) and count > 0:
-                    for _ in range(int(count)):
-                        expanded_rows.append(row.to_dict())
-                else:
-                    # 如果無法解析數量，至少保留原始行
-                    expanded_rows.append(row.to_dict())
-
-            # 轉換回 DataFrame
-            self.df_cleaned1 = pd.DataFrame(expanded_rows)
-            print(f"✅ 數據展開完成：從 {len(expanded_rows)} 行展開")
+            # 數量為 0 或無法解析時，至少保留原始行
+            counts = self.df_cleaned1["物品數量解析"].to_numpy(dtype="int64")
+            counts = np.where(counts > 0, counts, 1)
+
+            # 每一列在所屬訂單內的序號：0, 1, ..., count-1
+            starts = np.repeat(np.cumsum(counts) - counts, counts)
+            ordinals = np.arange(counts.sum()) - starts
+
+            expanded = self.df_cleaned1.loc[self.df_cleaned1.index.repeat(counts)]
+            expanded.index = pd.MultiIndex.from_arrays(
+                [expanded.index, ordinals], names=["來源列", "品項序號"]
+            )
+            self.df_cleaned1 = expanded
+            print(f"✅ 數據展開完成：從 {len(expanded)} 行展開")
         except Exception as e:
             print(f"❌ 展開數據時發生錯誤: {str(e)}")
             # 在錯誤情況下，保留原始數據
@@ -111,103 +147,132 @@ class DataMerger:
 
     def merge(self):
         """
-        將 cleaned1 和 cleaned2 進行橫向合併
+        將 cleaned1 和 cleaned2 依 `訂單ID` 與訂單內的品項順序合併
+        （cleaned2 沒有 `訂單ID` 欄位時，沿用舊的橫向位置合併）
         """
-        self.df_merged = pd.concat(
-            [
-                self.df_cleaned1.reset_index(drop=True),
-                self.df_cleaned2.reset_index(drop=True),
-            ],
-            axis=1,
-        )
+        items = self.df_cleaned2.reset_index(drop=True)
+
+        if "訂單ID" not in items.columns:
+            self.df_merged = pd.concat(
+                [self.df_cleaned1.reset_index(drop=True), items], axis=1
+            )
+            return
+
+        self.df_merged, self.merge_report = OrderKeyedMerger().merge(self.df_cleaned1, items)
+        print(f"🔗 {OrderKeyedMerger.format_report(self.merge_report)}")
 
     def split_data(self):
         """
         拆分 `收件資料`、`會員資料`、`套組資訊`
+        （每個不重複的值只解析一次，見 `FieldParser`）
         """
-        self.df_merged["電話"] = self.df_merged["收件資料"].str.extract(r"^(\d{10})")
-        self.df_merged["地址"] = self.df_merged["收件資料"].str.replace(
-            r"^\d{10}\s*", "", regex=True
-        )
-        self.df_merged["郵遞區號"] = self.df_merged["地址"].str.extract(r"\((\d{3})\)")
-        self.df_merged["縣市"] = self.df_merged["地址"].str.extract(r"(\D{2,3}市)")
-        self.df_merged["區域"] = self.df_merged["地址"].str.extract(r"市(.{1,5})\(")
-
-        self.df_merged["會員名稱"] = self.df_merged["會員資料"].str.extract(
-            r"^(.+)\nID:"
-        )
-        self.df_merged["會員ID"] = (
-            self.df_merged["會員資料"]
-            .str.extract(r"ID: (\d+)")
-            .astype(float)
-            .astype("Int64")
-        )
-        self.df_merged["會員暱稱"] = self.df_merged["會員資料"].str.extract(
-            r"當下暱稱: (.+)"
-        )
-
-        self.df_merged["套組ID"] = (
-            self.df_merged["套組資訊"]
-            .str.extract(r"^(\d+)")
-            .astype(float)
-            .astype("Int64")
-        )
-        self.df_merged["套組名稱"] = self.df_merged["套組資訊"].str.extract(
-            r"-\s([^-\n]+)"
-        )
-        self.df_merged["抽獎類型"] = self.df_merged["套組資訊"].str.extract(r"\n(.+)$")
+        parser = self.field_parser or FieldParser()
+        for column in FIELD_SPECS:
+            fields = parser.parse(self.df_merged[column], column)
+            for field in fields.columns:
+                self.df_merged[field] = fields[field].array
+        if self.field_parser is None:
+            parser.save_cache()
 
     def format_data(self):
         """
-        格式化 `商品價格`、`建立時間` 和 `更新時間`
+        將 `建立時間` 和 `更新時間` 格式化為日期文字
+        （型別已在載入時依 schema 轉換，不需重新推斷時間格式）
         """
-        self.df_merged["商品價格"] = self.df_merged["商品價格"].astype("Int64")
-        self.df_merged["建立時間"] = pd.to_datetime(
-            self.df_merged["建立時間"]
-        ).dt.strftime("%Y-%m-%d")
-        self.df_merged["更新時間"] = pd.to_datetime(
-            self.df_merged["更新時間"]
-        ).dt.strftime("%Y-%m-%d")
+        for column in ["建立時間", "更新時間"]:
+            self.df_merged[column] = self.df_merged[column].dt.strftime("%Y-%m-%d")
 
     def remove_newlines(self):
         """
-        移除所有欄位內的換行符號 `\n`
+        移除所有文字欄位內的換行符號 `\n`（逐欄向量化處理）
         """
-        # print("🔄 格式化數據，移除換行符號...")
-        self.df_merged = self.df_merged.map(
-            lambda x: x.replace("\n", " ") if isinstance(x, str) else x
-        )
-        # self.df_merged = self.df_merged.apply(lambda col: col.map(lambda x: x.replace("\n", " ") if isinstance(x, str) else x))
-        # 確保每一列數據都正確處理換行符號
-        # self.df_merged = self.df_merged.apply(lambda col: col.map(lambda x: x.replace("\n", " ") if isinstance(x, str) else x))
+        for column in self.df_merged.columns:
+            values = self.df_merged[column]
+            if values.dtype != object:
+                continue
+            kind = pd.api.types.infer_dtype(values, skipna=True)
+            if kind == "string":
+                self.df_merged[column] = values.str.replace("\n", " ", regex=False)
+            elif kind.startswith("mixed"):
+                # 文字與其他型別混合的欄位只處理文字，其餘值保持不變
+                self.df_merged[column] = values.map(
+                    lambda x: x.replace("\n", " ") if isinstance(x, str) else x
+                )
+
+    def to_categoricals(self):
+        """
+        將低基數欄位轉為有序類別
+        """
+        self.df_merged = self.categorize_frame(self.df_merged)
+
+    @staticmethod
+    def categorize_frame(df):
+        """
+        將任一處理後 DataFrame 的低基數欄位轉為有序類別：
+        有指定順序的值在前，其餘出現過的值依字典序排在後面
+        :param df: pd.DataFrame - 處理後的數據
+        :return: pd.DataFrame - 同一個 DataFrame
+        """
+        for column in DataMerger.CATEGORY_COLUMNS:
+            if column not in df.columns:
+                continue
+            known = DataMerger.CATEGORY_ORDERS.get(column, [])
+            values = df[column]
+            others = sorted(set(values.dropna().unique()) - set(known), key=str)
+            df[column] = pd.Categorical(values, categories=known + others, ordered=True)
+        return df
 
     def sort_data(self):
         """
         根據 `運送狀態`、`領取方式`、`建立時間` 進行排序
         """
-        運送狀態排序 = {"待處理": 1, "準備出貨": 2, "已出貨": 3, "完成": 4}
-        領取方式排序 = {"自取": 1, "物流寄送": 2, "未設定": 3}
-        self.df_merged["運送狀態排序"] = self.df_merged["運送狀態"].map(運送狀態排序)
-        self.df_merged["領取方式排序"] = self.df_merged["領取方式"].map(領取方式排序)
+        self.df_merged = self.sort_frame(self.df_merged)
 
-        self.df_merged.sort_values(
-            by=["運送狀態排序", "領取方式排序", "建立時間"],
-            ascending=[True, True, True],
-            inplace=True,
-        )
-        self.df_merged.drop(columns=["運送狀態排序", "領取方式排序"], inplace=True)
+    @staticmethod
+    def _priority_codes(series, order):
+        """依指定順序回傳排序代碼，不在順序內的值與缺值排在最後"""
+        codes = pd.Categorical(series, categories=order).codes.astype("int64")
+        return np.where(codes >= 0, codes, len(order))
 
-    def process_all(self):
+    @staticmethod
+    def sort_frame(df):
         """
-        執行所有數據處理步驟
+        依 `運送狀態`、`領取方式`、`建立時間` 排序任一處理後的 DataFrame
+        （直接以類別代碼排序，也供增量模式合併快照後重新排序）
+        :param df: pd.DataFrame - 需排序的數據
+        :return: pd.DataFrame - 排序後的數據
+        """
+        created_codes, created = pd.factorize(df["建立時間"], sort=True)
+        created_codes = np.where(created_codes >= 0, created_codes, len(created))
+        # lexsort 為穩定排序，最後一個鍵為主要排序鍵
+        order = np.lexsort((
+            created_codes,
+            DataMerger._priority_codes(df["領取方式"], DataMerger.CATEGORY_ORDERS["領取方式"]),
+            DataMerger._priority_codes(df["運送狀態"], DataMerger.CATEGORY_ORDERS["運送狀態"]),
+        ))
+        return df.iloc[order]
+
+    def process_rows(self):
+        """
+        執行逐列即可完成的處理步驟（不含需要完整數據的類別轉換與排序），
+        分塊處理時每一塊各自呼叫
+        :return: pd.DataFrame - 處理後、尚未排序的數據
         """
         self.expand_data()
         self.remove_empty_rows()
         self.merge()
         self.split_data()
         self.format_data()
-        self.sort_data()
         self.remove_newlines()
+        return self.df_merged
+
+    def process_all(self):
+        """
+        執行所有數據處理步驟
+        """
+        self.process_rows()
+        self.to_categoricals()
+        self.sort_data()
 
         # 確保 df_merged 仍是 DataFrame
         if not isinstance(self.df_merged, pd.DataFrame):
@@ -0,0 +1,313 @@
+import threading
+import time
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from config import Config
+from resource_blocker import ResourceBlocker
+from utils import log_message
+
+
+class DriverPool:
+    """
+    WebDriver 連線池，讓多次執行共用預先啟動的 Chrome：
+    - 預先啟動並保留瀏覽器工作階段，避免每次執行的冷啟動
+    - 借出前進行健康檢查，失效的瀏覽器自動重建
+    - 閒置逾時與使用次數上限時自動回收
+    - 快取 chromedriver 路徑，每個行程只查找一次
+    """
+
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+
+    def __init__(self, max_size=None, idle_timeout=None, max_uses=None):
+        """
+        初始化連線池
+        :param max_size: int - 同時存在的瀏覽器數量上限，
+            預設為 `DRIVER_POOL_SIZE` 與 `PAGE_CONCURRENCY` 中較大者，讓分頁能以多個瀏覽器並行抓取
+        :param idle_timeout: int - 閒置多久（秒）後關閉瀏覽器，0 表示不回收
+        :param max_uses: int - 每個瀏覽器最多借出幾次後重建，0 表示不限制
+        """
+        self.max_size = max(
+            1, max_size or max(Config.DRIVER_POOL_SIZE, Config.PAGE_CONCURRENCY)
+        )
+        self.idle_timeout = (
+            Config.DRIVER_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        )
+        self.max_uses = Config.DRIVER_MAX_USES if max_uses is None else max_uses
+
+        self._idle = []  # [(driver, meta)]，最後放回的在最後面
+        self._in_use = {}  # id(driver) -> meta
+        self._creating = 0  # 正在啟動中的瀏覽器數量（已佔用名額）
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+    @classmethod
+    def resolve_driver_path(cls):
+        """
+        取得 chromedriver 路徑，優先使用 `Config.CHROMEDRIVER_PATH`，
+        否則透過 ChromeDriverManager 安裝一次後快取於類別上
+        :return: str - chromedriver 執行檔路徑
+        """
+        with cls._driver_path_lock:
+            if cls._driver_path is None:
+                cls._driver_path = (
+                    Config.CHROMEDRIVER_PATH or ChromeDriverManager().install()
+                )
+                log_message(f"🔧 chromedriver 路徑: {cls._driver_path}")
+            return cls._driver_path
+
+    @staticmethod
+    def build_options():
+        """建立 Render 上使用的 Chrome 啟動參數"""
+        options = webdriver.ChromeOptions()
+        options.add_argument("--start-maximized")
+        options.add_argument("--headless=new")  # 在 Render 上必須使用無頭模式
+        options.add_argument("--disable-gpu")  # 避免 GPU 相關問題
+        options.add_argument("--no-sandbox")  # 避免 sandbox 問題
+        options.add_argument("--disable-dev-shm-usage")  # 限制共享內存使用
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("useAutomationExtension", False)
+        options.add_experimental_option(
+            "prefs", {"credentials_enable_service": False}
+        )  # 禁用密碼儲存
+        options.add_argument("--disable-notifications")  # 禁用通知
+        options.add_experimental_option(
+            "excludeSwitches", ["enable-automation"]
+        )  # 移除自動化軟體提示
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        # DOMContentLoaded 後即返回，表格是否就緒由 PageWaiter 判斷
+        options.page_load_strategy = Config.PAGE_LOAD_STRATEGY
+        if Config.RESOURCE_REPORT:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return options
+
+    def _create_driver(self):
+        """啟動一個新的 Chrome"""
+        start = time.time()
+        service = Service(self.resolve_driver_path())
+        driver = webdriver.Chrome(service=service, options=self.build_options())
+        ResourceBlocker(driver).apply()
+        log_message(f"🚗 已啟動新的 WebDriver（{time.time() - start:.1f} 秒）")
+        return driver, {"uses": 0, "created": time.time(), "last_used": time.time()}
+
+    @staticmethod
+    def _is_healthy(driver):
+        """確認瀏覽器工作階段仍可回應指令"""
+        try:
+            driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            log_message(f"⚠️ 關閉 WebDriver 失敗: {e}")
+
+    def _is_expired(self, meta, now):
+        if self.idle_timeout and now - meta["last_used"] > self.idle_timeout:
+            return True
+        if self.max_uses and meta["uses"] >= self.max_uses:
+            return True
+        return False
+
+    def _pop_expired(self):
+        """從閒置清單取出需回收的瀏覽器（呼叫端須持有鎖）"""
+        now = time.time()
+        expired = [item for item in self._idle if self._is_expired(item[1], now)]
+        self._idle = [item for item in self._idle if item not in expired]
+        return [driver for driver, _ in expired]
+
+    def _total(self):
+        return len(self._idle) + len(self._in_use) + self._creating
+
+    def acquire(self, timeout=None):
+        """
+        借出一個健康的 WebDriver，必要時啟動新的瀏覽器
+        :param timeout: float - 名額用盡時最多等待秒數，None 表示一直等待
+        :return: selenium.webdriver.Chrome
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("❌ WebDriver 連線池已關閉")
+                stale = self._pop_expired()
+                candidate = self._idle.pop() if self._idle else None
+                if candidate is None and not stale:
+                    if self._total() >= self.max_size:
+                        remaining = None if deadline is None else deadline - time.time()
+                        if remaining is not None and remaining <= 0:
+                            raise TimeoutError("❌ 等待可用的 WebDriver 逾時")
+                        self._cond.wait(remaining)
+                        continue
+                    self._creating += 1
+
+            for driver in stale:
+                self._quit(driver)
+
+            if candidate is not None:
+                driver, meta = candidate
+                if self._is_healthy(driver):
+                    return self._checkout(driver, meta)
+                log_message("⚠️ 閒置的 WebDriver 已失效，重新建立")
+                self._quit(driver)
+                with self._cond:
+                    self._creating += 1
+            elif stale:
+                # 回收後名額已釋出，重新進入迴圈判斷
+                with self._cond:
+                    self._cond.notify_all()
+                continue
+
+            try:
+                driver, meta = self._create_driver()
+            finally:
+                with self._cond:
+                    self._creating -= 1
+                    self._cond.notify_all()
+            return self._checkout(driver, meta)
+
+    def _checkout(self, driver, meta):
+        with self._cond:
+            meta["uses"] += 1
+            meta["last_used"] = time.time()
+            self._in_use[id(driver)] = meta
+        self._ensure_reaper()
+        return driver
+
+    def release(self, driver, discard=False):
+        """
+        歸還 WebDriver，並重設為空白頁供下次使用
+        :param driver: 由 `acquire()` 借出的 WebDriver
+        :param discard: bool - 是否直接關閉，不放回連線池
+        """
+        with self._cond:
+            meta = self._in_use.pop(id(driver), None)
+
+        if meta is None:
+            # 不是由連線池借出的瀏覽器，直接關閉
+            self._quit(driver)
+            return
+
+        if not discard:
+            try:
+                handles = driver.window_handles
+                for handle in handles[1:]:
+                    driver.switch_to.window(handle)
+                    driver.close()
+                driver.switch_to.window(handles[0])
+                driver.get("about:blank")
+            except Exception as e:
+                log_message(f"⚠️ 重設 WebDriver 失敗，將直接回收: {e}")
+                discard = True
+
+        meta["last_used"] = time.time()
+        with self._cond:
+            keep = not (discard or self._closed or self._is_expired(meta, time.time()))
+            if keep:
+                self._idle.append((driver, meta))
+            self._cond.notify_all()
+        if not keep:
+            self._quit(driver)
+
+    @contextmanager
+    def borrow(self, timeout=None):
+        """
+        以 with 語法借用 WebDriver，發生例外時不放回連線池
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, discard=True)
+            raise
+        else:
+            self.release(driver)
+
+    def warm_up(self, count=1):
+        """
+        預先啟動瀏覽器並放入閒置清單
+        :param count: int - 預先啟動的數量（不超過連線池上限）
+        """
+        drivers = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                drivers.append(self.acquire(timeout=0))
+        except TimeoutError:
+            pass
+        except Exception as e:
+            log_message(f"⚠️ WebDriver 預熱失敗: {e}")
+        # 預熱不算一次使用
+        with self._cond:
+            for driver in drivers:
+                meta = self._in_use.get(id(driver))
+                if meta is not None:
+                    meta["uses"] = max(0, meta["uses"] - 1)
+        for driver in drivers:
+            self.release(driver)
+
+    def evict_idle(self):
+        """關閉所有已閒置逾時或超過使用次數的瀏覽器"""
+        with self._cond:
+            stale = self._pop_expired()
+            if stale:
+                self._cond.notify_all()
+        for driver in stale:
+            log_message("♻️ 回收閒置的 WebDriver")
+            self._quit(driver)
+
+    def _ensure_reaper(self):
+        """啟動背景回收執行緒（每個連線池只啟動一次）"""
+        if not self.idle_timeout:
+            return
+        with self._cond:
+            if self._reaper is not None:
+                return
+            interval = max(5, min(60, self.idle_timeout / 2))
+
+            def reap():
+                while not self._closed:
+                    time.sleep(interval)
+                    self.evict_idle()
+
+            self._reaper = threading.Thread(target=reap, daemon=True)
+            self._reaper.start()
+
+    def stats(self):
+        """回傳連線池目前狀態"""
+        with self._cond:
+            return {
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "creating": self._creating,
+                "max_size": self.max_size,
+            }
+
+    def shutdown(self):
+        """關閉連線池內所有閒置的瀏覽器"""
+        with self._cond:
+            self._closed = True
+            idle = [driver for driver, _ in self._idle]
+            self._idle = []
+            self._cond.notify_all()
+        for driver in idle:
+            self._quit(driver)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """取得行程內共用的 WebDriver 連線池"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool()
+        return _shared_pool
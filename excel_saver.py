@@ -1,11 +1,54 @@
 import os
-import time
 import pandas as pd
 from datetime import datetime
+from config import Config
+from schema import ORDER_SCHEMA, ITEM_SCHEMA, FIELD_SCHEMA
+
+# schema 中宣告為文字的欄位（電話等），讀回 csv 時不可被推斷為數字而失去開頭的 0
+_TEXT_COLUMNS = {
+    column.name: str
+    for schema in (ORDER_SCHEMA, ITEM_SCHEMA, FIELD_SCHEMA)
+    for column in schema.columns
+    if column.dtype == "string"
+}
+
+# 支援的存檔格式：副檔名 -> (寫入函式, 讀取函式)
+# parquet / feather 需要 pyarrow，未安裝時改存為 csv.gz
+FORMATS = {
+    "xlsx": (
+        lambda df, path: df.to_excel(path, index=False),
+        lambda path: pd.read_excel(path, sheet_name="Sheet1"),
+    ),
+    "parquet": (
+        lambda df, path: df.to_parquet(path, index=False),
+        pd.read_parquet,
+    ),
+    "feather": (
+        lambda df, path: df.reset_index(drop=True).to_feather(path),
+        pd.read_feather,
+    ),
+    "csv.gz": (
+        lambda df, path: df.to_csv(path, index=False, compression="gzip"),
+        lambda path: pd.read_csv(path, compression="gzip", dtype=_TEXT_COLUMNS),
+    ),
+}
+COLUMNAR_FORMATS = ("parquet", "feather")
+
+
+def has_pyarrow():
+    """確認是否可使用 parquet / feather 格式"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 class ExcelSaver:
     """
-    統一處理Excel檔案儲存的類別
+    統一處理數據檔案儲存的類別：
+    - 依 `Config.ARTIFACT_FORMATS` 為每種檔名前綴選擇格式，xlsx 只留給需要人工開啟的檔案
+    - `load()` 依副檔名讀回任一格式
     """
     def __init__(self):
         """初始化Excel儲存器"""
@@ -14,50 +57,84 @@ class ExcelSaver:
         # 確保資料目錄存在
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
-    
-    def save(self, df, filename_prefix="data"):
+
+    @staticmethod
+    def format_for(filename_prefix):
         """
-        儲存DataFrame到Excel檔案
+        取得檔名前綴對應的存檔格式
+        :param filename_prefix: str - 檔案名稱前綴
+        :return: str - 格式名稱（同時也是副檔名）
+        """
+        fmt = Config.ARTIFACT_FORMATS.get(
+            filename_prefix, Config.ARTIFACT_FORMATS.get("*", "xlsx")
+        )
+        if fmt not in FORMATS:
+            print(f"⚠️ 未知的存檔格式 '{fmt}'，改用 xlsx")
+            return "xlsx"
+        if fmt in COLUMNAR_FORMATS and not has_pyarrow():
+            return "csv.gz"
+        return fmt
+
+    def save(self, df, filename_prefix="data", fmt=None):
+        """
+        儲存DataFrame到檔案
         :param df: pandas.DataFrame - 要儲存的數據
         :param filename_prefix: str - 檔案名稱前綴
+        :param fmt: str - 存檔格式，預設依 `Config.ARTIFACT_FORMATS` 決定
         :return: tuple - (檔案路徑, 是否成功)
         """
         if not isinstance(df, pd.DataFrame):
             raise ValueError("❌ 儲存失敗，df 不是 DataFrame")
-            
-        # 建立檔案名稱，格式: prefix_YYYYMMDD_HHMMSS.xlsx
+
+        fmt = fmt or self.format_for(filename_prefix)
+        # 建立檔案名稱，格式: prefix_YYYYMMDD_HHMMSS.<格式>
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{filename_prefix}_{timestamp}.xlsx"
+        filename = f"{filename_prefix}_{timestamp}.{fmt}"
         filepath = os.path.join(self.data_dir, filename)
         
+        # 先寫入暫存檔再改名，其他程式不會讀到寫到一半的檔案
+        tmp_path = os.path.join(self.data_dir, f"{filename_prefix}_{timestamp}.tmp.{fmt}")
+
         try:
-            # 儲存到Excel
-            df.to_excel(filepath, index=False)
-            
-            # 確認檔案已成功寫入
-            self._wait_for_file_write(filepath)
+            FORMATS[fmt][0](df, tmp_path)
+            os.replace(tmp_path, filepath)
             
             #print(f"✅ 已成功儲存到: {filepath}")
             return filepath, True
         except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if fmt in COLUMNAR_FORMATS:
+                # 欄位內混合型別時 pyarrow 無法轉換，改存為 csv.gz
+                print(f"⚠️ 無法儲存為 {fmt}，改存為 csv.gz: {e}")
+                return self.save(df, filename_prefix, fmt="csv.gz")
             print(f"❌ 儲存失敗: {e}")
             return None, False
-    
-    def _wait_for_file_write(self, filepath, timeout=10):
+
+    @staticmethod
+    def load(filepath):
         """
-        等待檔案寫入完成
+        依副檔名讀取 `save()` 寫出的任一格式檔案
         :param filepath: str - 檔案路徑
-        :param timeout: int - 超時秒數
-        :return: bool - 是否成功
-        """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                # 嘗試開啟檔案進行讀取
-                with open(filepath, 'rb') as f:
-                    f.read(1)
-                return True
-            except (IOError, PermissionError):
-                # 檔案可能正在寫入，等待一段時間
-                time.sleep(0.5)
-        return False
\ No newline at end of file
+        :return: pandas.DataFrame
+        """
+        for fmt, (_, reader) in FORMATS.items():
+            if filepath.endswith(f".{fmt}"):
+                return reader(filepath)
+        raise ValueError(f"❌ 無法辨識的檔案格式: {filepath}")
+
+    @staticmethod
+    def should_save(filename_prefix):
+        """依 `Config.SAVE_ARTIFACTS` 判斷此前綴的中間產物是否需要存檔"""
+        return "all" in Config.SAVE_ARTIFACTS or filename_prefix in Config.SAVE_ARTIFACTS
+
+    def save_artifact(self, df, filename_prefix="data"):
+        """
+        依 `Config.SAVE_ARTIFACTS` 決定是否儲存中間產物
+        :param df: pandas.DataFrame - 要儲存的數據
+        :param filename_prefix: str - 檔案名稱前綴
+        :return: tuple - (檔案路徑, 是否成功)，設定為不儲存時回傳 (None, False)
+        """
+        if not self.should_save(filename_prefix):
+            return None, False
+        return self.save(df, filename_prefix=filename_prefix)
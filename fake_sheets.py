@@ -0,0 +1,549 @@
+# 行程內的 Google Sheets 替身：不連網即可量測上傳流程的請求數與傳輸量
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import ValueRenderOption, a1_to_rowcol, fill_gaps, numericise_all
+import sheets_client
+
+
+_CELL = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def _col_index(letters):
+    """欄位字母轉為欄號（從 1 開始）"""
+    return a1_to_rowcol(f"{letters.upper()}1")[1]
+
+
+def parse_range(range_name):
+    """
+    解析 A1 範圍（可含工作表名稱、可省略列或欄）
+    :param range_name: str - 例如 "A2"、"A2:L10"、"A5:L"、"1:5000"、"'工作表'!A1"、"'工作表'"
+    :return: tuple - (工作表名稱或 None, 起始列, 起始欄, 結束列或 None, 結束欄或 None)，列欄從 1 開始
+    """
+    title = None
+    if "!" not in range_name and range_name.startswith("'"):
+        # 只有工作表名稱：整個工作表
+        return range_name.strip("'").replace("''", "'"), 1, 1, None, None
+    if "!" in range_name:
+        title, range_name = range_name.rsplit("!", 1)
+        title = title.strip("'").replace("''", "'")
+    start, _, end = range_name.partition(":")
+    start_col, start_row = _CELL.match(start).groups()
+    r0 = int(start_row) if start_row else 1
+    c0 = _col_index(start_col) if start_col else 1
+    if not end:
+        # 單一儲存格；只有欄或只有列時延伸到底
+        r1 = r0 if start_row else None
+        c1 = c0 if start_col else None
+        return title, r0, c0, r1, c1
+    end_col, end_row = _CELL.match(end).groups()
+    r1 = int(end_row) if end_row else None
+    c1 = _col_index(end_col) if end_col else None
+    return title, r0, c0, r1, c1
+
+
+class _Response:
+    """模擬 API 錯誤回應，讓 `APIError` 與真實錯誤有相同的屬性"""
+
+    def __init__(self, status_code, message):
+        self.status_code = status_code
+        self.text = message
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": "FAKE"}}
+
+
+def _size(payload):
+    return len(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class FakeSheetsService:
+    """
+    記錄所有請求的 Google Sheets 替身：
+    - 每個端點的呼叫次數、送出與收到的位元組數
+    - 可模擬每次請求的延遲、隨機錯誤（429 / 503）與每分鐘讀寫配額
+    - `fail_next()` 指定某個端點接下來的請求以哪些狀態碼失敗（測試重試流程）
+    - `on_call` 會在每次請求後收到該次的紀錄，`report()` 回傳累計統計
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=429, read_quota=0,
+                 write_quota=0, seed=0, sleep=time.sleep, clock=time.monotonic, on_call=None):
+        """
+        初始化 FakeSheetsService
+        :param latency: float | tuple - 每次請求的延遲秒數，或 (最小, 最大) 的隨機範圍
+        :param error_rate: float - 請求隨機失敗的機率
+        :param error_status: int - 隨機失敗時的 HTTP 狀態碼
+        :param read_quota: int - 每分鐘讀取請求上限，0 表示不限制
+        :param write_quota: int - 每分鐘寫入請求上限，0 表示不限制
+        :param seed: int - 隨機錯誤與延遲的亂數種子
+        :param sleep: callable - 模擬延遲時使用的等待函式（傳入 `lambda s: None` 則只累計不等待）
+        :param clock: callable - 配額計算使用的時鐘
+        :param on_call: callable - 每次請求後呼叫，參數為該次請求的紀錄
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.quota = {"read": read_quota, "write": write_quota}
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self.clock = clock
+        self.on_call = on_call
+        self.spreadsheets = {}
+        self._failures = {}  # 端點 -> 接下來依序回應的錯誤狀態碼
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清除累計的統計（工作表內容保留）"""
+        with self._lock:
+            self.calls = Counter()
+            self.errors = Counter()
+            self.bytes_sent = 0
+            self.bytes_received = 0
+            self.simulated_seconds = 0.0
+            self.records = []
+            self._windows = {"read": [], "write": []}
+
+    def fail_next(self, endpoint, *statuses):
+        """
+        指定端點接下來的請求依序以這些狀態碼失敗，之後恢復正常
+        :param endpoint: str - 端點名稱（例如 "batch_update"）
+        :param statuses: int - HTTP 狀態碼，例如 429, 503
+        """
+        with self._lock:
+            self._failures.setdefault(endpoint, []).extend(statuses)
+
+    def spreadsheet(self, sheet_id="fake-spreadsheet", worksheet_names=("Sheet1",)):
+        """取得（不存在時建立）指定 ID 的試算表"""
+        with self._lock:
+            if sheet_id not in self.spreadsheets:
+                self.spreadsheets[sheet_id] = FakeSpreadsheet(self, sheet_id, worksheet_names)
+            return self.spreadsheets[sheet_id]
+
+    def worksheet(self, sheet_id="fake-spreadsheet", worksheet_name="Sheet1"):
+        """取得（不存在時建立）指定的工作表"""
+        spreadsheet = self.spreadsheet(sheet_id, (worksheet_name,))
+        try:
+            return spreadsheet.worksheet(worksheet_name, _record=False)
+        except WorksheetNotFound:
+            return spreadsheet.add_worksheet(worksheet_name, 1000, 26, _record=False)
+
+    def _over_quota(self, kind, now):
+        limit = self.quota[kind]
+        if not limit:
+            return False
+        window = self._windows[kind]
+        while window and now - window[0] >= 60:
+            window.pop(0)
+        if len(window) >= limit:
+            return True
+        window.append(now)
+        return False
+
+    def request(self, endpoint, kind, sent=None):
+        """
+        記錄一次請求：套用延遲、配額與隨機錯誤
+        :param endpoint: str - 端點名稱（例如 "values_batch_update"）
+        :param kind: str - "read" 或 "write"
+        :param sent: object - 送出的內容（計算位元組數）
+        :raises APIError: 超過配額或模擬的隨機錯誤
+        :return: dict - 該次請求的紀錄（回應大小由 `received` 補上）
+        """
+        delay = self.rng.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+        with self._lock:
+            record = {
+                "endpoint": endpoint,
+                "kind": kind,
+                "bytes_sent": _size(sent) if sent is not None else 0,
+                "bytes_received": 0,
+                "latency": delay,
+                "status": 200,
+            }
+            if self._failures.get(endpoint):
+                record["status"] = self._failures[endpoint].pop(0)
+            elif self._over_quota(kind, self.clock()):
+                record["status"] = 429
+            elif self.error_rate and self.rng.random() < self.error_rate:
+                record["status"] = self.error_status
+            self.calls[endpoint] += 1
+            self.bytes_sent += record["bytes_sent"]
+            self.simulated_seconds += delay
+            if record["status"] != 200:
+                self.errors[record["status"]] += 1
+            self.records.append(record)
+        if delay:
+            self.sleep(delay)
+        if self.on_call:
+            self.on_call(record)
+        if record["status"] != 200:
+            raise APIError(_Response(record["status"], f"模擬的 {record['status']} 錯誤: {endpoint}"))
+        return record
+
+    def received(self, record, payload):
+        """記錄回應的大小"""
+        size = _size(payload)
+        with self._lock:
+            record["bytes_received"] = size
+            self.bytes_received += size
+        return payload
+
+    def report(self):
+        """
+        回傳累計統計
+        :return: dict - requests、calls（各端點次數）、errors、bytes_sent、bytes_received、simulated_seconds
+        """
+        with self._lock:
+            return {
+                "requests": sum(self.calls.values()),
+                "calls": dict(self.calls),
+                "errors": dict(self.errors),
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "simulated_seconds": round(self.simulated_seconds, 3),
+            }
+
+    @staticmethod
+    def format_report(report):
+        """回傳統計的文字摘要"""
+        calls = "、".join(f"{endpoint} {count}" for endpoint, count in sorted(report["calls"].items()))
+        errors = sum(report["errors"].values())
+        return (
+            f"{report['requests']} 個請求（{calls or '無'}），錯誤 {errors} 次，"
+            f"送出 {report['bytes_sent'] / 1024:.1f} KB、收到 {report['bytes_received'] / 1024:.1f} KB"
+        )
+
+    def client_cache(self):
+        """回傳與 `sheets_client.SheetsClientCache` 介面相同、由本替身提供工作表的快取"""
+        return _FakeClientCache(self)
+
+    @contextmanager
+    def installed(self):
+        """
+        在區塊內以本替身取代共用的 Google Sheets 連線，
+        `GoogleSheetsUploader` 與 `GoogleSheetsManager` 不需修改即可使用
+        """
+        with sheets_client._shared_cache_lock:
+            previous = sheets_client._shared_cache
+            sheets_client._shared_cache = self.client_cache()
+        try:
+            yield self
+        finally:
+            with sheets_client._shared_cache_lock:
+                sheets_client._shared_cache = previous
+
+
+class _FakeClientCache:
+    def __init__(self, service):
+        self.service = service
+        self.stats = {"auth": 0, "metadata": 0}
+
+    def client(self, json_api):
+        return self.service
+
+    def spreadsheet(self, json_api, sheet_id):
+        return self.service.spreadsheet(sheet_id)
+
+    def worksheet(self, json_api, sheet_id, worksheet_name):
+        return self.service.worksheet(sheet_id, worksheet_name)
+
+    def worksheets(self, json_api, sheet_id):
+        spreadsheet = self.service.spreadsheet(sheet_id)
+        return {worksheet.title: worksheet for worksheet in spreadsheet._worksheets}
+
+    def add_worksheet(self, json_api, sheet_id, worksheet_name, rows, cols):
+        return self.service.spreadsheet(sheet_id).add_worksheet(worksheet_name, rows, cols)
+
+    def invalidate(self, sheet_id=None):
+        pass
+
+
+class FakeSpreadsheet:
+    """
+    試算表替身
+    """
+
+    def __init__(self, service, sheet_id, worksheet_names):
+        self.service = service
+        self.id = sheet_id
+        self.title = sheet_id
+        self._worksheets = []
+        for title in worksheet_names:
+            self.add_worksheet(title, 1000, 26, _record=False)
+
+    def worksheets(self, exclude_hidden=False):
+        record = self.service.request("fetch_sheet_metadata", "read")
+        self.service.received(record, [worksheet.title for worksheet in self._worksheets])
+        return list(self._worksheets)
+
+    def worksheet(self, title, _record=True):
+        if _record:
+            self.service.request("fetch_sheet_metadata", "read")
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows, cols, index=None, _record=True):
+        if _record:
+            self.service.request("add_worksheet", "write", {"title": title, "rows": rows, "cols": cols})
+        worksheet = FakeWorksheet(self, title, len(self._worksheets), rows, cols)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def _by_title(self, title):
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise APIError(_Response(400, f"Unable to parse range: {title}"))
+
+    def _by_id(self, sheet_id):
+        for worksheet in self._worksheets:
+            if worksheet.id == sheet_id:
+                return worksheet
+        raise APIError(_Response(400, f"No grid with id: {sheet_id}"))
+
+    def batch_update(self, body):
+        """
+        結構變更請求，目前支援插入與刪除列（`insertDimension` / `deleteDimension`），
+        依序套用；任一請求無效時整批不套用（同 API）
+        """
+        self.service.request("spreadsheet_batch_update", "write", body)
+        changes = []
+        row_counts = {}
+        for request in body.get("requests", []):
+            (kind, options), = request.items()
+            if kind not in ("insertDimension", "deleteDimension"):
+                raise APIError(_Response(400, f"Unsupported request: {kind}"))
+            grid = options["range"]
+            worksheet = self._by_id(grid["sheetId"])
+            start, end = grid["startIndex"], grid["endIndex"]
+            row_count = row_counts.get(worksheet.id, worksheet.row_count)
+            if grid["dimension"] != "ROWS" or not 0 <= start < end:
+                raise APIError(_Response(400, f"Invalid range: {grid}"))
+            if kind == "deleteDimension":
+                if end > row_count:
+                    raise worksheet._grid_error(f"{start + 1}:{end}")
+                row_counts[worksheet.id] = row_count - (end - start)
+            else:
+                if start > row_count or (start == 0 and options.get("inheritFromBefore")):
+                    raise APIError(_Response(400, f"Invalid insert range: {grid}"))
+                row_counts[worksheet.id] = row_count + (end - start)
+            changes.append((kind, worksheet, start, end))
+        for kind, worksheet, start, end in changes:
+            worksheet._shift_rows(kind, start, end)
+        return {"spreadsheetId": self.id, "replies": [{} for _ in changes]}
+
+    def values_batch_update(self, params=None, body=None):
+        """一次寫入多個工作表的範圍（範圍需含工作表名稱）"""
+        body = body or {}
+        self.service.request("values_batch_update", "write", body.get("data"))
+        targets = [
+            (self._by_title(parse_range(item["range"])[0]), item) for item in body.get("data", [])
+        ]
+        for worksheet, item in targets:
+            worksheet._check_grid(item["range"].rpartition("!")[2], item["values"])
+        for worksheet, item in targets:
+            worksheet._write(item["range"], item["values"])
+        return {"spreadsheetId": self.id, "totalUpdatedRanges": len(body.get("data", []))}
+
+    def values_batch_clear(self, params=None, body=None):
+        """一次清除多個工作表的範圍（範圍需含工作表名稱）"""
+        body = body or {}
+        self.service.request("values_batch_clear", "write", body.get("ranges"))
+        targets = [
+            (self._by_title(parse_range(range_name)[0]), range_name)
+            for range_name in body.get("ranges", [])
+        ]
+        for worksheet, range_name in targets:
+            worksheet._check_range(range_name.rpartition("!")[2] if "!" in range_name else "A1")
+        for worksheet, range_name in targets:
+            worksheet._clear(range_name)
+        return {"spreadsheetId": self.id}
+
+
+class FakeWorksheet:
+    """
+    工作表替身：以二維清單保存儲存格的值（RAW 寫入，原值保存）
+    """
+
+    def __init__(self, spreadsheet, title, sheet_id, rows=1000, cols=26):
+        self.spreadsheet = spreadsheet
+        self.service = spreadsheet.service
+        self.title = title
+        self.id = sheet_id
+        self.row_count = rows
+        self.col_count = cols
+        self.cells = []
+        self._lock = threading.Lock()  # SheetsWriter 會由多個執行緒同時寫入
+
+    def __repr__(self):
+        return f"<FakeWorksheet {self.title!r} id:{self.id}>"
+
+    # 內部儲存格操作（不記錄請求）
+    def _grid_error(self, range_name):
+        return APIError(_Response(
+            400,
+            f"Range ({self.title}!{range_name}) exceeds grid limits. "
+            f"Max rows: {self.row_count}, max columns: {self.col_count}",
+        ))
+
+    def _check_grid(self, range_name, values):
+        """寫入範圍超出工作表格線時，與 API 相同回應 400（附加列的端點除外）"""
+        _, r0, c0, _, _ = parse_range(range_name)
+        last_row = r0 + len(values) - 1
+        last_col = c0 + max((len(row) for row in values), default=1) - 1
+        if last_row > self.row_count or last_col > self.col_count:
+            raise self._grid_error(range_name)
+
+    def _check_range(self, range_name):
+        """讀取或清除的範圍超出格線時回應 400（省略結束列或欄的範圍只檢查起點）"""
+        _, r0, c0, r1, c1 = parse_range(range_name)
+        if (
+            r0 > self.row_count
+            or c0 > self.col_count
+            or (r1 is not None and r1 > self.row_count)
+            or (c1 is not None and c1 > self.col_count)
+        ):
+            raise self._grid_error(range_name)
+
+    def _write(self, range_name, values, expand=False):
+        with self._lock:
+            self._write_cells(range_name, values)
+            if expand:
+                self.row_count = max(self.row_count, len(self.cells))
+                self.col_count = max(self.col_count, max((len(row) for row in self.cells), default=0))
+
+    def _write_cells(self, range_name, values):
+        _, r0, c0, _, _ = parse_range(range_name)
+        for i, row in enumerate(values):
+            index = r0 - 1 + i
+            while len(self.cells) <= index:
+                self.cells.append([])
+            cells = self.cells[index]
+            for j, value in enumerate(row):
+                col = c0 - 1 + j
+                while len(cells) <= col:
+                    cells.append("")
+                cells[col] = "" if value is None else value
+
+    def _clear(self, range_name):
+        _, r0, c0, r1, c1 = parse_range(range_name)
+        with self._lock:
+            for index in range(r0 - 1, min(len(self.cells), r1 or len(self.cells))):
+                cells = self.cells[index]
+                for col in range(c0 - 1, min(len(cells), c1 or len(cells))):
+                    cells[col] = ""
+
+    def _shift_rows(self, kind, start, end):
+        """插入或刪除列（索引從 0 開始、不含結尾），後面的列往下或往上移"""
+        with self._lock:
+            if kind == "deleteDimension":
+                del self.cells[start:end]
+                self.row_count -= end - start
+            else:
+                if start < len(self.cells):
+                    self.cells[start:start] = [[] for _ in range(end - start)]
+                self.row_count += end - start
+
+    def _values(self):
+        """目前的內容，去除結尾的空白列與空白儲存格（同 API 的回應）"""
+        rows = []
+        for row in self.cells:
+            end = len(row)
+            while end and row[end - 1] == "":
+                end -= 1
+            rows.append(row[:end])
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    # gspread.Worksheet 的端點
+    def clear(self):
+        self.service.request("clear", "write")
+        self.cells = []
+
+    def append_row(self, values, value_input_option="RAW", **kwargs):
+        self.service.request("append_row", "write", values)
+        self._write(f"A{len(self._values()) + 1}", [values], expand=True)
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        self.service.request("append_rows", "write", values)
+        self._write(f"A{len(self._values()) + 1}", values, expand=True)
+
+    def update(self, range_name, values=None, **kwargs):
+        if isinstance(range_name, list):
+            # gspread 5 也接受 update(values, range_name)
+            range_name, values = values or "A1", range_name
+        self.service.request("update", "write", values)
+        self._check_grid(range_name, values)
+        self._write(range_name, values)
+        return {"updatedRange": range_name}
+
+    def batch_update(self, data, **kwargs):
+        self.service.request("batch_update", "write", data)
+        for item in data:
+            self._check_grid(item["range"], item["values"])
+        for item in data:
+            self._write(item["range"], item["values"])
+        return {"totalUpdatedRanges": len(data)}
+
+    def batch_clear(self, ranges):
+        self.service.request("batch_clear", "write", ranges)
+        for range_name in ranges:
+            self._check_range(range_name)
+        for range_name in ranges:
+            self._clear(range_name)
+
+    def resize(self, rows=None, cols=None):
+        self.service.request("resize", "write", [rows, cols])
+        with self._lock:
+            if rows is not None:
+                self.row_count = rows
+                del self.cells[rows:]
+            if cols is not None:
+                self.col_count = cols
+                for row in self.cells:
+                    del row[cols:]
+
+    def add_rows(self, rows):
+        self.resize(rows=self.row_count + rows)
+
+    def delete_rows(self, start_index, end_index=None):
+        self.service.request("delete_rows", "write", [start_index, end_index])
+        end_index = end_index or start_index
+        del self.cells[start_index - 1:end_index]
+        self.row_count -= end_index - start_index + 1
+
+    def get_values(self, range_name=None, value_render_option=None, **kwargs):
+        record = self.service.request("get_values", "read", range_name)
+        if range_name:
+            self._check_range(range_name)
+        rows = self._values()
+        if range_name:
+            _, r0, c0, r1, c1 = parse_range(range_name)
+            rows = [row[c0 - 1:c1] for row in rows[r0 - 1:r1]]
+            while rows and not rows[-1]:
+                rows.pop()
+        if value_render_option != ValueRenderOption.unformatted:
+            rows = [["" if value == "" else str(value) for value in row] for row in rows]
+        return self.service.received(record, fill_gaps(rows) if rows else [])
+
+    def get_all_values(self, **kwargs):
+        return self.get_values(**kwargs)
+
+    def get_all_records(self, empty2zero=False, head=1, default_blank="", **kwargs):
+        record = self.service.request("get_all_records", "read")
+        rows = fill_gaps([[str(value) for value in row] for row in self._values()])
+        if len(rows) < head:
+            return self.service.received(record, [])
+        keys = rows[head - 1]
+        records = [
+            dict(zip(keys, numericise_all(row, empty2zero=empty2zero, default_blank=default_blank)))
+            for row in rows[head:]
+        ]
+        return self.service.received(record, records)
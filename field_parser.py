@@ -0,0 +1,158 @@
+import pickle
+import re
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from config import Config
+from schema import FIELD_SCHEMA
+from utils import atomic_write, log_message
+
+
+def _search(pattern, text):
+    """回傳第一個符合的群組，找不到時為 NaN（與 `str.extract` 相同）"""
+    match = pattern.search(text)
+    return match.group(1) if match else np.nan
+
+
+_PHONE = re.compile(r"^(\d{10})")
+_PHONE_PREFIX = re.compile(r"^\d{10}\s*")
+_POSTAL_CODE = re.compile(r"\((\d{3})\)")
+_CITY = re.compile(r"(\D{2,3}市)")
+_AREA = re.compile(r"市(.{1,5})\(")
+
+
+def parse_shipping(text):
+    """拆分 `收件資料`：電話、地址，再由地址取出郵遞區號、縣市、區域"""
+    address = _PHONE_PREFIX.sub("", text)
+    return (
+        _search(_PHONE, text),
+        address,
+        _search(_POSTAL_CODE, address),
+        _search(_CITY, address),
+        _search(_AREA, address),
+    )
+
+
+_MEMBER_NAME = re.compile(r"^(.+)\nID:")
+_MEMBER_ID = re.compile(r"ID: (\d+)")
+_MEMBER_NICKNAME = re.compile(r"當下暱稱: (.+)")
+
+
+def parse_member(text):
+    """拆分 `會員資料`：會員名稱、會員ID、會員暱稱"""
+    return (
+        _search(_MEMBER_NAME, text),
+        _search(_MEMBER_ID, text),
+        _search(_MEMBER_NICKNAME, text),
+    )
+
+
+_LOTTERY_ID = re.compile(r"^(\d+)")
+_LOTTERY_NAME = re.compile(r"-\s([^-\n]+)")
+_LOTTERY_TYPE = re.compile(r"\n(.+)$")
+
+
+def parse_lottery(text):
+    """拆分 `套組資訊`：套組ID、套組名稱、抽獎類型"""
+    return (
+        _search(_LOTTERY_ID, text),
+        _search(_LOTTERY_NAME, text),
+        _search(_LOTTERY_TYPE, text),
+    )
+
+
+# 來源欄位 -> (拆分出的欄位, 解析函式, 是否保存到跨執行的快取)
+FIELD_SPECS = {
+    "收件資料": (["電話", "地址", "郵遞區號", "縣市", "區域"], parse_shipping, False),
+    "會員資料": (["會員名稱", "會員ID", "會員暱稱"], parse_member, True),
+    "套組資訊": (["套組ID", "套組名稱", "抽獎類型"], parse_lottery, True),
+}
+
+# 解析規則改變時快取自動失效
+_CACHE_VERSION = repr([
+    pattern.pattern
+    for pattern in (
+        _PHONE, _PHONE_PREFIX, _POSTAL_CODE, _CITY, _AREA,
+        _MEMBER_NAME, _MEMBER_ID, _MEMBER_NICKNAME,
+        _LOTTERY_ID, _LOTTERY_NAME, _LOTTERY_TYPE,
+    )
+])
+
+
+class FieldParser:
+    """
+    拆分 `收件資料`、`會員資料`、`套組資訊` 的子欄位：
+    - 每個不重複的來源值只解析一次，再依 factorize 的代碼展開回每一列
+    - 會員與套組字串的解析結果保存在 LRU 快取，並寫入檔案供下次執行使用
+    """
+
+    def __init__(self, cache_path=None, cache_size=None):
+        """
+        初始化 FieldParser
+        :param cache_path: str - 快取檔案路徑
+        :param cache_size: int - 快取最多保留的字串數
+        """
+        self.cache_path = cache_path or Config.FIELD_CACHE_PATH
+        self.cache_size = Config.FIELD_CACHE_SIZE if cache_size is None else cache_size
+        self.cache = self._load_cache()
+        self.hits = 0
+        self.misses = 0
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return OrderedDict()
+        except Exception as e:
+            log_message(f"⚠️ 欄位解析快取無法讀取: {e}")
+            return OrderedDict()
+        if data.get("version") != _CACHE_VERSION:
+            return OrderedDict()
+        return OrderedDict(data["entries"])
+
+    def save_cache(self):
+        """將快取寫入檔案（先寫暫存檔再取代）"""
+        if not self.cache_size:
+            return
+        data = {"version": _CACHE_VERSION, "entries": list(self.cache.items())}
+        atomic_write(self.cache_path, lambda f: pickle.dump(data, f))
+
+    def _parse_value(self, column, text, parse, cached):
+        if not isinstance(text, str):
+            # 非文字（缺值）沒有可拆分的內容
+            return (np.nan,) * len(FIELD_SPECS[column][0])
+        if not cached or not self.cache_size:
+            return parse(text)
+
+        key = (column, text)
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return result
+        self.misses += 1
+        result = parse(text)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def parse(self, series, column):
+        """
+        拆分一個來源欄位
+        :param series: pd.Series - 來源欄位數據
+        :param column: str - 來源欄位名稱（`FIELD_SPECS` 的鍵）
+        :return: pd.DataFrame - 拆分出的欄位，索引與 `series` 相同
+        """
+        fields, parse, cached = FIELD_SPECS[column]
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+        # 最後一列留給缺值（代碼 -1）
+        parsed = np.empty((len(uniques) + 1, len(fields)), dtype=object)
+        for i, text in enumerate(uniques):
+            parsed[i] = self._parse_value(column, text, parse, cached)
+        parsed[-1] = np.nan
+
+        values = parsed[codes]
+        return FIELD_SCHEMA.apply(pd.DataFrame(values, columns=fields, index=series.index))
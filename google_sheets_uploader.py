@@ -1,7 +1,8 @@
-import gspread
 import pandas as pd
-from google.oauth2.service_account import Credentials
-import os
+from config import Config
+from sheet_diff import DiffUploader, row_keys
+from sheets_client import get_sheets_client
+from sheets_writer import SheetsWriter
 
 class GoogleSheetsUploader:
     """
@@ -23,12 +24,12 @@ class GoogleSheetsUploader:
     def authenticate(self):
         """ 驗證 Google Sheets API 並連線 """
         try:
-            if not os.path.exists(self.json_api):
-                raise FileNotFoundError(f"❌ Google API 憑證不存在: {self.json_api}")
-
-            creds = Credentials.from_service_account_file(self.json_api, scopes=["https://www.googleapis.com/auth/spreadsheets"])
-            self.client = gspread.authorize(creds)
-            self.sheet = self.client.open_by_key(self.sheet_id).worksheet(self.worksheet_name)
+            if self.sheet is not None:
+                return  # 已連線，重複使用同一個工作表
+            # 共用連線：整個行程只驗證一次、只讀取一次試算表中繼資料
+            sheets_client = get_sheets_client()
+            self.client = sheets_client.client(self.json_api)
+            self.sheet = sheets_client.worksheet(self.json_api, self.sheet_id, self.worksheet_name)
             print("✅ 成功連線至 Google Sheets")
         except Exception as e:
             print(f"❌ Google Sheets 連線失敗: {e}")
@@ -49,8 +50,8 @@ class GoogleSheetsUploader:
 
         try:
             self.authenticate()  # 確保 API 連線
-            df = df.fillna("")  # ✅ 避免 NaN 值導致上傳錯誤
-            values = [df.columns.tolist()] + df.values.tolist()  # ✅ 加入標題列
+            rows = self.to_values(df)  # ✅ 避免 NaN 值導致上傳錯誤
+            values = [df.columns.tolist()] + rows  # ✅ 加入標題列
 
             """
             # **取得 Google Sheets 現有數據範圍**            
@@ -68,15 +69,36 @@ class GoogleSheetsUploader:
             """
             
 
+            writer = SheetsWriter(self.sheet)  # **切塊寫入，遇到配額限制時退避重試**
+            if Config.SHEET_DIFF_UPLOAD and "訂單ID" in df.columns:
+                # **只寫入與上次上傳不同的列**
+                uploader = DiffUploader(self.sheet, write_ranges=writer.write_ranges)
+                report = uploader.upload(df.columns.tolist(), row_keys(df), rows)
+                print(f"✅ 資料成功上傳至 Google Sheets（{DiffUploader.format_report(report)}）")
+                print(f"📊 寫入統計: {SheetsWriter.format_report(writer.report)}")
+                return
+
             # **如果需要清除 Google Sheets 數據，請取消註解以下程式碼**
+            DiffUploader(self.sheet).discard_snapshot()
             self.sheet.clear()  # **清除 Google Sheets 內所有數據**
             self.sheet.append_row(df.columns.tolist())  # **重新寫入標題**
-            self.sheet.update("A2", df.values.tolist())  # **從 A2 開始寫入數據**
+            writer.write_ranges([{"range": "A2", "values": rows}])  # **從 A2 開始寫入數據**
             
             print("✅ 資料成功上傳至 Google Sheets")
+            print(f"📊 寫入統計: {SheetsWriter.format_report(writer.report)}")
         except Exception as e:
             print(f"❌ 上傳失敗: {e}")
 
+    @staticmethod
+    def to_values(df):
+        """
+        將 DataFrame 轉為上傳用的二維清單：缺值轉為空字串，
+        類別與可為空整數等欄位一律轉回一般的 Python 值
+        :param df: pd.DataFrame - 要上傳的數據
+        :return: list[list] - 每列的值
+        """
+        return df.astype(object).where(df.notna(), "").values.tolist()
+
     def delete_first_row(self):
         """
         刪除 Google Sheets 第一行
@@ -88,6 +110,7 @@ class GoogleSheetsUploader:
 
         try:
             self.sheet.delete_rows(1)  # 刪除第一行
+            DiffUploader(self.sheet).discard_snapshot()  # 列位置已改變
             print("✅ 成功刪除 Google Sheets 第一行")
         except Exception as e:
             print(f"❌ 刪除第一行失敗: {e}")
\ No newline at end of file
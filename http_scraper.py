@@ -0,0 +1,302 @@
+# 不使用瀏覽器，直接以 HTTP 抓取後台訂單頁面
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+from lxml import html as lxml_html
+from config import Config
+from excel_saver import ExcelSaver
+from order_table_scraper import OrderTableScraper
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
+from pagination import page_url, page_count_from_html, crawl_pages, merge_page_results
+from utils import log_message
+
+
+_BLOCK_TAGS = {
+    "address", "article", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "ol", "p", "pre", "section", "table", "tbody", "thead", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "noscript", "template"}
+_WHITESPACE = re.compile(r"\s+")
+
+
+def inner_text(element):
+    """
+    近似瀏覽器 `innerText` 的文字內容：
+    原始 HTML 的空白會被壓縮，<br> 與區塊元素才會形成換行
+    :param element: lxml 元素
+    :return: str - 去除前後空白的文字
+    """
+    parts = []
+
+    def walk(el, root=False):
+        tag = el.tag if isinstance(el.tag, str) else ""
+        if tag in _SKIP_TAGS and not root:
+            if el.tail:
+                parts.append(_WHITESPACE.sub(" ", el.tail))
+            return
+        if tag == "br":
+            parts.append("\n")
+        elif tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if el.text and tag:
+            parts.append(_WHITESPACE.sub(" ", el.text))
+        for child in el:
+            walk(child)
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if el.tail and not root:
+            parts.append(_WHITESPACE.sub(" ", el.tail))
+
+    walk(element, root=True)
+    lines = (line.strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+class HttpOrderScraper:
+    """
+    以 requests 取得伺服器渲染的後台頁面，並用 lxml 解析成與
+    OrderTableScraper 相同格式的 DataFrame：
+    - 以表單登入（或沿用快取的登入 Cookie）
+    - 解析訂單表格列
+    - 依面板的 data-url 取得非同步載入的商品表格，或直接讀取頁面內嵌的面板內容
+    """
+
+    HEAD_COLUMNS = OrderTableScraper.HEAD_COLUMNS
+    INNER_COLUMNS = OrderTableScraper.INNER_COLUMNS
+    PANEL_INDEX = 2  # 每筆訂單的第三個摺疊面板為商品明細
+
+    def __init__(self, session=None, session_cache=None, max_workers=None, timeout=None,
+                 login_url=None):
+        """
+        初始化 HttpOrderScraper
+        :param session: requests.Session - 可自行提供（例如測試用）
+        :param session_cache: SessionCache 物件，提供時會與瀏覽器模式共用登入 Cookie
+        :param max_workers: int - 同時抓取面板內容的連線數
+        :param timeout: float - 每個請求的逾時秒數
+        :param login_url: str - 登入頁網址，預設為 `Config.LOGIN_URL`
+        """
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", Config.HTTP_USER_AGENT)
+        self.session_cache = session_cache
+        self.max_workers = max_workers or Config.HTTP_MAX_WORKERS
+        self.timeout = timeout or Config.HTTP_TIMEOUT
+        self.login_url = login_url or Config.LOGIN_URL
+        self.saver = ExcelSaver()
+
+    @staticmethod
+    def is_login_page(response):
+        """判斷回應是否為登入頁（登入狀態失效時後台會導向登入頁）"""
+        if "/auth/login" in response.url:
+            return True
+        return 'name="username"' in response.text and 'type="password"' in response.text
+
+    def _get(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def restore_cookies(self, cookies):
+        """
+        將 `driver.get_cookies()` 格式的 Cookie 寫入 HTTP 工作階段
+        """
+        for cookie in cookies or []:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+
+    def export_cookies(self):
+        """
+        匯出與 `driver.get_cookies()` 相同格式的 Cookie，供瀏覽器模式共用
+        """
+        cookies = []
+        for cookie in self.session.cookies:
+            data = {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": bool(cookie.secure),
+                "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+            }
+            if cookie.expires:
+                data["expiry"] = int(cookie.expires)
+            cookies.append(data)
+        return cookies
+
+    def ensure_login(self, login_url, username, password, target_url):
+        """
+        確保已登入，並回傳 `target_url` 的回應
+        :return: requests.Response - 目標頁面的回應
+        """
+        if self.session_cache is not None:
+            self.restore_cookies(self.session_cache.load(username))
+
+        response = self._get(target_url)
+        if not self.is_login_page(response):
+            log_message("✅ HTTP 模式沿用既有登入狀態")
+            return response
+
+        # 登入頁表單內的隱藏欄位（例如 CSRF `_token`）需一併送出
+        login_page = response if "/auth/login" in response.url else self._get(login_url)
+        doc = lxml_html.fromstring(login_page.text)
+        forms = doc.xpath('//form[.//input[@name="username"]]')
+        payload = {}
+        action = login_url
+        if forms:
+            for field in forms[0].xpath('.//input[@type="hidden"][@name]'):
+                payload[field.get("name")] = field.get("value", "")
+            if forms[0].get("action"):
+                action = urljoin(login_page.url, forms[0].get("action"))
+        payload.update({"username": username, "password": password, "remember": "1"})
+
+        self.session.post(
+            action, data=payload, timeout=self.timeout, headers={"Referer": login_page.url}
+        ).raise_for_status()
+
+        response = self._get(target_url)
+        if self.is_login_page(response):
+            raise RuntimeError("❌ HTTP 模式登入失敗，請檢查帳號密碼或網頁狀態")
+
+        if self.session_cache is not None:
+            self.session_cache.save(self.export_cookies(), username)
+        log_message("✅ HTTP 模式登入成功")
+        return response
+
+    def parse_orders(self, page_html, base_url):
+        """
+        解析訂單表格
+        :param page_html: str - 訂單頁 HTML
+        :param base_url: str - 訂單頁網址，用於解析相對路徑
+        :return: tuple - (訂單列清單, 面板清單 [(訂單ID, 面板 ID, 面板網址)], lxml 文件)
+        """
+        doc = lxml_html.fromstring(page_html)
+        tables = doc.xpath("//table")
+        if not tables:
+            return [], [], doc
+
+        order_id_index = self.HEAD_COLUMNS.index("訂單ID")
+        orders = []
+        panels = []
+        for row in tables[0].xpath("./tbody/tr | ./tr"):
+            cells = row.xpath("./th | ./td")
+            if len(cells) != len(self.HEAD_COLUMNS) or not row.xpath("./td"):
+                continue
+            values = [inner_text(cell) for cell in cells]
+            orders.append(values)
+
+            toggles = row.xpath('.//*[starts-with(@data-target, "#grid-collapse-")]')
+            if len(toggles) > self.PANEL_INDEX:
+                toggle = toggles[self.PANEL_INDEX]
+                url = toggle.get("data-url")
+                panels.append(
+                    (
+                        values[order_id_index],
+                        toggle.get("data-target")[1:],
+                        urljoin(base_url, url) if url else None,
+                    )
+                )
+        return orders, panels, doc
+
+    @staticmethod
+    def _panel_html(response):
+        """非同步面板可能回傳 HTML 或包著 HTML 的 JSON"""
+        if "json" in response.headers.get("Content-Type", ""):
+            try:
+                data = response.json()
+            except json.JSONDecodeError:
+                return response.text
+            if isinstance(data, dict):
+                for key in ("data", "html", "content"):
+                    if isinstance(data.get(key), str):
+                        return data[key]
+        return response.text
+
+    @staticmethod
+    def parse_panel_items(element, order_id):
+        """
+        解析面板內的商品表格
+        :param element: lxml 元素 - 面板或面板內容
+        :param order_id: str - 所屬訂單 ID
+        :return: list - 商品列，欄位順序同 `INNER_COLUMNS`
+        """
+        items = []
+        # 非同步面板可能只回傳 <table> 片段，此時傳入的元素本身就是表格
+        for row in element.xpath("descendant-or-self::table//tbody/tr"):
+            cells = row.xpath("./td")
+            if not cells:
+                continue
+            texts = [inner_text(cell) for cell in cells[:7]]
+            texts += [""] * (7 - len(texts))
+            images = cells[0].xpath(".//img/@src")
+            items.append([order_id, images[0] if images else ""] + texts[1:7])
+        return items
+
+    def fetch_table_data(self, url=None, save=True, on_page=None):
+        """
+        登入並抓取訂單列與面板商品列
+        :param url: str - 訂單頁網址，預設為 `Config.WAIT_ORDER_URL`
+        :param save: bool - 是否另外儲存 head_data / inner_data 檔案
+        :param on_page: callable - 指定時依頁碼順序將每頁的 (訂單, 商品) 交給
+                        on_page(head, inner) 處理，不合併保留（見 `StreamingProcessor.add_page`）
+        :return: tuple - (訂單 DataFrame, 商品 DataFrame)，指定 on_page 時為空的 DataFrame
+        """
+        url = url or Config.WAIT_ORDER_URL
+        response = self.ensure_login(self.login_url, Config.USERNAME, Config.PASSWORD, url)
+        head_df, inner_df, page_count = self.scrape_response(response)
+        if on_page is not None:
+            on_page(head_df, inner_df)
+            head_df, inner_df = head_df.iloc[:0], inner_df.iloc[:0]
+
+        # 其餘分頁以多條連線同時抓取，結果依頁碼順序合併
+        if page_count > 1:
+            log_message(f"📄 共 {page_count} 頁訂單，並行抓取其餘分頁")
+            urls = [page_url(url, page) for page in range(2, page_count + 1)]
+
+            def fetch_page(link):
+                return self.scrape_response(self._get(link))[:2]
+
+            if on_page is not None:
+                crawl_pages(urls, [fetch_page] * Config.PAGE_CONCURRENCY,
+                            on_page=lambda page: on_page(*page))
+            else:
+                pages = crawl_pages(urls, [fetch_page] * Config.PAGE_CONCURRENCY)
+                head_df, inner_df = merge_page_results([(head_df, inner_df)] + pages)
+
+        if save and on_page is None:
+            self.saver.save_artifact(head_df, filename_prefix="head_data")
+            self.saver.save_artifact(inner_df, filename_prefix="inner_data")
+        return head_df, inner_df
+
+    def scrape_response(self, response):
+        """
+        由已取得的訂單頁回應解析訂單與商品
+        :param response: requests.Response - 訂單頁回應
+        :return: tuple - (訂單 DataFrame, 商品 DataFrame, 總頁數)
+        """
+        if self.is_login_page(response):
+            raise RuntimeError("❌ 登入狀態已失效，無法抓取訂單頁")
+        orders, panels, doc = self.parse_orders(response.text, response.url)
+
+        def load_panel(panel):
+            order_id, panel_id, panel_url = panel
+            if panel_url:
+                panel_html = self._panel_html(self._get(panel_url))
+                if not panel_html.strip():
+                    return []
+                return self.parse_panel_items(lxml_html.fromstring(panel_html), order_id)
+            inline = doc.xpath(f'//*[@id="{panel_id}"]')
+            return self.parse_panel_items(inline[0], order_id) if inline else []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(load_panel, panels))
+
+        items = [item for panel_items in results for item in panel_items]
+        head_df = ORDER_SCHEMA.to_frame(orders)
+        inner_df = ITEM_SCHEMA.to_frame(items)
+        return head_df, inner_df, page_count_from_html(doc)
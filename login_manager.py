@@ -9,14 +9,16 @@ class LoginManager:
     """
     負責處理網站登入功能
     """
-    def __init__(self, driver, max_retries=2):
+    def __init__(self, driver, max_retries=2, session_cache=None):
         """
         初始化 LoginManager
         :param driver: Selenium WebDriver 物件
         :param max_retries: 最大登入嘗試次數
+        :param session_cache: SessionCache 物件，提供時會沿用上次登入的 Cookie
         """
         self.driver = driver
         self.max_retries = max_retries
+        self.session_cache = session_cache
 
     def login(self, url, username, password):
         """
@@ -25,7 +27,12 @@ class LoginManager:
         print("📌 打開登入頁面")
         self.driver.get(url)
         self.driver.maximize_window()
+        return self.submit_credentials(username, password)
 
+    def submit_credentials(self, username, password):
+        """
+        在目前的登入頁面輸入帳號密碼並送出
+        """
         retries = 0
         while retries < self.max_retries:
             try:
@@ -53,6 +60,63 @@ class LoginManager:
 
         raise RuntimeError("❌ 登入失敗，請檢查帳號密碼或網頁狀態")
 
+    def ensure_login(self, url, username, password, target_url):
+        """
+        確保已登入並停留在 `target_url`：
+        先還原快取的 Cookie 並直接開啟目標頁面，只有登入狀態失效時才執行表單登入
+        :param url: str - 登入頁面網址
+        :param target_url: str - 登入後要前往的頁面，同時作為登入狀態的檢查頁
+        :return: bool - 是否沿用了既有的登入狀態
+        """
+        if self.session_cache is not None:
+            self.restore_cookies(self.session_cache.load(username))
+
+        self.driver.get(target_url)
+        if self.is_session_valid():
+            print("✅ 沿用既有登入狀態")
+            return True
+
+        # 登入狀態失效時，後台會導向登入頁，直接在該頁送出表單即可
+        if self.driver.find_elements(By.NAME, "username"):
+            self.submit_credentials(username, password)
+        else:
+            self.login(url, username, password)
+
+        if self.session_cache is not None:
+            self.session_cache.save(self.driver.get_cookies(), username)
+        self.driver.get(target_url)
+        return False
+
+    def restore_cookies(self, cookies):
+        """
+        透過 DevTools 協定寫入 Cookie，不需要先開啟該網域的頁面
+        :param cookies: list[dict] - `driver.get_cookies()` 格式的 Cookie
+        """
+        if not cookies:
+            return
+        params = []
+        for cookie in cookies:
+            param = {
+                key: cookie[key]
+                for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+                if key in cookie
+            }
+            if "expiry" in cookie:
+                param["expires"] = cookie["expiry"]
+            params.append(param)
+        try:
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+        except Exception as e:
+            logging.warning(f"⚠️ 還原登入狀態失敗: {e}")
+
+    def is_session_valid(self):
+        """
+        檢查目前頁面是否為已登入狀態（未被導向登入頁）
+        """
+        if "/auth/login" in self.driver.current_url:
+            return False
+        return not self.driver.find_elements(By.NAME, "username")
+
     def check_login_success(self):
         """
         確保登入成功，檢查是否進入主頁
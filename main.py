@@ -1,17 +1,16 @@
-from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from config import Config
 from login_manager import LoginManager
-from web_scraper_1 import WebScraper1
-from web_scraper_2 import WebScraper2
-from web_scraper_3 import WebScraper3
+from session_cache import SessionCache
+from order_table_scraper import OrderTableScraper
+from http_scraper import HttpOrderScraper
 from panel_expander import PanelExpander
-from data_processor import DataCleaner
+from page_waiter import PageWaiter
 from data_processor import DataMerger
+from stream_processor import StreamingProcessor
 from google_sheets_uploader import GoogleSheetsUploader
+from sheet_partition import PartitionUploader
 import time
 import os
 import pandas as pd
@@ -21,21 +20,28 @@ import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 from excel_saver import ExcelSaver
+from artifact_writer import ArtifactWriter, get_artifact_writer
+from order_snapshot import OrderSnapshot
+from driver_pool import get_driver_pool
+from resource_blocker import ResourceBlocker
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
+from pagination import PAGE_COUNT_SCRIPT, page_url, crawl_pages, merge_page_results
+from functools import partial
 
 
 class MainProcess:
     """
     主程式，負責執行完整流程：
-    1. 初始化 WebDriver
-    2. 登入網站
-    3. 抓取數據
-    4. 清理與處理數據
+    1. 登入網站
+    2. 抓取數據（HTTP 模式，或從連線池借用 WebDriver）
+    3. 清理數據
+    4. 合併與處理數據
     5. 上傳數據至 Google Sheets
     """
 
     def __init__(self, progress_callback=None):
         """
-        初始化 WebDriver
+        初始化主流程
 
         Args:
             progress_callback: 進度回報的回調函數，格式為 callback(progress, message)
@@ -47,42 +53,19 @@ class MainProcess:
         os.makedirs("data", exist_ok=True)
         os.makedirs("logs", exist_ok=True)
 
-        # 回報進度：初始化
-        self.report_progress(5, "正在初始化 WebDriver...")
-
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--headless=new")  # 在 Render 上必須使用無頭模式
-        options.add_argument("--disable-gpu")  # 避免 GPU 相關問題
-        options.add_argument("--no-sandbox")  # 避免 sandbox 問題
-        options.add_argument("--disable-dev-shm-usage")  # 限制共享內存使用
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        options.add_experimental_option(
-            "prefs", {"credentials_enable_service": False}
-        )  # 禁用密碼儲存
-        options.add_argument("--disable-notifications")  # 禁用通知
-        options.add_experimental_option(
-            "excludeSwitches", ["enable-automation"]
-        )  # 移除自動化軟體提示
-        options.add_argument("--blink-settings=imagesEnabled=false")
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
-        # self.driver = webdriver.Chrome(options=options)
-
-        # 初始化所有模組
-        self.login_manager = LoginManager(self.driver)
-        self.scraper1 = WebScraper1(self.driver)
-        self.scraper2 = WebScraper2(self.driver)
-        self.scraper3 = WebScraper3(self.driver)
-        self.panel_expander = PanelExpander(self.driver)
+        # 瀏覽器在需要時才向連線池借用，HTTP 模式完全不啟動瀏覽器
+        self.driver_pool = get_driver_pool()
+        self.driver = None
+        self.session_cache = SessionCache() if Config.SESSION_CACHE_ENABLED else None
+        self.panel_status = {}  # 訂單ID -> 摺疊面板載入狀態（瀏覽器模式）
+
         # 初始化 Google Sheets 上傳工具
         self.uploader = GoogleSheetsUploader(
             Config.JSON_API, Config.SHEET_ID, Config.WORKSHEET_NAME
         )
-        # 初始化 ExcelSaver
+        # 初始化 ExcelSaver，中間產物交由共用的背景執行緒存檔（只追蹤這次執行交付的檔案）
         self.saver = ExcelSaver()
+        self.writer = get_artifact_writer().start_run()
 
         # 回報進度：初始化完成
         self.report_progress(10, "初始化完成，準備開始爬蟲...")
@@ -93,89 +76,242 @@ class MainProcess:
             self.progress_callback(progress, message)
         log_message(message)
 
+    def scrape(self, orders_url, stream=None):
+        """
+        依 `Config.SCRAPER_BACKEND` 選擇抓取方式，HTTP 模式失敗時改用 Selenium
+        :param orders_url: str - 訂單列表網址
+        :param stream: StreamingProcessor - 指定時每頁抓取後直接交給它處理，不保留完整的抓取結果
+        :return: tuple - (訂單 DataFrame, 商品 DataFrame)，指定 stream 時為空的 DataFrame
+        """
+        if Config.SCRAPER_BACKEND == "http":
+            try:
+                return self.scrape_with_http(orders_url, stream)
+            except Exception as e:
+                self.report_progress(25, f"⚠️ HTTP 模式抓取失敗，改用瀏覽器: {e}")
+                if stream is not None:
+                    stream.reset()
+        return self.scrape_with_selenium(orders_url, stream)
+
+    def save_scraped(self, head_data, inner_data, stream):
+        """存下完整的抓取結果（逐頁處理時沒有保留，不存檔）"""
+        if stream is None:
+            self.writer.submit(head_data, filename_prefix="head_data")
+            self.writer.submit(inner_data, filename_prefix="inner_data")
+
+    def scrape_with_http(self, orders_url, stream=None):
+        """不啟動瀏覽器，直接以 HTTP 抓取訂單與折疊面板數據"""
+        self.report_progress(15, "正在以 HTTP 模式登入並抓取訂單...")
+        scraper = HttpOrderScraper(session_cache=self.session_cache)
+        head_data, inner_data = scraper.fetch_table_data(
+            orders_url, save=False, on_page=stream.add_page if stream else None
+        )
+        self.save_scraped(head_data, inner_data, stream)
+        self.report_progress(65, "訂單與折疊面板數據抓取完成！")
+        return head_data, inner_data
+
+    def scrape_with_selenium(self, orders_url, stream=None):
+        """以瀏覽器登入、展開摺疊面板並抓取數據，多頁時以多個瀏覽器並行抓取"""
+        self.report_progress(12, "正在取得 WebDriver...")
+        if self.driver is None:
+            self.driver = self.driver_pool.acquire()
+        blocker = ResourceBlocker(self.driver)
+        blocker.reset_report()
+        network_reports = []
+
+        head_data, inner_data, page_count = self.scrape_page_with_driver(
+            self.driver, orders_url, report=True
+        )
+        if stream is not None:
+            stream.add_page(head_data, inner_data)
+            head_data, inner_data = head_data.iloc[:0], inner_data.iloc[:0]
+
+        if page_count > 1:
+            self.report_progress(55, f"正在並行抓取其餘 {page_count - 1} 頁訂單...")
+            urls = [page_url(orders_url, page) for page in range(2, page_count + 1)]
+            # 額外的瀏覽器只在連線池有空位時借用，不足時由現有的瀏覽器依序處理
+            extra_drivers = []
+            wanted = min(Config.PAGE_CONCURRENCY, len(urls) + 1) - 1
+            for _ in range(wanted):
+                try:
+                    extra_drivers.append(self.driver_pool.acquire(timeout=0))
+                except TimeoutError:
+                    break
+                ResourceBlocker(extra_drivers[-1]).reset_report()
+            if len(extra_drivers) < wanted:
+                log_message(
+                    f"⚠️ 連線池沒有空閒的瀏覽器，分頁改以 {len(extra_drivers) + 1} 個瀏覽器抓取"
+                    f"（PAGE_CONCURRENCY={Config.PAGE_CONCURRENCY}）"
+                )
+            try:
+                workers = [
+                    partial(self.scrape_page_with_driver, driver)
+                    for driver in [self.driver] + extra_drivers
+                ]
+                if stream is not None:
+                    pages = crawl_pages(urls, workers, on_page=lambda page: stream.add_page(*page[:2]))
+                else:
+                    pages = crawl_pages(urls, workers)
+                network_reports += [ResourceBlocker(driver).report() for driver in extra_drivers]
+            finally:
+                for driver in extra_drivers:
+                    self.driver_pool.release(driver)
+            if stream is None:
+                head_data, inner_data = merge_page_results(
+                    [(head_data, inner_data)] + [page[:2] for page in pages]
+                )
+
+        if Config.RESOURCE_REPORT:
+            network = ResourceBlocker.merge_reports([blocker.report()] + network_reports)
+            log_message(f"🌐 網路用量（{blocker.profile}）: {ResourceBlocker.format_report(network)}")
+
+        self.save_scraped(head_data, inner_data, stream)
+        self.report_progress(65, "訂單與折疊面板數據抓取完成！")
+        return head_data, inner_data
+
+    def scrape_page_with_driver(self, driver, url, report=False):
+        """
+        以指定的瀏覽器抓取一頁訂單
+        :param driver: Selenium WebDriver 物件
+        :param url: str - 訂單分頁網址
+        :param report: bool - 是否回報進度（只有主要頁面回報）
+        :return: tuple - (訂單 DataFrame, 商品 DataFrame, 總頁數)
+        """
+        progress = self.report_progress if report else (lambda progress, message: None)
+        login_manager = LoginManager(driver, session_cache=self.session_cache)
+        panel_expander = PanelExpander(driver)
+        waiter = PageWaiter(driver)
+        scraper = OrderTableScraper(driver)
+
+        # 登入網站並前往待處理訂單頁面（優先沿用快取的登入狀態）
+        progress(15, "正在登入網站...")
+        reused = login_manager.ensure_login(
+            Config.LOGIN_URL,
+            Config.USERNAME,
+            Config.PASSWORD,
+            url,
+        )
+        progress(20, "沿用登入狀態！" if reused else "登入成功！")
+        progress(25, "已開啟待處理訂單頁面...")
+        if not waiter.wait_for_orders_table():
+            # 篩選後沒有訂單（例如增量模式期間內沒有更新），不需展開面板
+            progress(50, "沒有符合條件的訂單")
+            return ORDER_SCHEMA.to_frame([]), ITEM_SCHEMA.to_frame([]), 1
+        page_count = driver.execute_script(PAGE_COUNT_SCRIPT)
+
+        # 分批展開每組訂單的第三個摺疊面板，並追蹤每筆訂單的載入狀態
+        progress(30, "正在展開訂單詳細資訊...")
+        panel_status = panel_expander.expand_panels_tracked(
+            waiter, OrderTableScraper.HEAD_COLUMNS.index("訂單ID")
+        )
+        self.panel_status.update(panel_status)
+        failed = [order_id for order_id, state in panel_status.items() if state == "failed"]
+        unknown = [order_id for order_id, state in panel_status.items() if state == "unknown"]
+        if failed:
+            progress(40, f"⚠️ 訂單詳細資訊展開完成，但有 {len(failed)} 筆訂單的面板未載入: {failed}")
+        elif unknown:
+            progress(40, f"⚠️ 訂單詳細資訊展開完成，但無法確認 {len(unknown)} 筆訂單的面板是否載入")
+        else:
+            progress(40, "訂單詳細資訊展開完成！")
+        log_message(f"⏱️ 頁面等待時間: {waiter.report()}")
+
+        # 一次抓取訂單數據與折疊面板數據
+        progress(50, "正在抓取訂單與折疊面板數據...")
+        head_data, inner_data = scraper.fetch_table_data(save=False)
+        return head_data, inner_data, page_count
+
+    def process(self, head_data, inner_data, stream=None):
+        """
+        合併並處理抓取到的數據
+        :param stream: StreamingProcessor - 抓取時已逐頁處理的分塊，指定時直接取出結果
+        :return: pd.DataFrame - 處理後的數據
+        """
+        # 抓取時已依 schema 只保留需要的欄位並轉換型別，直接進行合併；
+        # 全為空值的欄位不再移除，讓上傳的欄位固定（差異更新比對表頭、拆分欄位時都需要）
+        self.report_progress(80, "正在合併數據...")
+        if stream is not None:
+            df_final = stream.result()
+            self.report_merge(stream.merge_report)
+        elif Config.STREAM_CHUNK_ORDERS and "訂單ID" in inner_data.columns:
+            processor = StreamingProcessor(Config.STREAM_CHUNK_ORDERS)
+            df_final = processor.process(head_data, inner_data)
+            self.report_merge(processor.merge_report)
+        else:
+            merger = DataMerger(head_data, inner_data)
+            df_final = merger.process_all()
+            self.report_merge(merger.merge_report)
+
+        if not isinstance(df_final, pd.DataFrame):
+            raise TypeError("❌ df_final 不是 DataFrame，可能發生變數覆蓋")
+        return df_final
+
+    def report_merge(self, report):
+        """記錄合併時對應不到的訂單，並與摺疊面板的載入狀態交叉比對"""
+        if not report or not report["unmatched_orders"]:
+            return
+        unloaded = [
+            order_id
+            for order_id in report["unmatched_orders"]
+            if self.panel_status.get(str(order_id), "loaded") != "loaded"
+        ]
+        log_message(
+            f"⚠️ {len(report['unmatched_orders'])} 筆訂單缺少商品資料，"
+            f"其中 {len(unloaded)} 筆的摺疊面板未載入: {unloaded}"
+        )
+
+    def upload_partitions(self, df_final):
+        """依 `Config.SHEET_PARTITION_COLUMNS` 拆分數據，一次寫入多個工作表"""
+        try:
+            counts = PartitionUploader(Config.JSON_API, Config.SHEET_ID).upload(df_final)
+            summary = "、".join(f"{name} {rows} 列" for name, rows in counts.items())
+            self.report_progress(95, f"✅ 分頁上傳完成: {summary}")
+        except Exception as e:
+            self.report_progress(95, f"❌ 分頁上傳失敗: {e}")
+
     def run(self):
         """執行完整的數據處理流程"""
         try:
             self.report_progress(10, "🚀 開始執行數據處理流程...")
 
-            # 登入網站
-            self.report_progress(15, "正在登入網站...")
-            self.login_manager.login(Config.LOGIN_URL, Config.USERNAME, Config.PASSWORD)
-            self.report_progress(20, "登入成功！")
-
-            # 前往待處理訂單頁面
-            self.report_progress(25, "正在前往待處理訂單頁面...")
-            self.driver.get(Config.WAIT_ORDER_URL)
-            time.sleep(5)
-
-            # 抓取訂單數據
-            self.report_progress(30, "正在抓取訂單數據...")
-            head_data = self.scraper1.fetch_table_data()
-            self.report_progress(35, "訂單數據抓取完成！")
-
-            # 展開所有第三個摺疊面板
-            self.report_progress(40, "正在展開訂單詳細資訊...")
-            self.panel_expander.expand_third_panels_js()
-            time.sleep(3)
-            self.report_progress(45, "訂單詳細資訊展開完成！")
-
-            # 抓取展開後原始數據
-            self.report_progress(50, "正在抓取展開後的原始數據...")
-            self.scraper2.fetch_table_data()
-            self.report_progress(55, "原始數據抓取完成！")
-
-            # 抓取展開折疊面板數據
-            self.report_progress(60, "正在抓取折疊面板數據...")
-            inner_data = self.scraper3.fetch_table_data()
-            self.report_progress(65, "折疊面板數據抓取完成！")
-
-            # 數據清理
-            self.report_progress(70, "正在清理數據...")
-            cleaner1 = DataCleaner(head_data)
-            cleaned_df1 = cleaner1.clean(
-                columns_to_drop=[
-                    "Copy",
-                    "Token",
-                    "訂單狀態",
-                    "編輯備註",
-                    "編輯者",
-                    "訂單物品已處理/總數",
-                    "物流公司",
-                    "操作",
-                ],
-                index_to_drop=[0],
-            )
-            cleaned1_path, _ = self.saver.save(
-                cleaned_df1, filename_prefix="cleaned_data1"
-            )
-
-            cleaner2 = DataCleaner(inner_data)
-            cleaned_df2 = cleaner2.clean(
-                columns_to_drop=["商品圖片", "商品成本", "品項編號"],
-                index_to_drop=[0, 1],
-            )
-            cleaned2_path, _ = self.saver.save(
-                cleaned_df2, filename_prefix="cleaned_data2"
+            # 增量模式：只抓取上次執行後更新過的訂單，再合併回本機快照
+            snapshot = OrderSnapshot() if Config.INCREMENTAL_MODE else None
+            since = snapshot.incremental_since() if snapshot else None
+            run_started = snapshot.now() if snapshot else None
+            if since:
+                self.report_progress(12, f"增量模式：只抓取 {since} 之後更新的訂單")
+                orders_url = OrderSnapshot.incremental_url(Config.WAIT_ORDER_URL, since)
+            else:
+                orders_url = Config.WAIT_ORDER_URL
+
+            # 分塊處理時每頁抓取後立即處理，不保留完整的抓取結果
+            stream = (
+                StreamingProcessor(Config.STREAM_CHUNK_ORDERS) if Config.STREAM_CHUNK_ORDERS else None
             )
-            self.report_progress(75, "數據清理完成！")
-
-            # 數據合併
-            self.report_progress(80, "正在合併數據...")
-            merger = DataMerger(cleaned1_path, cleaned2_path)
-            df_final = merger.process_all()
-
-            if not isinstance(df_final, pd.DataFrame):
-                raise TypeError("❌ df_final 不是 DataFrame，可能發生變數覆蓋")
+            head_data, inner_data = self.scrape(orders_url, stream)
+
+            if (stream.orders if stream else len(head_data)) == 0:
+                if not since:
+                    raise ValueError("❌ 沒有抓取到任何訂單")
+                df_final = None
+                self.report_progress(80, "沒有更新的訂單，沿用快照數據")
+            else:
+                df_final = self.process(head_data, inner_data, stream)
+
+            if snapshot:
+                df_final = OrderSnapshot.merge(
+                    snapshot.load() if since else None, df_final
+                )
+                snapshot.save(df_final, run_started, full_refresh=not since)
 
             # 儲存合併後的數據
-            final_path, _ = self.saver.save(
-                df_final, filename_prefix="final_processed_data"
-            )
+            self.writer.submit(df_final, filename_prefix="final_processed_data")
             self.report_progress(85, "數據合併與處理完成！")
 
             # 上傳數據到 Google Sheets
             self.report_progress(90, "正在上傳數據到 Google Sheets...")
-            self.uploader.upload_to_sheets(df_final)
+            if not Config.SHEET_PARTITION_COLUMNS or Config.SHEET_PARTITION_KEEP_MAIN:
+                self.uploader.upload_to_sheets(df_final)
+            if Config.SHEET_PARTITION_COLUMNS:
+                self.upload_partitions(df_final)
             self.report_progress(100, "✅ 整個流程執行完畢！")
 
             return {
@@ -189,7 +325,15 @@ class MainProcess:
             return {"status": "error", "message": error_message}
 
         finally:
-            self.driver.quit()
+            # 歸還瀏覽器，保留給下一次執行
+            if self.driver is not None:
+                self.driver_pool.release(self.driver)
+                self.driver = None
+
+            # 等待背景存檔完成，記錄每個檔案的寫入時間
+            written = self.writer.flush()
+            if written:
+                log_message(f"💾 中間產物存檔: {ArtifactWriter.format_report(written)}")
 
 
 # 供 Flask 呼叫的主函式
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+
+class OrderKeyedMerger:
+    """
+    以 (`訂單ID`, `品項序號`) 為鍵，將面板商品列合併到展開後的訂單列：
+    - 商品端建立雜湊索引，訂單列逐一查找對應的商品
+    - 回報找不到商品的訂單列與找不到訂單的商品列
+    - 可只合併重新抓取的部分訂單，再覆蓋到既有的結果上
+    """
+
+    def __init__(self, order_column="訂單ID", ordinal_column="品項序號"):
+        """
+        初始化 OrderKeyedMerger
+        :param order_column: str - 訂單 ID 欄位名稱
+        :param ordinal_column: str - 訂單內品項序號的名稱（欄位或索引層級）
+        """
+        self.order_column = order_column
+        self.ordinal_column = ordinal_column
+
+    def _head_ordinals(self, head):
+        """訂單列的品項序號：優先使用展開時記錄的索引層級，否則依訂單內順序編號"""
+        if self.ordinal_column in (head.index.names or []):
+            return head.index.get_level_values(self.ordinal_column).to_numpy()
+        return head.groupby(self.order_column, sort=False).cumcount().to_numpy()
+
+    def build_index(self, items, order_dtype=None):
+        """
+        為商品列建立 (訂單ID, 品項序號) 雜湊索引
+        :param items: pd.DataFrame - 含訂單 ID 欄位的商品列
+        :param order_dtype: 訂單 ID 需轉換成的型別，與訂單端一致才能對應
+        :return: pd.DataFrame - 以鍵為索引的商品列（不含訂單 ID 欄位）
+        """
+        items = items.reset_index(drop=True)
+        order_ids = items[self.order_column]
+        if order_dtype is not None and order_ids.dtype != order_dtype:
+            order_ids = order_ids.astype(order_dtype)
+        ordinals = items.groupby(order_ids, sort=False).cumcount().to_numpy()
+        indexed = items.drop(columns=[self.order_column])
+        indexed.index = pd.MultiIndex.from_arrays(
+            [order_ids.to_numpy(), ordinals], names=[self.order_column, self.ordinal_column]
+        )
+        return indexed
+
+    def merge(self, head, items):
+        """
+        合併訂單列與商品列，訂單列的順序與索引保持不變
+        :param head: pd.DataFrame - 展開後的訂單列
+        :param items: pd.DataFrame - 含訂單 ID 欄位的商品列
+        :return: tuple - (合併後的 DataFrame, 合併報告 dict)
+        """
+        indexed = self.build_index(items, head[self.order_column].dtype)
+        keys = pd.MultiIndex.from_arrays(
+            [head[self.order_column].to_numpy(), self._head_ordinals(head)],
+            names=[self.order_column, self.ordinal_column],
+        )
+        positions = indexed.index.get_indexer(keys)
+
+        # 找不到的鍵（-1）先取第 0 列再整列設為缺值，避免逐列處理
+        matched = positions >= 0
+        if len(indexed):
+            right = indexed.iloc[np.where(matched, positions, 0)].reset_index(drop=True)
+            right.loc[~matched] = np.nan
+        else:
+            right = pd.DataFrame(index=range(len(head)), columns=indexed.columns)
+        right.index = head.index
+
+        merged = pd.concat([head, right], axis=1)
+
+        orphan_mask = np.ones(len(indexed), dtype=bool)
+        orphan_mask[positions[matched]] = False
+        unmatched_rows = keys[~matched]
+        report = {
+            "rows": len(head),
+            "matched_rows": int(matched.sum()),
+            "unmatched_rows": len(unmatched_rows),
+            "unmatched_orders": sorted(set(unmatched_rows.get_level_values(0)), key=str),
+            "orphan_items": int(orphan_mask.sum()),
+            "orphan_orders": sorted(set(indexed.index[orphan_mask].get_level_values(0)), key=str),
+        }
+        return merged, report
+
+    def upsert(self, existing, updated):
+        """
+        以訂單為單位覆蓋：`updated` 中出現的訂單，取代 `existing` 中同一訂單的所有列
+        :param existing: pd.DataFrame - 既有的合併結果
+        :param updated: pd.DataFrame - 重新抓取並合併的訂單
+        :return: tuple - (覆蓋後的 DataFrame, 報告 dict)
+        """
+        updated_orders = pd.unique(updated[self.order_column])
+        replaced = existing[self.order_column].isin(updated_orders)
+        result = pd.concat([existing[~replaced], updated])
+        report = {
+            "replaced_orders": int(existing.loc[replaced, self.order_column].nunique()),
+            "added_orders": len(updated_orders)
+            - int(existing.loc[replaced, self.order_column].nunique()),
+        }
+        return result, report
+
+    def merge_partial(self, existing, head, items):
+        """
+        只合併重新抓取的部分訂單，再覆蓋到既有的合併結果上，其餘訂單不重新計算
+        :param existing: pd.DataFrame - 既有的合併結果
+        :param head: pd.DataFrame - 重新抓取的訂單列（已展開）
+        :param items: pd.DataFrame - 重新抓取的商品列
+        :return: tuple - (覆蓋後的 DataFrame, 合併報告 dict)
+        """
+        merged, report = self.merge(head, items)
+        result, upsert_report = self.upsert(existing, merged)
+        report.update(upsert_report)
+        return result, report
+
+    @staticmethod
+    def merge_reports(reports):
+        """合併多個分塊的合併報告"""
+        merged = {
+            "rows": 0, "matched_rows": 0, "unmatched_rows": 0, "unmatched_orders": [],
+            "orphan_items": 0, "orphan_orders": [],
+        }
+        for report in reports:
+            for key in merged:
+                merged[key] += report[key]
+        return merged
+
+    @staticmethod
+    def format_report(report):
+        """回傳合併報告的文字摘要"""
+        text = f"合併 {report['matched_rows']}/{report['rows']} 列"
+        if report["unmatched_rows"]:
+            text += f"，{report['unmatched_rows']} 列找不到商品（訂單 {report['unmatched_orders']}）"
+        if report["orphan_items"]:
+            text += f"，{report['orphan_items']} 筆商品找不到訂單（訂單 {report['orphan_orders']}）"
+        return text
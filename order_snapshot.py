@@ -0,0 +1,135 @@
+import json
+import os
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pandas as pd
+from config import Config
+from data_processor import DataMerger
+from order_merge import OrderKeyedMerger
+from pagination import set_query_params
+from utils import atomic_write, log_message
+
+
+class OrderSnapshot:
+    """
+    增量模式使用的本機訂單快照：
+    - 保存上次成功執行的 `final_processed_data`
+    - 記錄高水位時間，下次只抓取此時間之後更新過的訂單
+    - 以 `訂單ID` 將新抓取的訂單合併回快照
+    """
+
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, data_path=None, state_path=None):
+        """
+        初始化 OrderSnapshot
+        :param data_path: str - 快照數據檔路徑
+        :param state_path: str - 高水位等狀態檔路徑
+        """
+        self.data_path = data_path or Config.SNAPSHOT_DATA_PATH
+        self.state_path = state_path or Config.SNAPSHOT_STATE_PATH
+        self.timezone = ZoneInfo(Config.SITE_TIMEZONE)
+
+    def now(self):
+        """以後台所在時區回傳目前時間（作為本次執行的高水位候選值）"""
+        return datetime.now(self.timezone)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log_message(f"⚠️ 快照狀態檔無法讀取，將重新完整抓取: {e}")
+            return {}
+
+    def incremental_since(self):
+        """
+        取得增量抓取的起始時間
+        :return: str | None - 起始時間字串，沒有可用快照或快照過舊時為 None（需完整抓取）
+        """
+        state = self._load_state()
+        mark = state.get("high_water_mark")
+        full_at = state.get("full_refresh_at")
+        if not mark or not full_at or not os.path.exists(self.data_path):
+            return None
+
+        full_refresh_at = datetime.strptime(full_at, self.TIME_FORMAT).replace(tzinfo=self.timezone)
+        if self.now() - full_refresh_at > timedelta(hours=Config.INCREMENTAL_FULL_REFRESH_HOURS):
+            return None
+
+        since = datetime.strptime(mark, self.TIME_FORMAT) - timedelta(
+            minutes=Config.INCREMENTAL_OVERLAP_MINUTES
+        )
+        return since.strftime(self.TIME_FORMAT)
+
+    @staticmethod
+    def incremental_url(url, since):
+        """
+        產生只列出 `since` 之後更新過訂單的網址；
+        移除運送狀態篩選，才能得知哪些訂單已離開待處理 / 準備出貨狀態
+        """
+        return set_query_params(
+            url, **{"updated_at[start]": since, "delivery_status[]": None}
+        )
+
+    def load(self):
+        """
+        讀取快照數據
+        :return: pd.DataFrame | None
+        """
+        try:
+            return pd.read_pickle(self.data_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log_message(f"⚠️ 訂單快照無法讀取: {e}")
+            return None
+
+    @staticmethod
+    def merge(snapshot_df, delta_df, active_statuses=None):
+        """
+        以 `訂單ID` 將新抓取的訂單覆蓋到快照上，並移除已不在處理中狀態的訂單
+        :param snapshot_df: pd.DataFrame - 上次的 final_processed_data
+        :param delta_df: pd.DataFrame | None - 本次抓取並處理後的數據
+        :param active_statuses: list[str] - 需保留的運送狀態
+        :return: pd.DataFrame - 合併並重新排序後的數據
+        """
+        active_statuses = active_statuses or Config.INCREMENTAL_ACTIVE_STATUSES
+        has_delta = delta_df is not None and not delta_df.empty
+        if snapshot_df is None and not has_delta:
+            raise ValueError("❌ 沒有快照也沒有新數據可合併")
+        if snapshot_df is None:
+            merged = delta_df
+        elif has_delta:
+            merged, report = OrderKeyedMerger().upsert(snapshot_df, delta_df)
+            log_message(
+                f"🔄 快照更新 {report['replaced_orders']} 筆訂單、新增 {report['added_orders']} 筆"
+            )
+        else:
+            merged = snapshot_df
+
+        merged = merged[merged["運送狀態"].isin(active_statuses)]
+        return DataMerger.sort_frame(merged.reset_index(drop=True))
+
+    def save(self, df, high_water_mark, full_refresh=False):
+        """
+        儲存快照與高水位時間（先寫暫存檔再取代，避免中斷時留下半個檔案）
+        :param df: pd.DataFrame - 合併後的完整數據
+        :param high_water_mark: datetime - 本次抓取開始的時間
+        :param full_refresh: bool - 本次是否為完整抓取
+        """
+        atomic_write(self.data_path, df.to_pickle)
+
+        state = self._load_state()
+        state["high_water_mark"] = high_water_mark.strftime(self.TIME_FORMAT)
+        if full_refresh:
+            state["full_refresh_at"] = high_water_mark.strftime(self.TIME_FORMAT)
+        state["rows"] = len(df)
+        atomic_write(
+            self.state_path,
+            lambda f: json.dump(state, f, ensure_ascii=False),
+            mode="w",
+            encoding="utf-8",
+        )
@@ -0,0 +1,77 @@
+# 一次抓取訂單表格與展開面板數據
+from web_scraper import WebScraper
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
+
+
+class OrderTableScraper(WebScraper):
+    """
+    在單次 execute_script 內同時抓取：
+    - 訂單表格的每一列（不含表頭與展開面板插入的列）
+    - 每個已展開面板內的商品列，並標上所屬的 `訂單ID`
+    取代 WebScraper1 / WebScraper2 / WebScraper3 三次各自走訪表格的做法
+    """
+
+    SCRIPT = """
+        const columnCount = arguments[0];
+        const orderIdIndex = arguments[1];
+        const table = document.querySelector('table');
+        const orders = [];
+        const items = [];
+        if (!table) return {orders: orders, items: items};
+
+        // 訂單列：不在面板內且欄位數與訂單表格一致的列
+        table.querySelectorAll('tbody tr').forEach(row => {
+            if (row.closest('div[id^="grid-collapse-"]')) return;
+            const cells = row.querySelectorAll(':scope > th, :scope > td');
+            if (cells.length !== columnCount || !row.querySelector(':scope > td')) return;
+            orders.push(Array.from(cells).map(cell => cell.innerText.trim()));
+        });
+
+        // 面板商品列：由面板對應的展開按鈕找回所屬訂單列的訂單 ID
+        document.querySelectorAll('div[id^="grid-collapse-"]:not([style*="display: none"])').forEach(panel => {
+            const inner = panel.querySelector('table');
+            if (!inner) return;
+            const toggle = document.querySelector('[data-target="#' + panel.id + '"]');
+            const orderRow = toggle ? toggle.closest('tr') : null;
+            const orderCell = orderRow ? orderRow.querySelectorAll(':scope > th, :scope > td')[orderIdIndex] : null;
+            const orderId = orderCell ? orderCell.innerText.trim() : panel.id.replace('grid-collapse-', '');
+            inner.querySelectorAll('tbody tr').forEach(row => {
+                const cells = row.querySelectorAll('td');
+                if (!cells.length) return;
+                items.push([
+                    orderId,
+                    cells[0]?.querySelector('img')?.src || '',  // 商品圖片 URL
+                    cells[1]?.innerText.trim() || '',           // 商品名稱
+                    cells[2]?.innerText.trim() || '',           // 商品等級
+                    cells[3]?.innerText.trim() || '',           // 商品價格
+                    cells[4]?.innerText.trim() || '',           // 商品成本
+                    cells[5]?.innerText.trim() || '',           // 品項編號
+                    cells[6]?.innerText.trim() || '',           // 是否換回點數
+                ]);
+            });
+        });
+        return {orders: orders, items: items};
+    """
+
+    HEAD_COLUMNS = ORDER_SCHEMA.names
+    INNER_COLUMNS = ITEM_SCHEMA.names
+
+    def fetch_table_data(self, save=True):
+        """
+        抓取訂單列與面板商品列
+        :param save: bool - 是否另外儲存 head_data / inner_data 檔案
+        :return: tuple - (訂單 DataFrame, 商品 DataFrame)，商品 DataFrame 含 `訂單ID` 欄位
+        """
+        data = self.driver.execute_script(
+            self.SCRIPT, len(self.HEAD_COLUMNS), self.HEAD_COLUMNS.index("訂單ID")
+        )
+
+        # 依 schema 只保留需要的欄位並轉換型別
+        head_df = ORDER_SCHEMA.to_frame(data["orders"])
+        inner_df = ITEM_SCHEMA.to_frame(data["items"])
+
+        if save:
+            self.saver.save_artifact(head_df, filename_prefix="head_data")
+            self.saver.save_artifact(inner_df, filename_prefix="inner_data")
+
+        return head_df, inner_df
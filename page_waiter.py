@@ -0,0 +1,141 @@
+import time
+from config import Config
+from utils import log_message
+
+
+# 通用的非同步等待腳本：條件成立時立即回傳，否則以 MutationObserver 監聽 DOM 變化，
+# 直到條件成立或逾時。arguments[0] 為逾時毫秒數，arguments[1] 為條件參數。
+_WAIT_SCRIPT_TEMPLATE = """
+const done = arguments[arguments.length - 1];
+const timeoutMs = arguments[0];
+const params = arguments[1];
+const check = (params) => { %s };
+const start = performance.now();
+let observer = null;
+let timer = null;
+const finish = (ok, state) => {
+    if (observer) observer.disconnect();
+    if (timer) clearTimeout(timer);
+    done({ok: ok, elapsed: performance.now() - start, state: state});
+};
+let state = check(params);
+if (state.ready) { finish(true, state); return; }
+observer = new MutationObserver(() => {
+    state = check(params);
+    if (state.ready) finish(true, state);
+});
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class']
+});
+timer = setTimeout(() => finish(false, check(params)), timeoutMs);
+"""
+
+# 訂單表格已渲染：文件已解析完成且主表格至少有一列資料；
+# 篩選後沒有訂單時，表格只有一列跨欄的「無數據」提示，出現提示或頁面已載入完畢即視為完成（0 列）
+_ORDERS_TABLE_CHECK = """
+    const table = document.querySelector('table');
+    if (!table) return {ready: false, rows: 0};
+    const rows = Array.from(table.querySelectorAll('tbody tr')).filter(row => {
+        if (row.closest('div[id^="grid-collapse-"]')) return false;
+        const cells = row.querySelectorAll(':scope > th, :scope > td');
+        return !(cells.length === 1 && cells[0].hasAttribute('colspan'));
+    }).length;
+    const empty = !!table.querySelector('.empty-grid, .empty-data, tbody td[colspan]');
+    const loaded = document.readyState !== 'loading';
+    return {
+        ready: loaded && (rows > 0 || empty || document.readyState === 'complete'),
+        rows: rows,
+        empty: rows === 0,
+    };
+"""
+
+# 摺疊面板已載入：每個指定的 grid-collapse-* 面板都已插入且 tbody 內有資料列；
+# 未指定面板時，檢查所有已展開的面板
+_PANELS_CHECK = """
+    let panels;
+    if (params && params.length) {
+        panels = params.map(id => [id, document.getElementById(id)]);
+    } else {
+        panels = Array.from(
+            document.querySelectorAll('div[id^="grid-collapse-"]:not([style*="display: none"])')
+        ).map(el => [el.id, el]);
+    }
+    const pending = panels
+        .filter(([id, el]) => !el || !el.querySelector('tbody tr'))
+        .map(([id, el]) => id);
+    return {ready: pending.length === 0, pending: pending, total: panels.length};
+"""
+
+
+class PageWaiter:
+    """
+    以事件驅動的方式等待頁面就緒，取代固定秒數的 sleep：
+    - 使用 execute_async_script 在瀏覽器內監聽 DOM 變化
+    - 條件成立時立即返回，逾時則回報尚未完成的部分
+    - 記錄每次等待花費的時間
+    """
+
+    def __init__(self, driver, deadline=None):
+        """
+        初始化 PageWaiter
+        :param driver: Selenium WebDriver 物件
+        :param deadline: float - 預設的最長等待秒數
+        """
+        self.driver = driver
+        self.deadline = deadline or Config.WAIT_DEADLINE
+        self.timings = {}  # 等待名稱 -> 累計秒數
+
+    def _wait(self, name, check_script, params=None, timeout=None):
+        """
+        在瀏覽器內等待條件成立
+        :return: dict - {"ok": 是否成立, "elapsed": 秒數, "state": 條件回傳的狀態}
+        """
+        timeout = timeout or self.deadline
+        script = _WAIT_SCRIPT_TEMPLATE % check_script
+        start = time.time()
+        # 腳本本身會在 timeout 後回傳，WebDriver 端多保留一些緩衝
+        self.driver.set_script_timeout(timeout + 5)
+        try:
+            result = self.driver.execute_async_script(
+                script, int(timeout * 1000), params
+            )
+        except Exception as e:
+            result = {"ok": False, "state": {"error": str(e), "rows": 0, "pending": params or []}}
+        elapsed = time.time() - start
+        # 同名的等待（例如分批等待面板）累計時間
+        self.timings[name] = round(self.timings.get(name, 0) + elapsed, 3)
+        result["elapsed"] = elapsed
+        return result
+
+    def wait_for_orders_table(self, timeout=None):
+        """
+        等待訂單表格渲染完成
+        :param timeout: float - 最長等待秒數
+        :return: int - 表格資料列數（篩選後沒有訂單時為 0）
+        """
+        result = self._wait("orders_table", _ORDERS_TABLE_CHECK, timeout=timeout)
+        if not result["ok"]:
+            raise TimeoutError(
+                f"❌ 訂單表格在 {result['elapsed']:.1f} 秒內未載入完成: {result['state']}"
+            )
+        return result["state"]["rows"]
+
+    def wait_for_panels(self, panel_ids=None, timeout=None):
+        """
+        等待指定的摺疊面板都載入資料
+        :param panel_ids: list[str] - 面板元素 ID（grid-collapse-*），None 表示所有已展開的面板
+        :param timeout: float - 最長等待秒數
+        :return: list[str] - 逾時仍未載入的面板 ID，全部完成時為空清單
+        """
+        panel_ids = [panel_id for panel_id in (panel_ids or []) if panel_id]
+        result = self._wait("panels", _PANELS_CHECK, params=panel_ids, timeout=timeout)
+        pending = result["state"].get("pending", [])
+        if not result["ok"]:
+            log_message(
+                f"⚠️ 有 {len(pending)} 個摺疊面板在 {result['elapsed']:.1f} 秒內未載入完成: {pending}"
+            )
+        return pending
+
+    def report(self):
+        """回傳等待時間紀錄的文字摘要"""
+        return ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.timings.items())
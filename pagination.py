@@ -0,0 +1,142 @@
+# 訂單列表分頁處理
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import pandas as pd
+
+
+# 在瀏覽器內讀取分頁連結中最大的頁碼
+PAGE_COUNT_SCRIPT = """
+    let maxPage = 1;
+    document.querySelectorAll('.pagination a[href]').forEach(link => {
+        const match = link.getAttribute('href').match(/[?&]page=(\\d+)/);
+        if (match) maxPage = Math.max(maxPage, parseInt(match[1], 10));
+    });
+    return maxPage;
+"""
+
+_PAGE_PARAM = re.compile(r"[?&]page=(\d+)")
+
+
+def set_query_params(url, **params):
+    """
+    設定網址的查詢參數，保留其他參數（包含空值）與原本的順序
+    :param url: str - 原始網址
+    :param params: 要設定的參數，值為 None 時移除該參數
+    :return: str - 新網址
+    """
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in params]
+    query += [(key, str(value)) for key, value in params.items() if value is not None]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def page_url(url, page):
+    """回傳指定頁碼的網址"""
+    return set_query_params(url, page=page)
+
+
+def page_count_from_links(hrefs):
+    """
+    由分頁連結推算總頁數
+    :param hrefs: list[str] - 分頁連結
+    :return: int - 總頁數（至少為 1）
+    """
+    pages = [int(match.group(1)) for href in hrefs for match in [_PAGE_PARAM.search(href or "")] if match]
+    return max(pages, default=1)
+
+
+def page_count_from_html(doc):
+    """
+    由 lxml 文件中的分頁元件推算總頁數
+    :param doc: lxml 文件
+    :return: int - 總頁數
+    """
+    return page_count_from_links(
+        doc.xpath('//*[contains(concat(" ", normalize-space(@class), " "), " pagination ")]//a/@href')
+    )
+
+
+def crawl_pages(urls, workers, on_page=None):
+    """
+    以多個 worker 同時抓取分頁，每個 worker 一次處理一頁
+    （例如每個 worker 綁定一個瀏覽器，或共用同一個 HTTP 工作階段）
+    :param urls: list[str] - 要抓取的分頁網址
+    :param workers: list[callable] - worker(url) 回傳該頁結果，數量即為並行上限
+    :param on_page: callable - 指定時依頁碼順序將每頁結果交給 on_page(result) 處理，
+                    處理後即不再保留（只暫存比前面頁數先完成的頁面）
+    :return: list - 依 `urls` 順序排列的結果（指定 on_page 時為空清單）
+    """
+    results = {}
+    next_index = 0
+    errors = []
+    pending = queue.Queue()
+    emit_lock = threading.Lock()
+    for index, url in enumerate(urls):
+        pending.put((index, url))
+
+    def emit(index, result):
+        nonlocal next_index
+        with emit_lock:
+            results[index] = result
+            while on_page is not None and next_index in results and not errors:
+                on_page(results.pop(next_index))
+                next_index += 1
+
+    def run(worker):
+        while not errors:
+            try:
+                index, url = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                emit(index, worker(url))
+            except Exception as e:
+                errors.append((url, e))
+
+    with ThreadPoolExecutor(max_workers=max(1, len(workers))) as executor:
+        list(executor.map(run, workers[: max(1, len(urls))]))
+
+    if errors:
+        url, error = errors[0]
+        raise RuntimeError(f"❌ 分頁抓取失敗 {url}: {error}") from error
+    if on_page is not None:
+        return []
+    return [results[index] for index in range(len(urls))]
+
+
+def dedupe_page(head, inner, seen):
+    """
+    移除先前頁面已出現過的訂單（分頁期間訂單位置可能移動）
+    :param head: pd.DataFrame - 這一頁的訂單
+    :param inner: pd.DataFrame - 這一頁的商品
+    :param seen: set - 先前頁面的 `訂單ID`，會加入這一頁的新訂單
+    :return: tuple - 只含新訂單的 (訂單 DataFrame, 商品 DataFrame)
+    """
+    keep = ~head["訂單ID"].isin(seen)
+    new_ids = set(head.loc[keep, "訂單ID"])
+    seen.update(new_ids)
+    return head[keep], inner[inner["訂單ID"].isin(new_ids)]
+
+
+def merge_page_results(results):
+    """
+    依頁碼順序合併各頁的 (訂單 DataFrame, 商品 DataFrame)；
+    分頁期間訂單位置可能移動，重複出現的訂單只保留第一次出現的那頁
+    :param results: list[tuple] - 每頁的 (訂單, 商品)
+    :return: tuple - 合併後的 (訂單 DataFrame, 商品 DataFrame)
+    """
+    heads = []
+    inners = []
+    seen = set()
+    for head, inner in results:
+        head, inner = dedupe_page(head, inner, seen)
+        heads.append(head)
+        inners.append(inner)
+    return (
+        pd.concat(heads, ignore_index=True),
+        pd.concat(inners, ignore_index=True),
+    )
@@ -1,8 +1,49 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from config import Config
+from utils import log_message
+
+
+# 找出每組訂單的第三個摺疊面板按鈕，回傳面板 ID 與所屬訂單 ID
+_FIND_TARGETS_SCRIPT = """
+const orderIdIndex = arguments[0];
+const buttons = document.querySelectorAll('.feather.icon-chevrons-right');
+const targets = [];
+for (let i = 0; i < buttons.length; i++) {
+    if ((i + 1) % 3 !== 0) continue; // 只選擇第3個
+    const toggle = buttons[i].closest('[data-target^="#grid-collapse-"]');
+    const row = buttons[i].closest('tr');
+    const cell = row ? row.querySelectorAll(':scope > th, :scope > td')[orderIdIndex] : null;
+    targets.push({
+        panelId: toggle ? toggle.getAttribute('data-target').slice(1) : null,
+        orderId: cell ? cell.innerText.trim() : null,
+    });
+}
+return targets;
+"""
+
+# 點擊指定面板的展開按鈕；onlyMissing 為 true 時，只點擊面板尚未插入頁面的按鈕
+_CLICK_SCRIPT = """
+const panelIds = arguments[0];
+const onlyMissing = arguments[1];
+const clicked = [];
+panelIds.forEach(id => {
+    if (onlyMissing && document.getElementById(id)) return;
+    const toggle = document.querySelector('[data-target="#' + id + '"]');
+    if (!toggle) return;
+    (toggle.querySelector('.feather.icon-chevrons-right') || toggle).click();
+    clicked.push(id);
+});
+return clicked;
+"""
 
 class PanelExpander:
+    """
+    展開訂單的摺疊面板：
+    - expand_third_panels_js：一次點擊所有面板
+    - expand_panels_tracked：分批點擊、追蹤每筆訂單的面板是否載入完成並重試
+    """
     def __init__(self, driver):
         """
         初始化摺疊面板展開模組
@@ -12,29 +53,77 @@ class PanelExpander:
 
     def expand_third_panels_js(self, timeout=10):
         """
-        使用 JavaScript 點擊方式展開每組訂單的第三個摺疊面板，並確保內容加載完成
+        使用 JavaScript 點擊方式展開每組訂單的第三個摺疊面板
         :param timeout: int - 等待展開內容的最大時間（秒）
+        :return: list[str] - 被展開的面板元素 ID（grid-collapse-*），無法辨識時為 None
         """
         #print("📌 正在使用 JavaScript 展開每組的第三個摺疊面板...")
 
         # **修正 JavaScript 語法錯誤**
         script = """
         let buttons = document.querySelectorAll('.feather.icon-chevrons-right');
-        let clickedIndexes = [];
+        let panelIds = [];
         for (let i = 0; i < buttons.length; i++) {
             if ((i + 1) % 3 === 0) { // 只選擇第3個
                 buttons[i].click();
-                clickedIndexes.push(i + 1);
+                // 按鈕外層的 data-target 指向對應的面板，例如 #grid-collapse-123
+                let toggle = buttons[i].closest('[data-target^="#grid-collapse-"]');
+                panelIds.push(toggle ? toggle.getAttribute('data-target').slice(1) : null);
             }
         }
-        return clickedIndexes;
+        return panelIds;
         """
 
         try:
-            clicked_indexes = self.driver.execute_script(script)
-            #print(f"✅ 已點擊第 {clicked_indexes} 個摺疊面板按鈕")
-
-            #print("✅ 所有摺疊面板已展開")
+            panel_ids = self.driver.execute_script(script)
+            #print(f"✅ 已點擊 {len(panel_ids)} 個摺疊面板按鈕")
+            return panel_ids
 
         except Exception as e:
             print(f"❌ JavaScript 執行錯誤: {e}")
+            return []
+
+    def expand_panels_tracked(self, waiter, order_id_index, batch_size=None, max_retries=None, timeout=None):
+        """
+        分批展開每組訂單的第三個摺疊面板，等待每批載入完成後再點擊下一批，
+        逾時的面板會重試
+        :param waiter: PageWaiter 物件，用於等待面板載入
+        :param order_id_index: int - 訂單表格中 `訂單ID` 欄位的位置
+        :param batch_size: int - 每批點擊的面板數
+        :param max_retries: int - 未載入面板的重試次數
+        :param timeout: float - 每批最長等待秒數
+        :return: dict - 訂單ID -> "loaded" / "failed"（無法辨識面板時為 "unknown"）
+        """
+        batch_size = batch_size or Config.PANEL_BATCH_SIZE
+        max_retries = Config.PANEL_MAX_RETRIES if max_retries is None else max_retries
+        timeout = timeout or Config.PANEL_BATCH_TIMEOUT
+
+        targets = self.driver.execute_script(_FIND_TARGETS_SCRIPT, order_id_index)
+        if any(target["panelId"] is None for target in targets):
+            # 無法辨識面板與按鈕的對應時，改用一次全部點擊的方式；
+            # 面板可能尚未插入頁面，等待結束也不代表已載入，因此每筆訂單都標記為 "unknown"
+            log_message("⚠️ 無法辨識摺疊面板 ID，改為一次展開所有面板")
+            waiter.wait_for_panels(self.expand_third_panels_js(), timeout)
+            return {target["orderId"]: "unknown" for target in targets}
+
+        order_ids = {target["panelId"]: target["orderId"] for target in targets}
+        panel_ids = list(order_ids)
+        status = {}
+        for start in range(0, len(panel_ids), batch_size):
+            batch = panel_ids[start:start + batch_size]
+            self.driver.execute_script(_CLICK_SCRIPT, batch, False)
+            pending = waiter.wait_for_panels(batch, timeout)
+
+            # 按鈕點擊未生效（面板未插入）時重新點擊；已插入但仍在載入則繼續等待
+            for attempt in range(max_retries):
+                if not pending:
+                    break
+                clicked = self.driver.execute_script(_CLICK_SCRIPT, pending, True)
+                log_message(
+                    f"🔁 第 {attempt + 1} 次重試 {len(pending)} 個未載入的面板（重新點擊 {len(clicked)} 個）"
+                )
+                pending = waiter.wait_for_panels(pending, timeout)
+
+            for panel_id in batch:
+                status[order_ids[panel_id]] = "failed" if panel_id in pending else "loaded"
+        return status
@@ -0,0 +1,116 @@
+import json
+from config import Config
+from utils import log_message
+
+
+# 各封鎖設定檔對應的網址樣式（Network.setBlockedURLs 支援 * 萬用字元）
+_IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"]
+_FONT_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*fonts.googleapis.com/*", "*fonts.gstatic.com/*",
+]
+_ANALYTICS_PATTERNS = [
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*facebook.net/*", "*connect.facebook.com/*", "*hotjar.com/*", "*clarity.ms/*",
+]
+_CSS_PATTERNS = ["*.css", "*.css?*"]
+
+BLOCK_PROFILES = {
+    "off": [],
+    # 只讀取表格文字，圖片、字型（含圖示字型）與追蹤程式都不需要
+    "default": _IMAGE_PATTERNS + _FONT_PATTERNS + _ANALYTICS_PATTERNS,
+    # 連 CSS 也封鎖：版面不再計算，但 innerText 可能包含原本被 CSS 隱藏的文字
+    "aggressive": _IMAGE_PATTERNS + _FONT_PATTERNS + _ANALYTICS_PATTERNS + _CSS_PATTERNS,
+}
+
+
+class ResourceBlocker:
+    """
+    透過 DevTools 協定在網路層封鎖不需要的資源，並統計每次執行的請求數與傳輸量
+    """
+
+    def __init__(self, driver, profile=None):
+        """
+        初始化 ResourceBlocker
+        :param driver: Selenium WebDriver 物件（需為 Chrome）
+        :param profile: str - 封鎖設定檔名稱，預設為 `Config.BLOCK_PROFILE`
+        """
+        self.driver = driver
+        self.profile = profile or Config.BLOCK_PROFILE
+        if self.profile not in BLOCK_PROFILES:
+            raise ValueError(f"❌ 未知的資源封鎖設定檔: {self.profile}")
+        self.patterns = BLOCK_PROFILES[self.profile] + Config.BLOCK_EXTRA_PATTERNS
+
+    def apply(self):
+        """啟用網路層封鎖，設定會保留到瀏覽器分頁關閉為止"""
+        if not self.patterns:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        except Exception as e:
+            log_message(f"⚠️ 無法啟用資源封鎖: {e}")
+
+    def _drain_log(self):
+        """讀出（並清空）效能日誌，未開啟效能日誌時回傳空清單"""
+        if not Config.RESOURCE_REPORT:
+            return []
+        try:
+            return self.driver.get_log("performance")
+        except Exception:
+            return []
+
+    def reset_report(self):
+        """清空先前累積的網路紀錄，從現在開始統計"""
+        self._drain_log()
+
+    def report(self):
+        """
+        統計自上次 `reset_report()` 後的網路請求
+        :return: dict - 請求數、傳輸位元組數、被封鎖的請求數（依資源類型）
+        """
+        requests = {}
+        finished_bytes = 0
+        blocked = {}
+        for entry in self._drain_log():
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                requests[params.get("requestId")] = params.get("type", "Other")
+            elif method == "Network.loadingFinished":
+                finished_bytes += params.get("encodedDataLength", 0)
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                resource_type = params.get("type") or requests.get(params.get("requestId"), "Other")
+                blocked[resource_type] = blocked.get(resource_type, 0) + 1
+        return {
+            "requests": len(requests),
+            "bytes": int(finished_bytes),
+            "blocked_requests": sum(blocked.values()),
+            "blocked_by_type": blocked,
+        }
+
+    @staticmethod
+    def merge_reports(reports):
+        """合併多個瀏覽器的統計結果"""
+        merged = {"requests": 0, "bytes": 0, "blocked_requests": 0, "blocked_by_type": {}}
+        for report in reports:
+            for key in ("requests", "bytes", "blocked_requests"):
+                merged[key] += report[key]
+            for resource_type, count in report["blocked_by_type"].items():
+                merged["blocked_by_type"][resource_type] = (
+                    merged["blocked_by_type"].get(resource_type, 0) + count
+                )
+        return merged
+
+    @staticmethod
+    def format_report(report):
+        """回傳統計結果的文字摘要"""
+        by_type = ", ".join(f"{name}={count}" for name, count in report["blocked_by_type"].items())
+        return (
+            f"請求 {report['requests']} 個、傳輸 {report['bytes'] / 1024:.0f} KB，"
+            f"封鎖 {report['blocked_requests']} 個請求" + (f"（{by_type}）" if by_type else "")
+        )
@@ -0,0 +1,150 @@
+import pandas as pd
+from utils import log_message
+
+
+# 數值欄位轉換前移除的千分位、空白與貨幣符號（例如 "NT$1,200"、"1,200 元"）
+_NUMBER_NOISE = r"NT\$|\$|元|,|\s"
+
+
+class ColumnSpec:
+    """
+    描述來源表格中的一個欄位
+    """
+
+    def __init__(self, name, dtype="string", keep=True, datetime_format=None):
+        """
+        :param name: str - 欄位名稱
+        :param dtype: str - "string"（保留原始文字）、"Int64" 或 "datetime"
+        :param keep: bool - 是否保留；不保留的欄位只用來對齊位置，不會進入 DataFrame
+        :param datetime_format: str - dtype 為 "datetime" 時的時間格式
+        """
+        self.name = name
+        self.dtype = dtype
+        self.keep = keep
+        self.datetime_format = datetime_format
+
+    def cast(self, series):
+        """將欄位轉為宣告的型別，無法轉換的值設為缺值（並記錄警告）"""
+        if self.dtype == "Int64":
+            if series.dtype == "Int64":
+                return series
+            values = series
+            if not pd.api.types.is_numeric_dtype(series):
+                values = series.astype("string").str.replace(_NUMBER_NOISE, "", regex=True)
+            result = pd.to_numeric(
+                values, errors="coerce", dtype_backend="numpy_nullable"
+            ).astype("Int64")
+        elif self.dtype == "datetime":
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return series
+            result = pd.to_datetime(series, format=self.datetime_format, errors="coerce")
+        else:
+            return series
+        self._warn_lost(series, result)
+        return result
+
+    def _warn_lost(self, series, result):
+        """原本有值、轉換後變成缺值的儲存格（例如來源格式改變）記錄數量與範例"""
+        missing = result.isna().to_numpy() & series.notna().to_numpy()
+        if not missing.any():
+            return
+        lost = pd.Series(missing, index=series.index) & (series.astype("string").str.strip() != "")
+        count = int(lost.sum())
+        if count:
+            samples = series[lost].astype(str).unique()[:3].tolist()
+            log_message(
+                f"⚠️ 欄位 {self.name} 有 {count} 個值無法轉為 {self.dtype}，已設為缺值，例如: {samples}"
+            )
+
+
+class TableSchema:
+    """
+    描述一個來源表格：欄位順序（對應抓取到的儲存格位置）、保留哪些欄位及其型別，
+    在原始資料列轉為 DataFrame 時一次套用
+    """
+
+    def __init__(self, columns):
+        """
+        :param columns: list[ColumnSpec] - 依來源表格順序排列的欄位
+        """
+        self.columns = columns
+        self.names = [column.name for column in columns]  # 所有來源欄位（依位置）
+        self.kept = [column.name for column in columns if column.keep]  # 保留的欄位
+
+    def to_frame(self, rows):
+        """
+        將抓取到的原始資料列轉為 DataFrame，只保留需要的欄位並轉換型別
+        :param rows: list[list] - 依 `names` 順序排列的資料列
+        :return: pd.DataFrame
+        """
+        df = pd.DataFrame(rows, columns=self.names)
+        return self.apply(df[self.kept])
+
+    def apply(self, df):
+        """
+        對已存在的欄位轉換型別（其他欄位維持不變）
+        :param df: pd.DataFrame - 需轉換的數據
+        :return: pd.DataFrame - 轉換後的新 DataFrame
+        """
+        df = df.copy()
+        for column in self.columns:
+            if column.name in df.columns:
+                df[column.name] = column.cast(df[column.name])
+        return df
+
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 訂單列表的欄位（順序同後台表格）
+ORDER_SCHEMA = TableSchema([
+    ColumnSpec("Copy", keep=False),
+    ColumnSpec("訂單ID", "Int64"),
+    ColumnSpec("最終售價", "Int64"),
+    ColumnSpec("收件資料"),
+    ColumnSpec("收件人電話"),
+    ColumnSpec("會員資料"),
+    ColumnSpec("Token", keep=False),
+    ColumnSpec("訂單狀態", keep=False),
+    ColumnSpec("運送狀態"),
+    ColumnSpec("編輯備註", keep=False),
+    ColumnSpec("備註"),
+    ColumnSpec("編輯者", keep=False),
+    ColumnSpec("套組資訊"),
+    ColumnSpec("店家"),
+    ColumnSpec("訂單物品已處理/總數", keep=False),
+    ColumnSpec("物流公司", keep=False),
+    ColumnSpec("領取方式"),
+    ColumnSpec("物品數量"),
+    ColumnSpec("建立時間", "datetime", datetime_format=TIME_FORMAT),
+    ColumnSpec("更新時間", "datetime", datetime_format=TIME_FORMAT),
+    ColumnSpec("操作", keep=False),
+])
+
+# 訂單摺疊面板內商品表格的欄位（順序同面板表格）
+PANEL_SCHEMA = TableSchema([
+    ColumnSpec("商品圖片", keep=False),
+    ColumnSpec("商品名稱"),
+    ColumnSpec("商品等級"),
+    ColumnSpec("商品價格", "Int64"),
+    ColumnSpec("商品成本", keep=False),
+    ColumnSpec("品項編號", keep=False),
+    ColumnSpec("是否換回點數"),
+])
+
+# 商品列：面板欄位前加上所屬訂單的 `訂單ID`
+ITEM_SCHEMA = TableSchema([ColumnSpec("訂單ID", "Int64")] + PANEL_SCHEMA.columns)
+
+# 由 `收件資料`、`會員資料`、`套組資訊` 拆分出的欄位
+FIELD_SCHEMA = TableSchema([
+    ColumnSpec("電話"),
+    ColumnSpec("地址"),
+    ColumnSpec("郵遞區號"),
+    ColumnSpec("縣市"),
+    ColumnSpec("區域"),
+    ColumnSpec("會員名稱"),
+    ColumnSpec("會員ID", "Int64"),
+    ColumnSpec("會員暱稱"),
+    ColumnSpec("套組ID", "Int64"),
+    ColumnSpec("套組名稱"),
+    ColumnSpec("抽獎類型"),
+])
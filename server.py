@@ -1,6 +1,8 @@
 from flask import Flask, request, jsonify, render_template
 import os
 from main import main_process
+from config import Config
+from driver_pool import get_driver_pool
 import logging
 from datetime import datetime
 import threading
@@ -21,6 +23,10 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# 伺服器啟動時在背景預熱 WebDriver，讓第一次執行也不必冷啟動
+if Config.DRIVER_WARMUP and Config.SCRAPER_BACKEND != "http":
+    threading.Thread(target=get_driver_pool().warm_up, daemon=True).start()
+
 # 設定密鑰，用於驗證請求
 API_KEY = os.environ.get("API_KEY", "your_default_api_key_here")
 
@@ -0,0 +1,83 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from config import Config
+from utils import log_message
+
+
+class SessionCache:
+    """
+    將登入後的 Cookie 加密保存在本機，讓下一次執行可直接沿用登入狀態
+    """
+
+    def __init__(self, path=None, secret=None, max_age=None):
+        """
+        初始化 SessionCache
+        :param path: str - 加密檔案路徑
+        :param secret: str - 加密金鑰來源字串，未設定時由帳號密碼推導
+        :param max_age: int - Cookie 最長保存秒數，超過則視為過期
+        """
+        self.path = path or Config.SESSION_CACHE_PATH
+        secret = secret or Config.SESSION_CACHE_KEY or f"{Config.USERNAME}:{Config.PASSWORD}"
+        key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
+        self.fernet = Fernet(key)
+        self.max_age = Config.SESSION_MAX_AGE if max_age is None else max_age
+
+    def save(self, cookies, username=None):
+        """
+        加密並儲存 Cookie
+        :param cookies: list[dict] - `driver.get_cookies()` 的結果
+        :param username: str - 登入帳號，帳號不同時不會沿用
+        """
+        payload = json.dumps(
+            {"username": username, "saved_at": time.time(), "cookies": cookies},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        directory = os.path.dirname(self.path) or "."
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # 每次使用不重複的暫存檔（同時執行的多個行程不會互相覆寫），檔案權限僅限擁有者
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".session-", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.fernet.encrypt(payload))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log_message(f"⚠️ 無法儲存登入狀態: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load(self, username=None):
+        """
+        讀取並解密 Cookie
+        :param username: str - 登入帳號，需與儲存時相同
+        :return: list[dict] | None - Cookie 清單，無可用快取時回傳 None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(self.fernet.decrypt(f.read()).decode("utf-8"))
+        except (OSError, InvalidToken, ValueError) as e:
+            log_message(f"⚠️ 登入狀態快取無法讀取，將重新登入: {e}")
+            self.clear()
+            return None
+
+        if username is not None and data.get("username") != username:
+            return None
+        if self.max_age and time.time() - data.get("saved_at", 0) > self.max_age:
+            return None
+        return data.get("cookies") or None
+
+    def clear(self):
+        """刪除快取檔案"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log_message(f"⚠️ 無法刪除登入狀態快取: {e}")
@@ -0,0 +1,275 @@
+import os
+import pickle
+from gspread.utils import rowcol_to_a1
+from config import Config
+from utils import atomic_write, log_message
+
+
+def row_keys(df):
+    """
+    每一列的鍵 (`訂單ID`, `品項序號`)：優先使用展開時記錄的索引層級，
+    否則依訂單內的順序編號
+    :param df: pd.DataFrame - 處理後的數據
+    :return: list[tuple]
+    """
+    if "品項序號" in (df.index.names or []):
+        ordinals = df.index.get_level_values("品項序號")
+    else:
+        ordinals = df.groupby("訂單ID", sort=False).cumcount()
+    return list(zip(df["訂單ID"].tolist(), [int(ordinal) for ordinal in ordinals]))
+
+
+def ensure_grid(worksheet, rows, cols):
+    """
+    工作表的格線不足時先擴充（寫入超出格線的範圍會被 API 拒絕）
+    :param worksheet: gspread.Worksheet - 工作表
+    :param rows: int - 需要的列數
+    :param cols: int - 需要的欄數
+    """
+    if rows > worksheet.row_count or cols > worksheet.col_count:
+        worksheet.resize(rows=max(rows, worksheet.row_count), cols=max(cols, worksheet.col_count))
+
+
+def _runs(indexes):
+    """將排序後的列位置分成連續區段 [(起點, 終點)]"""
+    runs = []
+    for index in indexes:
+        if runs and index == runs[-1][1] + 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+    return runs
+
+
+def _longest_increasing(values):
+    """
+    最長遞增子序列
+    :param values: list[int] - 互不相同的整數
+    :return: set[int] - 屬於子序列的位置
+    """
+    tails = []  # 長度為 i + 1 的子序列中，結尾值最小者的位置
+    previous = [None] * len(values)
+    for index, value in enumerate(values):
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if values[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        previous[index] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(index)
+        else:
+            tails[low] = index
+    kept = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        kept.add(index)
+        index = previous[index]
+    return kept
+
+
+def _dimension(sheet_id, start, end):
+    """工作表列的範圍（從 0 開始、不含結尾），第 1 列為標題，位置 0 對應索引 1"""
+    return {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start + 1, "endIndex": end + 2}
+
+
+def _shift_row_count(worksheet, delta):
+    """插入 / 刪除列之後更新快取的格線列數（同 gspread 的 `delete_dimension`）"""
+    properties = getattr(worksheet, "_properties", None)
+    if properties is not None:
+        properties["gridProperties"]["rowCount"] += delta
+
+
+class DiffUploader:
+    """
+    以差異方式更新工作表，不再每次清空後整份重寫：
+    - 保存上次上傳的內容與列順序（鍵為 `訂單ID` + `品項序號`）
+    - 被刪除的列以 `deleteDimension` 移除、新增的列以 `insertDimension` 插入到排序後的位置，
+      所有插入 / 刪除在同一個 `batch_update` 請求內完成，其餘的列不需重寫
+    - 排序位置改變的列（例如 `運送狀態` 改變）視為刪除後重新插入
+    - 只寫入新增與內容有異動的列
+    - 差異過大、欄位改變或沒有快照時整份重寫（覆寫後再清除多餘的列，工作表不會出現空白期間）
+    """
+
+    def __init__(self, worksheet, snapshot_path=None, max_ratio=None, write_ranges=None):
+        """
+        初始化 DiffUploader
+        :param worksheet: gspread.Worksheet - 目標工作表
+        :param snapshot_path: str - 上次上傳內容的快照路徑
+        :param max_ratio: float - 需更動的列數超過總列數的此比例時改為整份重寫
+        :param write_ranges: callable - 寫入 [{"range", "values"}] 的函式，預設為 `worksheet.batch_update`
+        """
+        self.worksheet = worksheet
+        self.snapshot_path = snapshot_path or os.path.join(
+            Config.UPLOAD_SNAPSHOT_DIR,
+            f"upload_snapshot_{worksheet.spreadsheet.id}_{worksheet.id}.pkl",
+        )
+        self.max_ratio = Config.SHEET_DIFF_MAX_RATIO if max_ratio is None else max_ratio
+        self.write_ranges = write_ranges or worksheet.batch_update
+
+    def load_snapshot(self):
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log_message(f"⚠️ 上傳快照無法讀取，將整份重寫: {e}")
+            return None
+
+    def save_snapshot(self, header, layout, rows_by_key):
+        """保存本次上傳後的工作表內容（先寫暫存檔再取代）"""
+        data = {"header": header, "layout": layout, "rows": rows_by_key}
+        atomic_write(self.snapshot_path, lambda f: pickle.dump(data, f))
+
+    def discard_snapshot(self):
+        """工作表被其他方式改寫後，快照已不可信，下次上傳整份重寫"""
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+
+    @staticmethod
+    def plan(snapshot, keys, rows):
+        """
+        比對快照與本次數據，決定要刪除、插入與寫入的列
+        :param snapshot: dict - 上次的 {"layout": [鍵], "rows": {鍵: 列}}
+        :param keys: list[tuple] - 本次每一列的鍵（已排序、唯一）
+        :param rows: list[list] - 本次每一列的值
+        :return: dict - 刪除的舊位置、插入的新位置、需寫入的新位置與異動統計
+        """
+        layout = snapshot["layout"]
+        old_rows = snapshot["rows"]
+        new_positions = {key: position for position, key in enumerate(keys)}
+
+        # 兩次都有的列，依舊順序排列時在本次的位置；最長的遞增序列維持原本的相對順序，
+        # 其他的列排序位置已改變，刪除後在新位置重新插入
+        common = [key for key in layout if key in new_positions]
+        kept = _longest_increasing([new_positions[key] for key in common])
+        kept = {common[index] for index in kept}
+
+        deletes = [position for position, key in enumerate(layout) if key not in kept]
+        inserts = [position for position, key in enumerate(keys) if key not in kept]
+        changed = [
+            new_positions[key] for key in kept if old_rows.get(key) != rows[new_positions[key]]
+        ]
+        moved = len(common) - len(kept)
+        return {
+            "deletes": deletes,
+            "inserts": inserts,
+            "writes": sorted(inserts + changed),
+            "changed": len(changed),
+            "inserted": len(inserts) - moved,
+            "deleted": sum(1 for key in layout if key is not None and key not in new_positions),
+            "moved": moved,
+        }
+
+    def upload(self, header, keys, rows):
+        """
+        上傳數據，回傳本次的異動統計
+        :param header: list[str] - 標題列
+        :param keys: list[tuple] - 每一列的鍵（需唯一）
+        :param rows: list[list] - 每一列的值
+        :return: dict - 上傳方式與異動列數
+        """
+        snapshot = self.load_snapshot()
+        unique = len(set(keys)) == len(keys)
+        plan = None
+        if snapshot and unique and snapshot["header"] == header:
+            plan = self.plan(snapshot, keys, rows)
+            touched = len(plan["deletes"]) + len(plan["writes"])
+            if touched > self.max_ratio * max(len(rows), 1):
+                plan = None
+
+        # 寫入途中失敗時工作表只更新了一部分，與快照不再相符；先刪除快照，
+        # 成功寫完才保存新的快照，失敗後的下一次上傳會整份重寫
+        self.discard_snapshot()
+        if plan is None:
+            report = self.rewrite(header, rows, snapshot)
+        else:
+            report = self.apply(plan, rows, len(header))
+
+        # 鍵不唯一時無法比對，不保存快照，下次仍整份重寫
+        if unique:
+            self.save_snapshot(header, keys, dict(zip(keys, rows)))
+        return report
+
+    def rewrite(self, header, rows, snapshot):
+        """整份覆寫，再清除超出新數據範圍的舊列與舊欄（只清除格線內、上次有資料的範圍）"""
+        width = len(header)
+        new_rows = len(rows) + 1
+        if snapshot:
+            old_rows, old_cols = len(snapshot["layout"]) + 1, len(snapshot["header"])
+        else:
+            # 沒有快照時不知道舊數據的範圍，以目前的格線為準
+            old_rows, old_cols = self.worksheet.row_count, self.worksheet.col_count
+        ensure_grid(self.worksheet, new_rows, width)
+        self.write_ranges([{"range": "A1", "values": [header] + rows}])
+
+        clears = []
+        if old_rows > new_rows:
+            clears.append(f"A{new_rows + 1}:{rowcol_to_a1(old_rows, max(width, old_cols))}")
+        if old_cols > width:
+            clears.append(
+                f"{rowcol_to_a1(1, width + 1)}:{rowcol_to_a1(min(new_rows, old_rows), old_cols)}"
+            )
+        if clears:
+            self.worksheet.batch_clear(clears)
+        return {"mode": "rewrite", "rows": len(rows)}
+
+    def apply(self, plan, rows, width):
+        """
+        先在一個請求內刪除與插入列，再寫入新增與有異動的列（連續的列合併為一個範圍）
+        :param plan: dict - `plan()` 的結果
+        :param rows: list[list] - 本次每一列的值（依排序後的順序）
+        :param width: int - 欄數
+        """
+        requests = [
+            # 由下往上刪除，前面的列位置不受影響
+            {"deleteDimension": {"range": _dimension(self.worksheet.id, start, end)}}
+            for start, end in reversed(_runs(plan["deletes"]))
+        ]
+        # 刪除後剩下的列已是本次順序的子序列，由上往下插入即落在排序後的位置
+        requests += [
+            {"insertDimension": {
+                "range": _dimension(self.worksheet.id, start, end),
+                # 第一個數據列不沿用標題列的格式
+                "inheritFromBefore": start > 0,
+            }}
+            for start, end in _runs(plan["inserts"])
+        ]
+        if requests:
+            self.worksheet.spreadsheet.batch_update({"requests": requests})
+            _shift_row_count(self.worksheet, len(plan["inserts"]) - len(plan["deletes"]))
+
+        ensure_grid(self.worksheet, len(rows) + 1, width)
+        data = [
+            {
+                # 工作表第 1 列為標題，位置 0 對應第 2 列
+                "range": f"A{start + 2}:{rowcol_to_a1(end + 2, width)}",
+                "values": rows[start:end + 1],
+            }
+            for start, end in _runs(plan["writes"])
+        ]
+        if data:
+            self.write_ranges(data)
+        return {
+            "mode": "diff",
+            "changed": plan["changed"],
+            "inserted": plan["inserted"],
+            "deleted": plan["deleted"],
+            "moved": plan["moved"],
+            "ranges": len(data),
+            "structural": len(requests),
+        }
+
+    @staticmethod
+    def format_report(report):
+        """回傳上傳結果的文字摘要"""
+        if report["mode"] == "rewrite":
+            return f"整份重寫 {report['rows']} 列"
+        return (
+            f"差異更新：修改 {report['changed']} 列、新增 {report['inserted']} 列、"
+            f"刪除 {report['deleted']} 列、移動 {report['moved']} 列"
+            f"（寫入 {report['ranges']} 個範圍、插入 / 刪除 {report['structural']} 個區段）"
+        )
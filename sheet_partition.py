@@ -0,0 +1,172 @@
+import json
+import os
+import pandas as pd
+from gspread.utils import absolute_range_name
+from config import Config
+from google_sheets_uploader import GoogleSheetsUploader
+from sheet_diff import ensure_grid
+from sheets_client import get_sheets_client
+from sheets_writer import SheetsWriter
+from utils import atomic_write, log_message
+
+
+class SheetPartitioner:
+    """
+    依指定欄位的值將最終數據拆成多份，每份對應一個工作表
+    """
+
+    def __init__(self, columns=None, name_template=None):
+        """
+        初始化 SheetPartitioner
+        :param columns: list[str] - 分組欄位，例如 ["運送狀態", "領取方式"]
+        :param name_template: str - 工作表名稱樣板，`{value}` 為分組值（多個欄位以 "-" 連接）
+        """
+        self.columns = columns if columns is not None else Config.SHEET_PARTITION_COLUMNS
+        self.name_template = name_template or Config.SHEET_PARTITION_NAME
+
+    def worksheet_name(self, values):
+        """分組值轉為工作表名稱，缺值以「未設定」表示"""
+        if not isinstance(values, tuple):
+            values = (values,)
+        value = "-".join("未設定" if pd.isna(value) else str(value) for value in values)
+        return self.name_template.format(value=value)
+
+    def split(self, df):
+        """
+        拆分數據，各分組維持原本的列順序
+        :param df: pd.DataFrame - 最終數據
+        :return: dict - 工作表名稱 -> pd.DataFrame
+        """
+        if not self.columns:
+            raise ValueError("❌ 沒有設定分組欄位")
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"❌ 分組欄位不存在: {missing}")
+        # 類別欄位只列出實際出現的值；分組依第一次出現的順序排列
+        key = self.columns if len(self.columns) > 1 else self.columns[0]
+        groups = df.groupby(key, observed=True, sort=False, dropna=False)
+        return {self.worksheet_name(values): part for values, part in groups}
+
+
+class PartitionUploader:
+    """
+    將拆分後的數據一次寫入多個工作表：
+    - 所有工作表的內容放在同一個 `values_batch_update` 請求（數據超過 `SheetsWriter` 的上限時才切塊）
+    - 記錄每個工作表上次寫入的列數與欄數，這次較少時以空白補滿，不需另外清除
+    - 上次有、這次沒有數據的工作表只保留標題列
+    - 沒有紀錄的既有工作表（第一次執行）先以一個 `values_batch_clear` 請求清空
+    """
+
+    def __init__(self, json_api, sheet_id, partitioner=None, state_path=None):
+        """
+        初始化 PartitionUploader
+        :param json_api: str - Google API 憑證 JSON 路徑
+        :param sheet_id: str - Google 試算表 ID
+        :param partitioner: SheetPartitioner - 拆分方式
+        :param state_path: str - 各工作表上次寫入範圍的紀錄檔
+        """
+        self.json_api = json_api
+        self.sheet_id = sheet_id
+        self.partitioner = partitioner or SheetPartitioner()
+        self.state_path = state_path or os.path.join(
+            Config.UPLOAD_SNAPSHOT_DIR, f"partition_state_{sheet_id}.json"
+        )
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log_message(f"⚠️ 分頁上傳紀錄無法讀取: {e}")
+            return {}
+
+    def save_state(self, state):
+        atomic_write(
+            self.state_path,
+            lambda f: json.dump(state, f, ensure_ascii=False),
+            mode="w",
+            encoding="utf-8",
+        )
+
+    @staticmethod
+    def padded(values, rows, cols):
+        """以空字串將內容補到至少 rows 列、cols 欄（覆蓋上次寫入的舊值）"""
+        width = max(cols, max((len(row) for row in values), default=0))
+        values = [row + [""] * (width - len(row)) for row in values]
+        values.extend([[""] * width for _ in range(rows - len(values))])
+        return values
+
+    def build(self, header, parts, state):
+        """
+        產生每個工作表要寫入的內容
+        :param header: list[str] - 標題列
+        :param parts: dict - 工作表名稱 -> 該分組的 pd.DataFrame
+        :param state: dict - 工作表名稱 -> 上次寫入的 [列數, 欄數]
+        :return: dict - 工作表名稱 -> 含標題列、已補齊的二維清單
+        """
+        values = {
+            name: [header] + GoogleSheetsUploader.to_values(part) for name, part in parts.items()
+        }
+        # 這次沒有數據的工作表只留標題列
+        for name in state:
+            values.setdefault(name, [header])
+        return {
+            name: self.padded(rows, *state.get(name, (0, 0))) for name, rows in values.items()
+        }
+
+    def upload(self, df):
+        """
+        拆分並上傳數據
+        :param df: pd.DataFrame - 最終數據
+        :return: dict - 工作表名稱 -> 數據列數（不含標題）
+        """
+        header = df.columns.tolist()
+        parts = self.partitioner.split(df)
+        state = self.load_state()
+        values = self.build(header, parts, state)
+
+        sheets_client = get_sheets_client()
+        spreadsheet = sheets_client.spreadsheet(self.json_api, self.sheet_id)
+        existing = sheets_client.worksheets(self.json_api, self.sheet_id)
+
+        # 沒有上次紀錄的既有工作表，舊內容範圍未知，先清空
+        unknown = [name for name in values if name in existing and name not in state]
+        if unknown:
+            spreadsheet.values_batch_clear(
+                body={"ranges": [absolute_range_name(name) for name in unknown]}
+            )
+        for name, rows in values.items():
+            if name not in existing:
+                sheets_client.add_worksheet(
+                    self.json_api, self.sheet_id, name, max(len(rows), 100), max(len(rows[0]), 26)
+                )
+            else:
+                ensure_grid(existing[name], len(rows), len(rows[0]))
+
+        data = [
+            {"range": absolute_range_name(name, "A1"), "values": rows} for name, rows in values.items()
+        ]
+        # 只以位元組數上限切塊，數據量一般時所有工作表在同一個請求內寫入
+        total_rows = sum(len(rows) for rows in values.values())
+        writer = SheetsWriter(_SpreadsheetValues(spreadsheet), chunk_rows=total_rows)
+        writer.write_ranges(data)
+        print(f"📊 分頁寫入統計: {SheetsWriter.format_report(writer.report)}")
+
+        # 只記錄實際有數據的範圍，下次據此補空白
+        counts = {name: len(parts[name]) if name in parts else 0 for name in values}
+        self.save_state({name: [rows + 1, len(header)] for name, rows in counts.items()})
+        return counts
+
+
+class _SpreadsheetValues:
+    """讓 `SheetsWriter` 以 `values_batch_update` 一次寫入多個工作表的範圍"""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def batch_update(self, data):
+        return self.spreadsheet.values_batch_update(
+            params={"valueInputOption": "RAW"}, body={"data": data}
+        )
@@ -0,0 +1,170 @@
+import os
+import threading
+import gspread
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+from config import Config
+from utils import log_message
+
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+
+class _Spreadsheet(gspread.Spreadsheet):
+    """
+    開啟試算表時讀取的中繼資料，下一次讀取（建立工作表清單）直接沿用，
+    開啟並列出工作表只需一次請求
+    """
+
+    _metadata = None
+
+    def fetch_sheet_metadata(self, params=None):
+        if params is None and self._metadata is not None:
+            metadata, self._metadata = self._metadata, None
+            return metadata
+        metadata = super().fetch_sheet_metadata(params)
+        if params is None:
+            self._metadata = metadata
+        return metadata
+
+
+class SheetsClientCache:
+    """
+    行程內共用的 Google Sheets 連線：
+    - 每組憑證只建立一次 Credentials 與 gspread.Client，權杖由 AuthorizedSession 在過期時才更新
+    - 同一個 Session 重複使用連線（連線池大小隨同時寫入的請求數調整）
+    - 每個試算表只讀取一次中繼資料，工作表物件由中繼資料建立並快取
+    """
+
+    def __init__(self, pool_size=None):
+        """
+        初始化 SheetsClientCache
+        :param pool_size: int - 每個主機保留的連線數
+        """
+        self.pool_size = pool_size or max(4, Config.SHEET_MAX_WORKERS * 2)
+        self._clients = {}
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._lock = threading.RLock()
+        self.stats = {"auth": 0, "metadata": 0}
+
+    @staticmethod
+    def _credentials_key(json_api):
+        """憑證檔案改變（例如輪替金鑰）時視為不同的憑證"""
+        path = os.path.abspath(json_api)
+        return path, os.path.getmtime(path)
+
+    def client(self, json_api):
+        """
+        取得憑證對應的 gspread.Client
+        :param json_api: str - Google API 憑證 JSON 路徑
+        :return: gspread.Client
+        """
+        if not os.path.exists(json_api):
+            raise FileNotFoundError(f"❌ Google API 憑證不存在: {json_api}")
+        key = self._credentials_key(json_api)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                creds = Credentials.from_service_account_file(json_api, scopes=SCOPES)
+                session = AuthorizedSession(creds)
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                client = gspread.Client(auth=creds, session=session)
+                self._clients[key] = client
+                self.stats["auth"] += 1
+            return client
+
+    def spreadsheet(self, json_api, sheet_id):
+        """
+        取得試算表，並一次載入所有工作表
+        :param json_api: str - Google API 憑證 JSON 路徑
+        :param sheet_id: str - Google 試算表 ID
+        :return: gspread.Spreadsheet
+        """
+        key = (self._credentials_key(json_api), sheet_id)
+        with self._lock:
+            spreadsheet = self._spreadsheets.get(key)
+            if spreadsheet is None:
+                spreadsheet = _Spreadsheet(self.client(json_api), {"id": sheet_id})
+                self._spreadsheets[key] = spreadsheet
+                self._load_worksheets(key, spreadsheet)
+            return spreadsheet
+
+    def _load_worksheets(self, key, spreadsheet):
+        """讀取一次試算表中繼資料，建立所有工作表物件"""
+        self._worksheets[key] = {worksheet.title: worksheet for worksheet in spreadsheet.worksheets()}
+        self.stats["metadata"] += 1
+        # 沒有被使用的中繼資料不保留，之後重新讀取時取得最新內容
+        spreadsheet._metadata = None
+
+    def worksheet(self, json_api, sheet_id, worksheet_name):
+        """
+        取得工作表；快取中沒有時重新讀取一次中繼資料（工作表可能是後來新增的）
+        :param json_api: str - Google API 憑證 JSON 路徑
+        :param sheet_id: str - Google 試算表 ID
+        :param worksheet_name: str - 工作表名稱
+        :return: gspread.Worksheet
+        :raises gspread.exceptions.WorksheetNotFound: 工作表不存在
+        """
+        spreadsheet = self.spreadsheet(json_api, sheet_id)
+        key = (self._credentials_key(json_api), sheet_id)
+        with self._lock:
+            worksheet = self._worksheets[key].get(worksheet_name)
+            if worksheet is None:
+                self._load_worksheets(key, spreadsheet)
+                worksheet = self._worksheets[key].get(worksheet_name)
+            if worksheet is None:
+                raise gspread.exceptions.WorksheetNotFound(worksheet_name)
+            return worksheet
+
+    def worksheets(self, json_api, sheet_id):
+        """
+        取得試算表中所有已快取的工作表
+        :return: dict - 工作表名稱 -> gspread.Worksheet
+        """
+        self.spreadsheet(json_api, sheet_id)
+        key = (self._credentials_key(json_api), sheet_id)
+        with self._lock:
+            return dict(self._worksheets[key])
+
+    def add_worksheet(self, json_api, sheet_id, worksheet_name, rows, cols):
+        """
+        新增工作表並加入快取
+        :param rows: int - 列數
+        :param cols: int - 欄數
+        :return: gspread.Worksheet
+        """
+        spreadsheet = self.spreadsheet(json_api, sheet_id)
+        key = (self._credentials_key(json_api), sheet_id)
+        with self._lock:
+            worksheet = spreadsheet.add_worksheet(worksheet_name, rows, cols)
+            self._worksheets[key][worksheet_name] = worksheet
+            return worksheet
+
+    def invalidate(self, sheet_id=None):
+        """
+        清除快取的試算表與工作表（工作表被新增、刪除或改名後使用）
+        :param sheet_id: str - 只清除此試算表，None 表示全部（含連線）
+        """
+        with self._lock:
+            for key in [key for key in self._spreadsheets if sheet_id in (None, key[1])]:
+                self._spreadsheets.pop(key, None)
+                self._worksheets.pop(key, None)
+            if sheet_id is None:
+                self._clients.clear()
+                log_message("🔄 已清除 Google Sheets 連線快取")
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_sheets_client():
+    """取得行程內共用的 Google Sheets 連線快取"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SheetsClientCache()
+        return _shared_cache
@@ -0,0 +1,233 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from gspread.exceptions import APIError
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+from config import Config
+from utils import log_message
+
+
+# 可重試的 HTTP 狀態碼：配額用盡與伺服器暫時錯誤
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class SheetsWriteError(Exception):
+    """
+    部分區塊重試後仍寫入失敗
+    """
+
+    def __init__(self, failed, report):
+        """
+        :param failed: list[dict] - 失敗區塊的報告
+        :param report: list[dict] - 所有區塊的報告
+        """
+        super().__init__(
+            f"{len(failed)}/{len(report)} 個區塊寫入失敗，第一個錯誤: {failed[0]['error']}"
+        )
+        self.failed = failed
+        self.report = report
+
+
+class TokenBucket:
+    """
+    每分鐘寫入配額的權杖桶：每次請求取一個權杖，用完時等待補充
+    """
+
+    def __init__(self, per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param per_minute: float - 每分鐘補充的權杖數（0 表示不限制）
+        :param capacity: float - 權杖上限（可連續送出的請求數），預設同 `per_minute`
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        取得一個權杖，必要時等待
+        :return: float - 等待的秒數
+        """
+        if not self.rate:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+def _status_of(error):
+    """取出 API 錯誤的 HTTP 狀態碼，無法取得時回傳 None"""
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+class SheetsWriter:
+    """
+    將要寫入的範圍切成大小有上限的區塊後分批送出：
+    - 大範圍依列數 / 位元組數切塊，小範圍合併到同一個 `batch_update` 請求
+    - 以有限的執行緒數同時送出，並以權杖桶控制每分鐘的請求數
+    - 429 / 5xx 以指數退避加隨機抖動重試
+    - 記錄每個區塊的列數、大小、耗時與重試次數
+    """
+
+    def __init__(self, worksheet, chunk_rows=None, chunk_bytes=None, max_workers=None,
+                 max_retries=None, backoff_base=None, bucket=None, sleep=time.sleep):
+        """
+        初始化 SheetsWriter
+        :param worksheet: gspread.Worksheet - 目標工作表（或提供 `batch_update` 的替身）
+        :param chunk_rows: int - 每個請求的列數上限
+        :param chunk_bytes: int - 每個請求的數據大小上限（JSON 位元組數）
+        :param max_workers: int - 同時送出的請求數
+        :param max_retries: int - 每個區塊的重試次數上限
+        :param backoff_base: float - 第一次重試前等待的秒數，之後每次加倍
+        :param bucket: TokenBucket - 請求配額，預設依 `Config.SHEET_WRITES_PER_MINUTE` 建立
+        :param sleep: callable - 等待函式（測試時可替換）
+        """
+        self.worksheet = worksheet
+        self.chunk_rows = chunk_rows or Config.SHEET_CHUNK_ROWS
+        self.chunk_bytes = chunk_bytes or Config.SHEET_CHUNK_BYTES
+        self.max_workers = max(1, max_workers or Config.SHEET_MAX_WORKERS)
+        self.max_retries = Config.SHEET_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = Config.SHEET_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.bucket = bucket or TokenBucket(Config.SHEET_WRITES_PER_MINUTE, sleep=sleep)
+        self.sleep = sleep
+        self.report = []
+
+    @staticmethod
+    def _row_size(row):
+        return len(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def split(self, data):
+        """
+        將 [{"range", "values"}] 切成區塊：每塊的列數與大小不超過上限
+        :param data: list[dict] - 要寫入的範圍，`range` 的起點決定寫入位置（可帶工作表名稱）
+        :return: list[dict] - 切塊後的範圍（含 `rows`、`bytes`）
+        """
+        pieces = []
+        for item in data:
+            values = item["values"]
+            if not values:
+                continue
+            # 範圍可帶工作表名稱（"'工作表'!A1"），切塊後保留
+            sheet_prefix, _, cell_range = item["range"].rpartition("!")
+            sheet_prefix = f"{sheet_prefix}!" if sheet_prefix else ""
+            start_row, start_col = a1_to_rowcol(cell_range.split(":")[0])
+            width = max(len(row) for row in values)
+
+            offset = 0
+            while offset < len(values):
+                size = 0
+                end = offset
+                while end < len(values) and end - offset < self.chunk_rows:
+                    row_size = self._row_size(values[end])
+                    if end > offset and size + row_size > self.chunk_bytes:
+                        break
+                    size += row_size
+                    end += 1
+                first = start_row + offset
+                pieces.append({
+                    "range": f"{sheet_prefix}{rowcol_to_a1(first, start_col)}:"
+                             f"{rowcol_to_a1(first + end - offset - 1, start_col + width - 1)}",
+                    "values": values[offset:end],
+                    "rows": end - offset,
+                    "bytes": size,
+                })
+                offset = end
+        return pieces
+
+    def pack(self, pieces):
+        """將切好的範圍合併成請求，每個請求的列數與大小不超過上限"""
+        requests = []
+        for piece in pieces:
+            last = requests[-1] if requests else None
+            if (
+                last
+                and last["rows"] + piece["rows"] <= self.chunk_rows
+                and last["bytes"] + piece["bytes"] <= self.chunk_bytes
+            ):
+                last["ranges"].append(piece)
+                last["rows"] += piece["rows"]
+                last["bytes"] += piece["bytes"]
+            else:
+                requests.append({"ranges": [piece], "rows": piece["rows"], "bytes": piece["bytes"]})
+        return requests
+
+    def _send(self, request):
+        """送出一個請求，遇到可重試的錯誤時退避後重試"""
+        data = [{"range": piece["range"], "values": piece["values"]} for piece in request["ranges"]]
+        entry = {
+            "range": data[0]["range"] if len(data) == 1 else f"{data[0]['range']} (+{len(data) - 1})",
+            "rows": request["rows"],
+            "bytes": request["bytes"],
+            "attempts": 0,
+            "throttled": 0.0,
+            "error": None,
+        }
+        start = time.perf_counter()
+        while True:
+            entry["attempts"] += 1
+            entry["throttled"] += self.bucket.acquire()
+            try:
+                self.worksheet.batch_update(data)
+                break
+            except APIError as e:
+                status = _status_of(e)
+                if status not in RETRY_STATUS or entry["attempts"] > self.max_retries:
+                    entry["error"] = f"{status}: {e}"
+                    break
+                delay = self.backoff_base * 2 ** (entry["attempts"] - 1)
+                delay += random.uniform(0, self.backoff_base)
+                log_message(f"⚠️ Google Sheets 回應 {status}，{delay:.1f} 秒後重試 {entry['range']}")
+                self.sleep(delay)
+            except Exception as e:
+                entry["error"] = str(e)
+                break
+        entry["seconds"] = round(time.perf_counter() - start, 3)
+        return entry
+
+    def write_ranges(self, data):
+        """
+        寫入多個範圍（與 `Worksheet.batch_update` 相同的參數格式）
+        :param data: list[dict] - [{"range": "A2", "values": [[...], ...]}]
+        :return: list[dict] - 每個請求的報告
+        :raises SheetsWriteError: 有區塊重試後仍失敗
+        """
+        requests = self.pack(self.split(data))
+        if len(requests) <= 1 or self.max_workers == 1:
+            report = [self._send(request) for request in requests]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                report = list(executor.map(self._send, requests))
+        self.report.extend(report)
+
+        failed = [entry for entry in report if entry["error"]]
+        if failed:
+            raise SheetsWriteError(failed, report)
+        return report
+
+    @staticmethod
+    def format_report(report):
+        """回傳寫入結果的文字摘要"""
+        if not report:
+            return "沒有需要寫入的區塊"
+        seconds = [entry["seconds"] for entry in report]
+        retries = sum(entry["attempts"] - 1 for entry in report)
+        return (
+            f"{len(report)} 個請求、{sum(entry['rows'] for entry in report)} 列、"
+            f"{sum(entry['bytes'] for entry in report) / 1024:.0f} KB，"
+            f"單次耗時 {min(seconds):.2f}~{max(seconds):.2f} 秒，重試 {retries} 次"
+        )
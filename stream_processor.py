@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from config import Config
+from data_processor import DataMerger
+from field_parser import FieldParser
+from order_merge import OrderKeyedMerger
+from pagination import dedupe_page
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
+
+
+class StreamingProcessor:
+    """
+    以固定筆數的訂單為一塊，依序執行展開、合併、拆分、格式化：
+    - 每塊的中間結果（展開後、合併後的副本）處理完即釋放，記憶體用量不隨訂單數成長
+    - 只保留處理後的結果，最後再一次轉換類別並排序
+    - 各塊共用同一個欄位解析器與其快取
+    - 抓取時可以 `add_page()` 逐頁交付，不必先保留完整的抓取結果
+    """
+
+    def __init__(self, chunk_orders=None):
+        """
+        初始化 StreamingProcessor
+        :param chunk_orders: int - 每塊的訂單數
+        """
+        self.chunk_orders = max(1, chunk_orders or Config.STREAM_CHUNK_ORDERS)
+        self.field_parser = FieldParser()
+        self.chunks = []
+        self.reports = []
+        self.seen = set()  # 已交付的 `訂單ID`，跨頁去除重複的訂單
+        self.orders = 0  # 已處理的訂單數
+
+    @staticmethod
+    def iter_chunks(head, inner, chunk_orders):
+        """
+        依訂單順序切塊，每塊的商品列跟隨所屬訂單；
+        找不到訂單的商品放在最後一塊，讓合併報告仍能統計
+        :param head: pd.DataFrame - 訂單列
+        :param inner: pd.DataFrame - 含 `訂單ID` 的商品列
+        :param chunk_orders: int - 每塊的訂單數
+        :return: generator - 每塊的 (訂單 DataFrame, 商品 DataFrame)
+        """
+        chunk_of_order = pd.Series(
+            np.arange(len(head)) // chunk_orders, index=head["訂單ID"].to_numpy()
+        )
+        chunk_of_order = chunk_of_order[~chunk_of_order.index.duplicated()]
+        last_chunk = max(0, (len(head) - 1) // chunk_orders)
+        item_chunks = (
+            inner["訂單ID"].map(chunk_of_order).fillna(last_chunk).to_numpy(dtype="int64")
+        )
+        item_rows = pd.Series(np.arange(len(inner))).groupby(item_chunks).indices
+
+        for chunk, start in enumerate(range(0, len(head), chunk_orders)):
+            rows = item_rows.get(chunk, np.array([], dtype="int64"))
+            yield head.iloc[start:start + chunk_orders], inner.iloc[rows]
+
+    def add(self, head, inner):
+        """
+        處理一塊訂單並保留結果
+        :param head: pd.DataFrame - 這一塊的訂單列
+        :param inner: pd.DataFrame - 這一塊的商品列
+        """
+        merger = DataMerger(head, inner, field_parser=self.field_parser)
+        self.chunks.append(merger.process_rows())
+        self.orders += len(head)
+        if merger.merge_report is not None:
+            self.reports.append(merger.merge_report)
+
+    def add_page(self, head, inner):
+        """
+        處理抓取到的一頁訂單：先前頁面已出現的訂單略過，其餘依 `chunk_orders` 切塊處理
+        :param head: pd.DataFrame - 這一頁的訂單列
+        :param inner: pd.DataFrame - 這一頁含 `訂單ID` 的商品列
+        """
+        head, inner = dedupe_page(head, inner, self.seen)
+        if head.empty:
+            return
+        # 列號接續先前的頁面，與合併所有分頁後一次處理時相同
+        head = head.set_axis(pd.RangeIndex(self.orders, self.orders + len(head)))
+        for head_chunk, inner_chunk in self.iter_chunks(head, inner, self.chunk_orders):
+            self.add(head_chunk, inner_chunk)
+
+    def reset(self):
+        """捨棄已處理的分塊（例如改用其他方式重新抓取時）"""
+        self.chunks = []
+        self.reports = []
+        self.seen = set()
+        self.orders = 0
+
+    def result(self):
+        """
+        合併所有已處理的分塊，轉換類別並排序
+        :return: pd.DataFrame - 與 `DataMerger.process_all()` 相同的結果（沒有訂單時為空的 DataFrame）
+        """
+        if not self.chunks:
+            # 沒有任何分塊時仍經過相同的處理，讓空結果也有完整的欄位與型別
+            self.add(ORDER_SCHEMA.to_frame([]), ITEM_SCHEMA.to_frame([]))
+        self.field_parser.save_cache()
+        df = pd.concat(self.chunks)
+        self.chunks = []
+        return DataMerger.sort_frame(DataMerger.categorize_frame(df))
+
+    @property
+    def merge_report(self):
+        """所有分塊合併報告的加總"""
+        return OrderKeyedMerger.merge_reports(self.reports) if self.reports else None
+
+    def process(self, head, inner):
+        """
+        分塊處理完整的訂單與商品數據
+        :param head: pd.DataFrame - 訂單列
+        :param inner: pd.DataFrame - 含 `訂單ID` 的商品列
+        :return: pd.DataFrame - 處理後的數據
+        """
+        if not head.empty:
+            for head_chunk, inner_chunk in self.iter_chunks(head, inner, self.chunk_orders):
+                self.add(head_chunk, inner_chunk)
+        return self.result()
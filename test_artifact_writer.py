@@ -0,0 +1,56 @@
+# ArtifactWriter 的測試：多個執行共用背景執行緒時，各自只等待自己的檔案
+import threading
+import pandas as pd
+from artifact_writer import ArtifactWriter
+
+
+class StubSaver:
+    """記錄寫入順序；前綴在 `blocked` 中的檔案要等到放行後才寫完"""
+
+    def __init__(self, blocked=()):
+        self.blocked = set(blocked)
+        self.release = threading.Event()
+        self.saved = []
+
+    def should_save(self, filename_prefix):
+        return True
+
+    def save(self, df, filename_prefix="data"):
+        if filename_prefix in self.blocked:
+            self.release.wait(5)
+        self.saved.append(filename_prefix)
+        return f"{filename_prefix}.xlsx", True
+
+
+def test_flush_returns_only_the_runs_own_files():
+    saver = StubSaver(blocked={"a2"})
+    writer = ArtifactWriter(saver=saver, max_pending=10)
+    run_a, run_b = writer.start_run(), writer.start_run()
+    df = pd.DataFrame({"訂單ID": [1]})
+
+    run_a.submit(df, "a1")
+    run_b.submit(df, "b1")
+    run_a.submit(df, "a2")
+
+    # a2 仍在寫入時，b 的 flush 不必等待 a 的檔案，也不會拿到 a 的結果
+    assert [result["prefix"] for result in run_b.flush(timeout=5)] == ["b1"]
+    assert "a2" not in saver.saved
+
+    saver.release.set()
+    assert [result["prefix"] for result in run_a.flush(timeout=5)] == ["a1", "a2"]
+    assert run_a.flush() == [] and run_b.flush() == []
+
+
+def test_flush_timeout_returns_finished_files():
+    saver = StubSaver(blocked={"slow"})
+    writer = ArtifactWriter(saver=saver, max_pending=10)
+    run = writer.start_run()
+    df = pd.DataFrame({"訂單ID": [1]})
+
+    run.submit(df, "fast")
+    run.submit(df, "slow")
+    assert [result["prefix"] for result in run.flush(timeout=0.2)] == ["fast"]
+    assert run.pending == 1
+
+    saver.release.set()
+    assert [result["prefix"] for result in run.flush(timeout=5)] == ["slow"]
@@ -0,0 +1,36 @@
+# benchmark.check_regressions 的測試：以校準單位比較，不受機器快慢影響
+import pytest
+from benchmark import check_regressions
+
+
+def make_report(calibration, seconds, memory=False):
+    steps = {
+        step: {"seconds": value, "units": round(value / calibration, 3)}
+        for step, value in seconds.items()
+    }
+    return {"memory": memory, "calibration": calibration, "results": {"1000": {"steps": steps}}}
+
+
+BASELINE = make_report(0.1, {"merge": 0.5, "save_parquet": 0.3, "format_data": 0.01})
+
+
+def test_uniformly_slower_machine_is_not_a_regression():
+    # 整台機器慢兩倍：秒數加倍但校準單位不變
+    report = make_report(0.2, {"merge": 1.0, "save_parquet": 0.6, "format_data": 0.02})
+    assert check_regressions(report, BASELINE, tolerance=0.25, min_seconds=0.1) == []
+
+
+def test_slower_step_is_reported():
+    report = make_report(0.1, {"merge": 0.8, "save_parquet": 0.3, "format_data": 0.05})
+    regressions = check_regressions(report, BASELINE, tolerance=0.25, min_seconds=0.1)
+    # format_data 低於 min_seconds，不比較
+    assert len(regressions) == 1 and regressions[0].startswith("1000 筆訂單 merge")
+
+
+@pytest.mark.parametrize("baseline", [
+    {**BASELINE, "memory": True},
+    {key: value for key, value in BASELINE.items() if key != "calibration"},
+])
+def test_incomparable_baseline_raises(baseline):
+    with pytest.raises(ValueError):
+        check_regressions(make_report(0.1, {"merge": 0.5}), baseline, 0.25, 0.1)
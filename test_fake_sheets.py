@@ -0,0 +1,126 @@
+# 上傳流程對 FakeSheetsService 的回歸測試（不需網路與 Google API 憑證）
+import pandas as pd
+import pytest
+from gspread.utils import ValueRenderOption
+from fake_sheets import FakeSheetsService
+from sheet_diff import DiffUploader
+from sheet_partition import PartitionUploader, SheetPartitioner
+from sheets_writer import SheetsWriteError, SheetsWriter, TokenBucket
+from SheetManager import GoogleSheetsManager
+
+
+def no_sleep(seconds):
+    pass
+
+
+def sheet_values(worksheet):
+    return worksheet.get_values(value_render_option=ValueRenderOption.unformatted)
+
+
+@pytest.fixture
+def service():
+    return FakeSheetsService(sleep=no_sleep)
+
+
+def make_writer(worksheet, **options):
+    options.setdefault("bucket", TokenBucket(0))
+    return SheetsWriter(worksheet, max_workers=1, sleep=no_sleep, **options)
+
+
+def test_diff_upload_after_rewrite_sends_only_changed_rows(service, tmp_path):
+    worksheet = service.worksheet()
+    writer = make_writer(worksheet)
+    uploader = DiffUploader(
+        worksheet, snapshot_path=str(tmp_path / "snapshot.pkl"), write_ranges=writer.write_ranges
+    )
+    header = ["訂單ID", "品項序號", "備註"]
+    keys = [(order_id, 0) for order_id in range(1, 51)]
+    rows = [[order_id, 0, ""] for order_id, _ in keys]
+
+    assert uploader.upload(header, keys, rows)["mode"] == "rewrite"
+    assert sheet_values(worksheet) == [header] + rows
+
+    rows[10] = [11, 0, "已聯絡"]
+    service.reset()
+    report = uploader.upload(header, keys, rows)
+    assert report["mode"] == "diff" and report["changed"] == 1
+    assert service.report()["requests"] == 1
+    assert service.records[0]["bytes_sent"] < 100
+    assert sheet_values(worksheet)[11] == [11, 0, "已聯絡"]
+
+
+def test_writer_retries_429_and_503(service):
+    worksheet = service.worksheet()
+    sleeps = []
+    writer = make_writer(worksheet, max_retries=2, backoff_base=1.0)
+    writer.sleep = sleeps.append
+    service.fail_next("batch_update", 429, 503)
+
+    report = writer.write_ranges([{"range": "A1", "values": [["a", "b"], ["c", "d"]]}])
+    assert report[0]["attempts"] == 3 and report[0]["error"] is None
+    assert len(sleeps) == 2 and 2.0 <= sleeps[1] < 3.0  # 第二次重試的退避時間加倍
+    assert sheet_values(worksheet) == [["a", "b"], ["c", "d"]]
+    assert service.report()["errors"] == {429: 1, 503: 1}
+
+
+def test_writer_raises_when_retries_run_out(service):
+    worksheet = service.worksheet()
+    writer = make_writer(worksheet, max_retries=1, backoff_base=0.0)
+    service.fail_next("batch_update", 503, 503)
+
+    with pytest.raises(SheetsWriteError) as excinfo:
+        writer.write_ranges([{"range": "A1", "values": [["a"]]}])
+    assert excinfo.value.failed[0]["attempts"] == 2
+    assert "503" in excinfo.value.failed[0]["error"]
+    assert sheet_values(worksheet) == []
+
+
+def test_partition_upload_writes_all_worksheets_in_one_request(service, tmp_path):
+    df = pd.DataFrame({
+        "訂單ID": [1, 2, 3, 4],
+        "運送狀態": ["待處理", "準備出貨", "待處理", None],
+    })
+    uploader = PartitionUploader(
+        "unused.json", "partition-test",
+        partitioner=SheetPartitioner(["運送狀態"], "訂單-{value}"),
+        state_path=str(tmp_path / "state.json"),
+    )
+    with service.installed():
+        counts = uploader.upload(df)
+
+    assert counts == {"訂單-待處理": 2, "訂單-準備出貨": 1, "訂單-未設定": 1}
+    assert service.calls["values_batch_update"] == 1
+    spreadsheet = service.spreadsheet("partition-test")
+    assert sheet_values(spreadsheet.worksheet("訂單-待處理", _record=False)) == [
+        ["訂單ID", "運送狀態"], [1, "待處理"], [3, "待處理"],
+    ]
+
+
+def test_iter_pages_reads_across_page_boundaries(service):
+    worksheet = service.worksheet()
+    rows = [[f"訂單{i}", i] for i in range(1, 26)]
+    worksheet.resize(rows=len(rows) + 1)
+    worksheet.update("A1", [["訂單", "數量"]] + rows)
+
+    pages = list(GoogleSheetsManager.iter_pages(worksheet, page_rows=10))
+    assert [len(page) for page in pages] == [9, 10, 6]
+    df = pd.concat(pages, ignore_index=True)
+    assert df["訂單"].tolist() == [row[0] for row in rows]
+    assert df["數量"].tolist() == [row[1] for row in rows]
+    assert service.calls["get_values"] == 3
+
+
+def test_iter_pages_continues_after_blank_rows_at_page_end(service):
+    worksheet = service.worksheet()
+    rows = [[f"訂單{i}", i] for i in range(1, 26)]
+    rows[7] = rows[8] = ["", ""]  # 第 9、10 列（第一頁的結尾）是空白列
+    worksheet.update("A1", [["訂單", "數量"]] + rows)
+
+    pages = list(GoogleSheetsManager.iter_pages(worksheet, page_rows=10))
+    df = pd.concat(pages, ignore_index=True)
+    assert len(df) == 25
+    assert df["訂單"].isna().tolist()[6:11] == [False, True, True, False, False]
+    assert df["訂單"].tolist()[9:11] == ["訂單10", "訂單11"]
+    assert df["數量"].tolist()[-1] == 25
+    # 格線有 1000 列，結尾全是空白列的頁面不會產生 DataFrame
+    assert service.calls["get_values"] == worksheet.row_count // 10
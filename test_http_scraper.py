@@ -0,0 +1,143 @@
+# HttpOrderScraper 的整合測試：以本機 HTTP 伺服器提供擷取下來的後台頁面
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+import requests
+from config import Config
+from http_scraper import HttpOrderScraper
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "http")
+SESSION_COOKIE = "admin_session=logged-in"
+USERNAME = "tester"
+PASSWORD = "secret-1234"
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class AdminHandler(BaseHTTPRequestHandler):
+    """
+    模擬後台：未登入時訂單頁回傳登入表單（不轉址），
+    登入表單送到自訂的登入網址，面板內容由 data-url 非同步取得
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, status=200, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _logged_in(self):
+        return SESSION_COOKIE in self.headers.get("Cookie", "")
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        url = urlparse(self.path)
+        if url.path == "/custom/login":
+            self._send(read_fixture("login.html"))
+        elif not self._logged_in():
+            self._send(read_fixture("login.html"))
+        elif url.path == "/admin/orders":
+            empty = "empty" in parse_qs(url.query)
+            self._send(read_fixture("orders_empty.html" if empty else "orders_page.html"))
+        elif url.path == "/admin/orders/1001/items":
+            self._send(read_fixture("order_items.html"))
+        else:
+            self._send("not found", status=404)
+
+    def do_POST(self):
+        self.server.requests.append(("POST", self.path))
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        valid = (
+            self.path == "/custom/login"
+            and form.get("_token") == ["csrf-token-123"]
+            and form.get("username") == [USERNAME]
+            and form.get("password") == [PASSWORD]
+        )
+        if not valid:
+            self._send("invalid", status=422)
+            return
+        self._send("ok", headers={"Set-Cookie": f"{SESSION_COOKIE}; Path=/"})
+
+
+@pytest.fixture
+def admin_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AdminHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scraper_factory(admin_server, tmp_path, monkeypatch):
+    # ExcelSaver 會在目前目錄建立 data/，測試時改在暫存目錄執行
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "USERNAME", USERNAME)
+    monkeypatch.setattr(Config, "PASSWORD", PASSWORD)
+    _, base_url = admin_server
+    return lambda: HttpOrderScraper(login_url=f"{base_url}/custom/login", max_workers=2)
+
+
+def test_login_and_scrape_orders_with_panels(admin_server, scraper_factory):
+    server, base_url = admin_server
+    head_df, inner_df = scraper_factory().fetch_table_data(f"{base_url}/admin/orders", save=False)
+
+    # 登入表單由建構時指定的 login_url 取得，並帶上 CSRF 欄位
+    assert ("GET", "/custom/login") in server.requests
+    assert ("POST", "/custom/login") in server.requests
+
+    assert head_df["訂單ID"].tolist() == [1001, 1002]
+    assert head_df["最終售價"].tolist() == [1200, 150]
+    assert head_df["收件人電話"].tolist() == ["0912345678", "0223456789"]
+    assert head_df.loc[0, "收件資料"] == "王小明\n台北市大安區復興南路一段1號"
+    assert str(head_df.loc[0, "建立時間"]) == "2024-05-01 10:00:00"
+
+    # 1001 的面板由 data-url 非同步取得，1002 的面板內嵌在頁面中
+    assert inner_df["訂單ID"].tolist() == [1001, 1001, 1002]
+    assert inner_df["商品名稱"].tolist() == ["角色公仔", "壓克力立牌", "限定徽章"]
+    assert inner_df["商品價格"].tolist() == [800, 400, 150]
+    assert inner_df["是否換回點數"].tolist() == ["否", "是", "否"]
+
+
+def test_pages_are_handed_to_on_page(admin_server, scraper_factory):
+    _, base_url = admin_server
+    pages = []
+    head_df, inner_df = scraper_factory().fetch_table_data(
+        f"{base_url}/admin/orders", save=False, on_page=lambda head, inner: pages.append((head, inner))
+    )
+    assert head_df.empty and inner_df.empty
+    assert len(pages) == 1
+    assert pages[0][0]["訂單ID"].tolist() == [1001, 1002]
+    assert pages[0][1]["訂單ID"].tolist() == [1001, 1001, 1002]
+
+
+def test_empty_grid_returns_empty_frames(admin_server, scraper_factory):
+    _, base_url = admin_server
+    head_df, inner_df = scraper_factory().fetch_table_data(
+        f"{base_url}/admin/orders?empty=1", save=False
+    )
+    assert head_df.empty and inner_df.empty
+    assert "訂單ID" in head_df.columns and "訂單ID" in inner_df.columns
+
+
+def test_wrong_password_raises(admin_server, scraper_factory, monkeypatch):
+    _, base_url = admin_server
+    monkeypatch.setattr(Config, "PASSWORD", "wrong-password")
+    with pytest.raises(requests.HTTPError):
+        scraper_factory().fetch_table_data(f"{base_url}/admin/orders", save=False)
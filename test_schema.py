@@ -0,0 +1,30 @@
+# schema 型別轉換的測試
+import pandas as pd
+from schema import ColumnSpec, ORDER_SCHEMA
+
+
+def test_int_cast_strips_separators_and_currency():
+    series = pd.Series(["1,200", "NT$1200", "$ 35", "1,200 元", "150", "", None], dtype=object)
+    result = ColumnSpec("最終售價", "Int64").cast(series)
+    assert result.dtype == "Int64"
+    assert result.tolist()[:5] == [1200, 1200, 35, 1200, 150]
+    assert result[5:].isna().all()
+
+
+def test_int_cast_sets_unparsable_values_to_missing():
+    result = ColumnSpec("最終售價", "Int64").cast(pd.Series(["免費", "80"], dtype=object))
+    assert result.isna().tolist() == [True, False]
+    assert result[1] == 80
+
+
+def test_numeric_input_is_not_reparsed():
+    series = pd.Series([1200, 150])
+    assert ColumnSpec("最終售價", "Int64").cast(series).tolist() == [1200, 150]
+
+
+def test_order_schema_casts_price_column():
+    row = [""] * len(ORDER_SCHEMA.names)
+    row[ORDER_SCHEMA.names.index("訂單ID")] = "1001"
+    row[ORDER_SCHEMA.names.index("最終售價")] = "NT$2,480"
+    df = ORDER_SCHEMA.to_frame([row])
+    assert df.loc[0, "最終售價"] == 2480 and df.loc[0, "訂單ID"] == 1001
@@ -0,0 +1,110 @@
+# DiffUploader 的測試：以 FakeSheetsService 代替 Google Sheets
+import pytest
+from gspread.utils import ValueRenderOption
+from fake_sheets import FakeSheetsService
+from sheet_diff import DiffUploader
+from sheets_writer import SheetsWriteError, SheetsWriter
+
+
+HEADER = ["訂單ID", "品項序號", "商品名稱"]
+
+
+def make_rows(count, label="商品"):
+    keys = [(1000 + i, 0) for i in range(count)]
+    rows = [[order_id, ordinal, f"{label}{order_id}"] for order_id, ordinal in keys]
+    return keys, rows
+
+
+def sheet_values(worksheet):
+    return worksheet.get_values(value_render_option=ValueRenderOption.unformatted)
+
+
+@pytest.fixture
+def service():
+    return FakeSheetsService(sleep=lambda seconds: None)
+
+
+def make_uploader(service, tmp_path, **writer_options):
+    worksheet = service.worksheet()
+    writer = SheetsWriter(worksheet, max_workers=1, max_retries=0, sleep=lambda seconds: None,
+                          **writer_options)
+    uploader = DiffUploader(
+        worksheet, snapshot_path=str(tmp_path / "snapshot.pkl"), write_ranges=writer.write_ranges
+    )
+    return worksheet, uploader
+
+
+def test_failed_write_forces_rewrite_on_next_upload(service, tmp_path):
+    worksheet, uploader = make_uploader(service, tmp_path, chunk_rows=3)
+    keys, rows = make_rows(20)
+    assert uploader.upload(HEADER, keys, rows)["mode"] == "rewrite"
+
+    # 連續 6 列被修改，切成兩個 3 列的請求，第二個請求失敗
+    changed = [row[:2] + [f"新{row[2]}"] if i < 6 else row for i, row in enumerate(rows)]
+    batch_updates = []
+
+    def fail_second_batch(record):
+        if record["endpoint"] == "batch_update":
+            batch_updates.append(record)
+            if len(batch_updates) == 2:
+                raise RuntimeError("模擬寫入失敗")
+
+    service.on_call = fail_second_batch
+    with pytest.raises(SheetsWriteError):
+        uploader.upload(HEADER, keys, changed)
+    service.on_call = None
+
+    # 工作表只寫入了一部分，快照已刪除，重新上傳原始數據時整份重寫
+    assert uploader.load_snapshot() is None
+    assert uploader.upload(HEADER, keys, rows)["mode"] == "rewrite"
+    assert sheet_values(worksheet) == [HEADER] + rows
+
+
+def sorted_orders(data):
+    """依狀態、訂單 ID 排序（模擬依 `運送狀態` 等欄位排序後的最終數據）"""
+    keys = sorted(data, key=lambda key: (data[key][2], key))
+    return keys, [data[key] for key in keys]
+
+
+@pytest.fixture
+def orders():
+    return {(1000 + i, 0): [1000 + i, 0, f"狀態{i % 4}"] for i in range(200)}
+
+
+def test_single_insert_and_delete_take_the_diff_path(service, tmp_path, orders):
+    worksheet, uploader = make_uploader(service, tmp_path)
+    assert uploader.upload(HEADER, *sorted_orders(orders))["mode"] == "rewrite"
+
+    # 新訂單排在中間：插入一列並只寫入該列
+    orders[(5000, 0)] = [5000, 0, "狀態1"]
+    keys, rows = sorted_orders(orders)
+    service.reset()
+    report = uploader.upload(HEADER, keys, rows)
+    assert report["mode"] == "diff"
+    assert (report["inserted"], report["deleted"], report["changed"]) == (1, 0, 0)
+    assert service.calls["spreadsheet_batch_update"] == 1  # 插入列
+    assert service.calls["batch_update"] == 1  # 寫入新列的值
+    assert sheet_values(worksheet) == [HEADER] + rows
+
+    # 刪除一筆訂單：只刪除該列，不寫入任何值
+    del orders[(1010, 0)]
+    keys, rows = sorted_orders(orders)
+    service.reset()
+    report = uploader.upload(HEADER, keys, rows)
+    assert report["mode"] == "diff"
+    assert (report["inserted"], report["deleted"], report["ranges"]) == (0, 1, 0)
+    assert service.calls["spreadsheet_batch_update"] == 1
+    assert service.calls["batch_update"] == 0
+    assert sheet_values(worksheet) == [HEADER] + rows
+
+
+def test_row_whose_sort_position_changes_is_moved(service, tmp_path, orders):
+    worksheet, uploader = make_uploader(service, tmp_path)
+    uploader.upload(HEADER, *sorted_orders(orders))
+
+    orders[(1003, 0)] = [1003, 0, "狀態0"]  # 原本為狀態3，排序位置往前移
+    keys, rows = sorted_orders(orders)
+    report = uploader.upload(HEADER, keys, rows)
+    assert report["mode"] == "diff"
+    assert report["moved"] == 1
+    assert sheet_values(worksheet) == [HEADER] + rows
@@ -0,0 +1,158 @@
+# SheetsWriter 與 TokenBucket 的單元測試：以記錄呼叫的替身代替工作表
+import json
+import pytest
+from gspread.exceptions import APIError
+from sheets_writer import RETRY_STATUS, SheetsWriteError, SheetsWriter, TokenBucket
+
+
+class ErrorResponse:
+    """讓 `APIError` 取得狀態碼與錯誤內容的最小回應"""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = f"status {status_code}"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": "TEST"}}
+
+
+class StubWorksheet:
+    """記錄每次 `batch_update` 的參數，並依序丟出指定的錯誤狀態碼"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def batch_update(self, data):
+        self.calls.append(data)
+        if self.statuses:
+            raise APIError(ErrorResponse(self.statuses.pop(0)))
+
+
+class FakeClock:
+    """可手動推進的時鐘，`sleep` 只推進時間並記錄等待秒數"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_writer(worksheet, **options):
+    options.setdefault("max_workers", 1)
+    options.setdefault("bucket", TokenBucket(0))
+    options.setdefault("sleep", lambda seconds: None)
+    return SheetsWriter(worksheet, **options)
+
+
+def row_bytes(row):
+    return len(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+
+
+def test_split_respects_row_limit():
+    writer = make_writer(StubWorksheet(), chunk_rows=4, chunk_bytes=10 ** 6)
+    values = [[i, f"商品{i}"] for i in range(10)]
+    pieces = writer.split([{"range": "A2", "values": values}])
+
+    assert [piece["rows"] for piece in pieces] == [4, 4, 2]
+    assert [piece["range"] for piece in pieces] == ["A2:B5", "A6:B9", "A10:B11"]
+    assert [row for piece in pieces for row in piece["values"]] == values
+
+
+def test_split_respects_byte_limit():
+    values = [["x" * 40] for _ in range(6)]
+    limit = row_bytes(values[0]) * 2
+    writer = make_writer(StubWorksheet(), chunk_rows=100, chunk_bytes=limit)
+    pieces = writer.split([{"range": "C1", "values": values}])
+
+    assert [piece["rows"] for piece in pieces] == [2, 2, 2]
+    assert all(piece["bytes"] <= limit for piece in pieces)
+    assert pieces[1]["range"] == "C3:C4"
+
+
+def test_split_keeps_oversized_row_in_its_own_piece():
+    values = [["x" * 200], ["y"]]
+    writer = make_writer(StubWorksheet(), chunk_rows=100, chunk_bytes=50)
+    pieces = writer.split([{"range": "A1", "values": values}])
+    assert [piece["values"] for piece in pieces] == [[["x" * 200]], [["y"]]]
+
+
+def test_split_keeps_sheet_name_prefix():
+    writer = make_writer(StubWorksheet(), chunk_rows=2, chunk_bytes=10 ** 6)
+    pieces = writer.split([
+        {"range": "'訂單-待處理'!A1", "values": [["a"], ["b"], ["c"]]},
+        {"range": "Sheet1!B2:C3", "values": [["d", "e"]]},
+    ])
+    assert [piece["range"] for piece in pieces] == [
+        "'訂單-待處理'!A1:A2", "'訂單-待處理'!A3:A3", "Sheet1!B2:C2",
+    ]
+
+
+def test_pack_merges_small_ranges_within_limits():
+    writer = make_writer(StubWorksheet(), chunk_rows=5, chunk_bytes=10 ** 6)
+    data = [{"range": f"A{row}", "values": [[row], [row + 1]]} for row in (1, 10, 20, 30)]
+    requests = writer.pack(writer.split(data))
+
+    assert [len(request["ranges"]) for request in requests] == [2, 2]
+    assert all(request["rows"] <= 5 for request in requests)
+
+
+def test_write_ranges_sends_packed_requests():
+    worksheet = StubWorksheet()
+    writer = make_writer(worksheet, chunk_rows=3, chunk_bytes=10 ** 6)
+    report = writer.write_ranges([{"range": "A1", "values": [[i] for i in range(7)]}])
+
+    assert len(worksheet.calls) == len(report) == 3
+    assert [entry["rows"] for entry in report] == [3, 3, 1]
+    assert worksheet.calls[2] == [{"range": "A7:A7", "values": [[6]]}]
+
+
+@pytest.mark.parametrize("status", sorted(RETRY_STATUS))
+def test_retryable_status_backs_off_and_retries(status):
+    worksheet = StubWorksheet(status, status)
+    sleeps = []
+    writer = make_writer(worksheet, max_retries=3, backoff_base=1.0, sleep=sleeps.append)
+    report = writer.write_ranges([{"range": "A1", "values": [["a"]]}])
+
+    assert report[0]["attempts"] == 3 and report[0]["error"] is None
+    assert len(worksheet.calls) == 3
+    # 指數退避加上不超過 backoff_base 的隨機抖動
+    assert 1.0 <= sleeps[0] < 2.0 and 2.0 <= sleeps[1] < 3.0
+
+
+def test_bad_request_is_not_retried():
+    worksheet = StubWorksheet(400)
+    sleeps = []
+    writer = make_writer(worksheet, max_retries=3, backoff_base=1.0, sleep=sleeps.append)
+
+    with pytest.raises(SheetsWriteError) as excinfo:
+        writer.write_ranges([{"range": "A1", "values": [["a"]]}])
+    assert len(worksheet.calls) == 1 and sleeps == []
+    assert excinfo.value.failed[0]["attempts"] == 1
+    assert excinfo.value.failed[0]["error"].startswith("400")
+
+
+def test_token_bucket_allows_burst_then_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, capacity=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)  # 每分鐘 60 個：一秒補一個
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+    clock.now += 10  # 閒置後最多只累積到 capacity
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+def test_token_bucket_zero_rate_never_waits():
+    clock = FakeClock()
+    bucket = TokenBucket(0, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+    assert clock.sleeps == []
@@ -0,0 +1,70 @@
+# StreamingProcessor 的測試：分塊、逐頁處理的結果需與一次處理相同
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from benchmark import generate_rows
+from config import Config
+from data_processor import DataMerger
+from pagination import crawl_pages, merge_page_results
+from schema import ORDER_SCHEMA, ITEM_SCHEMA
+from stream_processor import StreamingProcessor
+
+
+@pytest.fixture(autouse=True)
+def no_field_cache(monkeypatch):
+    # 不讀寫正式的欄位解析快取
+    monkeypatch.setattr(Config, "FIELD_CACHE_SIZE", 0)
+
+
+@pytest.fixture(scope="module")
+def scraped():
+    orders, items = generate_rows(500)
+    return ORDER_SCHEMA.to_frame(orders), ITEM_SCHEMA.to_frame(items)
+
+
+def split_pages(head, inner, page_orders):
+    """依訂單切成分頁，每頁開頭重複上一頁的最後一筆訂單（模擬分頁期間訂單位置移動）"""
+    pages = []
+    for start in range(0, len(head), page_orders):
+        page_head = head.iloc[max(0, start - 1):start + page_orders]
+        page_inner = inner[inner["訂單ID"].isin(page_head["訂單ID"])]
+        pages.append((page_head.reset_index(drop=True), page_inner.reset_index(drop=True)))
+    return pages
+
+
+def test_chunked_process_matches_process_all(scraped):
+    head, inner = scraped
+    expected = DataMerger(head, inner).process_all()
+    result = StreamingProcessor(37).process(head, inner)
+    assert_frame_equal(result, expected)
+
+
+def test_pages_streamed_through_crawl_pages_match_process_all(scraped):
+    head, inner = scraped
+    pages = split_pages(head, inner, 60)
+    expected = DataMerger(*merge_page_results(pages)).process_all()
+
+    stream = StreamingProcessor(37)
+    stream.add_page(*pages[0])
+    urls = list(range(1, len(pages)))
+    workers = [lambda index: pages[index]] * 3
+    assert crawl_pages(urls, workers, on_page=lambda page: stream.add_page(*page)) == []
+
+    assert stream.orders == len(head)
+    assert_frame_equal(stream.result(), expected)
+    assert stream.merge_report["unmatched_orders"] == []
+
+
+def test_crawl_pages_hands_pages_over_in_order():
+    received = []
+    results = crawl_pages(list(range(10)), [lambda url: url * 2] * 4, on_page=received.append)
+    assert results == [] and received == [url * 2 for url in range(10)]
+    assert crawl_pages(list(range(10)), [lambda url: url * 2] * 4) == received
+
+
+def test_empty_result_has_the_process_all_columns():
+    head, inner = ORDER_SCHEMA.to_frame([]), ITEM_SCHEMA.to_frame([])
+    result = StreamingProcessor(10).process(head, inner)
+    expected = DataMerger(head, inner).process_all()
+    assert result.empty
+    assert list(result.columns) == list(expected.columns)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 import time
 from datetime import datetime
 
@@ -40,4 +41,27 @@ def log_message(message):
         f.write(f"{timestamp} - {message}\n")
     
     # 同時輸出到控制台
-    print(f"{timestamp} - {message}")
\ No newline at end of file
+    print(f"{timestamp} - {message}")
+
+def atomic_write(path, write, mode="wb", encoding=None):
+    """
+    先寫入同目錄下不重複的暫存檔再取代目標檔案：
+    中斷時不會留下半個檔案，同時執行的多個行程也不會互相覆寫暫存檔
+    :param path: 目標檔案路徑
+    :param write: callable - 接收已開啟的暫存檔並寫入內容
+    :param mode: str - 開啟暫存檔的模式（"wb" 或 "w"）
+    :param encoding: str - 文字模式的編碼
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise